@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self) -> None:  # noqa: PLR6301
+        from . import checks, signals  # noqa: F401, PLC0415
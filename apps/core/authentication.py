@@ -1,5 +1,176 @@
-from rest_framework.authentication import TokenAuthentication
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.http import HttpRequest
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from apps.users.models import User
+
+from . import metrics
+from .cache import TTLCache
 
 
 class BearerTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication with a read-through token cache.
+
+    Successful lookups are kept in a per-process LRU for
+    ``AUTH_TOKEN_LOCAL_CACHE_TTL`` seconds and, when
+    ``AUTH_TOKEN_CACHE_SHARED`` is enabled, in Django's cache for
+    ``AUTH_TOKEN_CACHE_TTL`` seconds, so most requests skip the
+    ``Token``/``User`` query. Deleting or regenerating a token and saving or
+    deleting its user evict it (see ``apps.core.signals``); other processes'
+    LRUs catch up within their short TTL, which bounds how long a revoked
+    token is still accepted.
+    """
+
     keyword = 'Bearer'
+
+    _local_cache: TTLCache | None = None
+    _lock = threading.Lock()
+
+    def authenticate_credentials(self, key: str) -> tuple[User, Token]:
+        if settings.AUTH_TOKEN_CACHE_TTL <= 0:
+            return super().authenticate_credentials(key)
+
+        cache_key = self.cache_key(key)
+        local_cache = self.local_cache()
+        cached = local_cache.get(cache_key)
+        if cached is None and settings.AUTH_TOKEN_CACHE_SHARED:
+            cached = shared_cache.get(cache_key)
+            if cached is not None:
+                local_cache.set(cache_key, cached)
+
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            local_cache.set(cache_key, cached)
+            if settings.AUTH_TOKEN_CACHE_SHARED:
+                shared_cache.set(
+                    cache_key, cached, settings.AUTH_TOKEN_CACHE_TTL
+                )
+        return self._copy(cached)
+
+    async def aauthenticate(
+        self, request: HttpRequest | Request
+    ) -> tuple[User, Token] | None:
+        """Async variant of ``authenticate`` for the async views."""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise AuthenticationFailed(msg)
+        if len(auth) > 2:  # noqa: PLR2004
+            msg = _(
+                'Invalid token header. '
+                'Token string should not contain spaces.'
+            )
+            raise AuthenticationFailed(msg)
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            msg = _(
+                'Invalid token header. '
+                'Token string should not contain invalid characters.'
+            )
+            raise AuthenticationFailed(msg) from None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key: str) -> tuple[User, Token]:
+        """Async variant of ``authenticate_credentials``."""
+        if settings.AUTH_TOKEN_CACHE_TTL <= 0:
+            return await self._afetch(key)
+
+        cache_key = self.cache_key(key)
+        local_cache = self.local_cache()
+        cached = local_cache.get(cache_key)
+        if cached is None and settings.AUTH_TOKEN_CACHE_SHARED:
+            cached = await shared_cache.aget(cache_key)
+            if cached is not None:
+                local_cache.set(cache_key, cached)
+
+        if cached is None:
+            cached = await self._afetch(key)
+            local_cache.set(cache_key, cached)
+            if settings.AUTH_TOKEN_CACHE_SHARED:
+                await shared_cache.aset(
+                    cache_key, cached, settings.AUTH_TOKEN_CACHE_TTL
+                )
+        return self._copy(cached)
+
+    async def _afetch(self, key: str) -> tuple[User, Token]:
+        try:
+            token = await (
+                self.get_model().objects.select_related('user').aget(key=key)
+            )
+        except self.get_model().DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.')) from None
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
+
+    @staticmethod
+    def _copy(cached: tuple[User, Token]) -> tuple[User, Token]:
+        # Hand out copies so per-request state set on the user (e.g. the
+        # membership memo) never leaks into the shared cached instance.
+        user, token = cached
+        user = copy.copy(user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+    @staticmethod
+    def cache_key(key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return f'auth:token:{digest}'
+
+    @classmethod
+    def local_cache(cls) -> TTLCache:
+        if cls._local_cache is None:
+            with cls._lock:
+                if cls._local_cache is None:
+                    cls._local_cache = TTLCache(
+                        max_size=settings.AUTH_TOKEN_CACHE_MAX_SIZE,
+                        ttl=min(
+                            settings.AUTH_TOKEN_LOCAL_CACHE_TTL,
+                            settings.AUTH_TOKEN_CACHE_TTL,
+                        ),
+                        on_lookup=_count_lookup,
+                    )
+        return cls._local_cache
+
+    @classmethod
+    def invalidate(cls, *keys: str) -> None:
+        """Evict the given token keys from every cache layer."""
+        cache_keys = [cls.cache_key(key) for key in keys]
+        local_cache = cls.local_cache()
+        for cache_key in cache_keys:
+            local_cache.delete(cache_key)
+        if settings.AUTH_TOKEN_CACHE_SHARED:
+            shared_cache.delete_many(cache_keys)
+
+    @classmethod
+    def cache_stats(cls) -> dict[str, int | float]:
+        """Return the hit/miss counters of this process's LRU."""
+        stats = cls.local_cache().stats()
+        total = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'hit_ratio': stats['hits'] / total if total else 0.0,
+        }
+
+
+def _count_lookup(hit: bool) -> None:
+    metrics.AUTH_TOKEN_CACHE_LOOKUPS.labels('hit' if hit else 'miss').inc()
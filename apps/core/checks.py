@@ -0,0 +1,78 @@
+"""System checks for settings that only break in production."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.conf import settings
+from django.core.checks import CheckMessage, Error, Tags, register
+
+# Backends whose entries other processes cannot see
+PROCESS_LOCAL_CACHES = frozenset({
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+})
+
+
+@register(Tags.caches)
+def check_replica_pin_cache(**kwargs: Any) -> list[CheckMessage]:  # noqa: ANN401
+    """Replica pins (``ReplicaPinningMiddleware``) need a shared cache."""
+    backend = settings.CACHES['default']['BACKEND']
+    if (
+        settings.DATABASE_REPLICAS
+        and settings.REPLICA_PIN_SECONDS
+        and backend in PROCESS_LOCAL_CACHES
+    ):
+        return [
+            Error(
+                'Read replicas need a shared default cache to pin clients '
+                'that wrote to the primary.',
+                hint=(
+                    'Set CACHE_URL (e.g. redis://...), or '
+                    'REPLICA_PIN_SECONDS=0 to give up read-your-writes.'
+                ),
+                id='core.E001',
+            )
+        ]
+    return []
+
+
+@register(Tags.caches)
+def check_token_cache(**kwargs: Any) -> list[CheckMessage]:  # noqa: ANN401
+    """A shared token cache must be shared, or revocations lag behind."""
+    backend = settings.CACHES['default']['BACKEND']
+    if (
+        settings.AUTH_TOKEN_CACHE_SHARED
+        and settings.AUTH_TOKEN_CACHE_TTL > 0
+        and backend in PROCESS_LOCAL_CACHES
+    ):
+        return [
+            Error(
+                'AUTH_TOKEN_CACHE_SHARED needs a shared default cache, or '
+                'other processes accept revoked tokens for '
+                'AUTH_TOKEN_CACHE_TTL seconds.',
+                hint=(
+                    'Set CACHE_URL (e.g. redis://...), or '
+                    'AUTH_TOKEN_CACHE_SHARED=False.'
+                ),
+                id='core.E003',
+            )
+        ]
+    return []
+
+
+@register(Tags.security, deploy=True)
+def check_metrics_token(**kwargs: Any) -> list[CheckMessage]:  # noqa: ANN401
+    """``/metrics`` must not be public once ``DEBUG`` is off."""
+    if settings.DEBUG or settings.METRICS_TOKEN:
+        return []
+    return [
+        Error(
+            '/metrics is served to anyone without METRICS_TOKEN.',
+            hint=(
+                'Set METRICS_TOKEN and configure the scraper to send it as '
+                'a bearer token.'
+            ),
+            id='core.E002',
+        )
+    ]
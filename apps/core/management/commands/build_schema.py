@@ -0,0 +1,30 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.core import schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema file unless it is up to date.'
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Generate it even if the code version did not change.',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        version = schema.code_version()
+        if schema.build(force=options['force']):
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Wrote {settings.SCHEMA_FILE} for version {version}.'
+                )
+            )
+        else:
+            self.stdout.write(
+                f'{settings.SCHEMA_FILE} is up to date (version {version}).'
+            )
@@ -0,0 +1,151 @@
+import http.client
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlsplit
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent GET requests to a running server for a while and '
+        'report its throughput and latency.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            'urls',
+            nargs='+',
+            help='URLs to request, in turn (e.g. http://127.0.0.1:8000/api/).',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Clients sending requests at the same time.',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=20.0,
+            help='Seconds to measure for.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=float,
+            default=2.0,
+            help='Seconds of requests sent before measuring.',
+        )
+        parser.add_argument(
+            '--token',
+            default='',
+            help='Bearer token sent with every request.',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        targets = [urlsplit(url) for url in options['urls']]
+        if any(target.scheme != 'http' for target in targets):
+            msg = 'Only http:// URLs are supported.'
+            raise CommandError(msg)
+        headers = {'Connection': 'close'}
+        if options['token']:
+            headers['Authorization'] = f'Bearer {options["token"]}'
+
+        self._run(targets, headers, options, options['warmup'])
+        started = time.perf_counter()
+        latencies, errors = self._run(
+            targets, headers, options, options['duration']
+        )
+        elapsed = time.perf_counter() - started
+        self._report(latencies, errors, elapsed, options['concurrency'])
+
+    @staticmethod
+    def _run(
+        targets: list[Any],
+        headers: dict[str, str],
+        options: dict[str, Any],
+        seconds: float,
+    ) -> tuple[list[float], int]:
+        """Send requests for *seconds*; return their latencies and errors."""
+        deadline = time.perf_counter() + seconds
+        latencies: list[float] = []
+        errors = 0
+        lock = threading.Lock()
+
+        def client(offset: int) -> None:
+            nonlocal errors
+            mine: list[float] = []
+            failed = 0
+            for target in itertools.islice(
+                itertools.cycle(targets), offset, None
+            ):
+                if time.perf_counter() >= deadline:
+                    break
+                path = target.path or '/'
+                if target.query:
+                    path = f'{path}?{target.query}'
+                start = time.perf_counter()
+                connection = http.client.HTTPConnection(
+                    target.netloc, timeout=60
+                )
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 400  # noqa: PLR2004
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                finally:
+                    connection.close()
+                if ok:
+                    mine.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            with lock:
+                latencies.extend(mine)
+                errors += failed
+
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            list(executor.map(client, range(options['concurrency'])))
+        return latencies, errors
+
+    def _report(
+        self,
+        latencies: list[float],
+        errors: int,
+        elapsed: float,
+        concurrency: int,
+    ) -> None:
+        latencies.sort()
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return math.nan
+            index = math.ceil(fraction * len(latencies)) - 1
+            return latencies[max(index, 0)] * 1000
+
+        self.stdout.write(
+            f'{len(latencies)} requests, {errors} errors in {elapsed:.1f}s '
+            f'with {concurrency} clients: '
+            f'{len(latencies) / elapsed:.1f} requests/s'
+        )
+        self.stdout.write(
+            'latency ms: '
+            + ', '.join(
+                f'{label} {percentile(fraction):.1f}'
+                for label, fraction in (
+                    ('p50', 0.5),
+                    ('p90', 0.9),
+                    ('p99', 0.99),
+                    ('max', 1.0),
+                )
+            )
+        )
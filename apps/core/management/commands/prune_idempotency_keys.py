@@ -0,0 +1,27 @@
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from apps.core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses past their retention.'
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=settings.IDEMPOTENCY_KEY_RETENTION,
+            help='Age in seconds (default: IDEMPOTENCY_KEY_RETENTION).',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        cutoff = timezone.now() - timedelta(seconds=options['older_than'])
+        deleted, _ = IdempotencyKey.objects.filter(created__lt=cutoff).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} idempotency keys.')
+        )
@@ -0,0 +1,144 @@
+"""
+Prometheus metrics, served by ``/metrics`` (``apps.core.views.metrics``).
+
+``MetricsMiddleware`` times every request and counts its queries, labelled
+by view class and method; the other metrics are updated where the events
+happen. Ratios, like the token cache hit ratio, are left to the queries::
+
+    rate(auth_token_cache_lookups_total{result="hit"}[5m])
+      / rate(auth_token_cache_lookups_total[5m])
+
+With several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to a
+directory shared by all of them (and the ``run_planting_jobs`` workers):
+every process writes its samples there and ``/metrics`` adds them up,
+whichever process answers the scrape. ``remove_dead_samples`` drops what
+processes that are gone left behind.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from django.http import HttpRequest
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+__all__ = [
+    'AUTH_TOKEN_CACHE_LOOKUPS',
+    'BULK_PLANTED_ROWS',
+    'BULK_REJECTED_ROWS',
+    'DB_CONNECTIONS_OPENED',
+    'DB_QUERIES',
+    'DB_QUERY_SECONDS',
+    'REQUESTS_IN_PROGRESS',
+    'REQUEST_LATENCY',
+    'export',
+    'method_label',
+    'remove_dead_samples',
+    'view_label',
+]
+
+# Anything else is counted as "other", so clients cannot add label values.
+METHODS = frozenset({
+    'GET',
+    'HEAD',
+    'OPTIONS',
+    'POST',
+    'PUT',
+    'PATCH',
+    'DELETE',
+})
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time to answer a request, by view and method.',
+    ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'Requests being answered, by method.',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+DB_QUERIES = Counter(
+    'db_queries',
+    'SQL queries run while answering requests, by view.',
+    ['view'],
+)
+DB_QUERY_SECONDS = Counter(
+    'db_query_seconds',
+    'Time spent in SQL queries while answering requests, by view.',
+    ['view'],
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'db_connections_opened',
+    'Database connections opened, by alias.',
+    ['alias'],
+)
+AUTH_TOKEN_CACHE_LOOKUPS = Counter(
+    'auth_token_cache_lookups',
+    'Bearer token lookups in the process cache, by result (hit or miss).',
+    ['result'],
+)
+BULK_PLANTED_ROWS = Counter(
+    'trees_bulk_planted_rows',
+    'Rows committed by services.plant_trees.',
+)
+BULK_REJECTED_ROWS = Counter(
+    'trees_bulk_rejected_rows',
+    'Invalid or repeated items refused by services.plant_trees.',
+)
+
+
+def method_label(method: str | None) -> str:
+    return method if method in METHODS else 'other'
+
+
+def view_label(request: HttpRequest) -> str:
+    """Name the view class (or function) that answered *request*."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view = getattr(match.func, 'view_class', match.func)
+    return view.__name__
+
+
+def export() -> bytes:
+    """Return every metric in the Prometheus text format."""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # running, as another user
+        pass
+    return True
+
+
+def remove_dead_samples() -> None:
+    """Delete the samples of processes no longer running, if multiprocess."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return
+    # Files are named after the writing process: counter_<pid>.db,
+    # gauge_livesum_<pid>.db, ...
+    for path in Path(directory).glob('*.db'):
+        pid = path.stem.rpartition('_')[2]
+        if pid.isdigit() and not _is_running(int(pid)):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import time
+from collections.abc import Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from . import metrics, routers, timing
+
+__all__ = [
+    'MetricsMiddleware',
+    'ReplicaPinningMiddleware',
+    'RequestTimingMiddleware',
+]
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class _SyncAndAsyncMiddleware:
+    """
+    Run in the mode of the handler it wraps, like Django's middleware.
+
+    Under ASGI, ``__acall__`` awaits the async handlers directly instead of
+    adapting them to a thread and back.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class ReplicaPinningMiddleware(_SyncAndAsyncMiddleware):
+    """
+    Scope replica routing (see ``apps.core.routers``) to each request.
+
+    Unsafe methods read from the primary. So do, for
+    ``REPLICA_PIN_SECONDS``, later requests of a client whose request
+    wrote; clients are told apart by their ``Authorization`` header or
+    session cookie, through the default cache, which must be shared by
+    every process (see ``apps.core.checks``).
+    """
+
+    @staticmethod
+    def _pin_key(request: HttpRequest) -> str | None:
+        if not settings.REPLICA_PIN_SECONDS:
+            return None
+        credentials = request.headers.get(
+            'Authorization'
+        ) or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not credentials:
+            return None
+        digest = hashlib.sha256(credentials.encode()).hexdigest()
+        return f'core:replica-pin:{digest}'
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = self._pin_key(request)
+        pinned = request.method not in SAFE_METHODS or (
+            key is not None and cache.get(key) is not None
+        )
+        with routers.scope(pinned=pinned):
+            response = self.get_response(request)
+            if key is not None and routers.wrote():
+                cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:  # noqa: PLW3201
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        key = self._pin_key(request)
+        pinned = request.method not in SAFE_METHODS or (
+            key is not None and await cache.aget(key) is not None
+        )
+        with routers.scope(pinned=pinned):
+            response = await self.get_response(request)
+            if key is not None and routers.wrote():
+                await cache.aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+class RequestTimingMiddleware(_SyncAndAsyncMiddleware):
+    """
+    Time each request's queries and view phases (see ``apps.core.timing``).
+
+    With ``SERVER_TIMING`` the timings go out in a ``Server-Timing`` header.
+    ``SERVER_TIMING_SAMPLE_RATE`` of the requests are logged as JSON lines,
+    and every request slower than ``SERVER_TIMING_SLOW_MS`` is logged as a
+    warning with its queries. With all three off, requests are not recorded.
+    """
+
+    @staticmethod
+    def _plan() -> tuple[bool, float] | None:
+        """Return whether to log the request and the slow threshold."""
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        sampled = rate > 0 and random.random() < rate  # noqa: S311
+        slow_ms = settings.SERVER_TIMING_SLOW_MS
+        if not (settings.SERVER_TIMING or sampled or slow_ms > 0):
+            return None
+        return sampled, slow_ms
+
+    @staticmethod
+    def _report(
+        request: HttpRequest,
+        response: HttpResponse,
+        timings: timing.Timings,
+        sampled: bool,  # noqa: FBT001
+        slow_ms: float,
+    ) -> None:
+        slow = 0 < slow_ms <= timings.total * 1000
+        if sampled or slow:
+            timing.log(
+                timings,
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+                slow=slow,
+            )
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = timings.header()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        plan = self._plan()
+        if plan is None:
+            return self.get_response(request)
+
+        sampled, slow_ms = plan
+        with timing.record(dump=slow_ms > 0) as timings:
+            response = self.get_response(request)
+        self._report(request, response, timings, sampled, slow_ms)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:  # noqa: PLW3201
+        plan = self._plan()
+        if plan is None:
+            return await self.get_response(request)
+
+        sampled, slow_ms = plan
+        with timing.record(dump=slow_ms > 0) as timings:
+            response = await self.get_response(request)
+        self._report(request, response, timings, sampled, slow_ms)
+        return response
+
+
+class MetricsMiddleware(_SyncAndAsyncMiddleware):
+    """
+    Feed the request metrics of ``apps.core.metrics``.
+
+    Place it right after ``RequestTimingMiddleware``, whose recording it
+    shares when that one records the request. Otherwise it only counts and
+    times the queries, without timing the view phases.
+    """
+
+    @staticmethod
+    def _observe(
+        request: HttpRequest,
+        method: str,
+        seconds: float,
+        queries: int,
+        db: float,
+    ) -> None:
+        view = metrics.view_label(request)
+        metrics.REQUEST_LATENCY.labels(view, method).observe(seconds)
+        metrics.DB_QUERIES.labels(view).inc(queries)
+        metrics.DB_QUERY_SECONDS.labels(view).inc(db)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        method = metrics.method_label(request.method)
+        in_progress = metrics.REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            with timing.record(phases=False) as timings:
+                queries, db = timings.queries, timings.db
+                response = self.get_response(request)
+                queries, db = timings.queries - queries, timings.db - db
+        finally:
+            in_progress.dec()
+        self._observe(
+            request, method, time.perf_counter() - start, queries, db
+        )
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:  # noqa: PLW3201
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        method = metrics.method_label(request.method)
+        in_progress = metrics.REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            with timing.record(phases=False) as timings:
+                queries, db = timings.queries, timings.db
+                response = await self.get_response(request)
+                queries, db = timings.queries - queries, timings.db - db
+        finally:
+            in_progress.dec()
+        self._observe(
+            request, method, time.perf_counter() - start, queries, db
+        )
+        return response
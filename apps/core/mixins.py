@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.http import HttpRequest, HttpResponseBase
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from . import timing, versions
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class ConditionalListMixin:
+    """
+    Answer conditional GETs of a list view from version scopes.
+
+    ``get_version_scopes()`` names the ``apps.core.versions`` scopes the
+    list depends on; the ETag also covers the full URL and the negotiated
+    media type. A matching ``If-None-Match`` (or ``If-Modified-Since``) gets
+    a 304 before ``get_queryset`` or the serializer run.
+    """
+
+    def get_version_scopes(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def get_validator_variant(self) -> tuple[object, ...]:
+        return (
+            self.request.get_full_path(),
+            self.request.accepted_media_type,
+        )
+
+    def list(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> HttpResponseBase:
+        validators = versions.lookup(
+            self.get_version_scopes(), *self.get_validator_variant()
+        )
+        last_modified = validators.last_modified
+        response = get_conditional_response(
+            request,
+            etag=validators.etag,
+            last_modified=(
+                int(last_modified.timestamp()) if last_modified else None
+            ),
+        )
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        response['ETag'] = validators.etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+
+class RowListMixin:
+    """
+    Render sparse lists from ``values()`` rows instead of model instances.
+
+    ``row_serializer_class.for_fieldset()`` gets the fieldset requested
+    with ``?fields=``/``?expand=`` (see ``apps.core.serializers``) and
+    returns a hand-written, read-only serializer with ``lookups`` and
+    ``render(rows)``, or ``None`` when it can't produce that fieldset; the
+    regular serializer is used then, as it is without those parameters.
+    """
+
+    row_serializer_class: type | None = None
+    row_chunk_size = 2000
+
+    def list(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> HttpResponseBase:
+        row_serializer = None
+        if self.row_serializer_class is not None:
+            row_serializer = self.row_serializer_class.for_fieldset(
+                self.get_serializer().fieldset
+            )
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        ordering = getattr(self.paginator, 'ordering', ())
+        lookups = [
+            *row_serializer.lookups,
+            *(field.lstrip('-') for field in ordering),
+        ]
+        queryset = (
+            self
+            .filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*dict.fromkeys(lookups))
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with timing.phase('serialize'):
+                data = row_serializer.render(page)
+            return self.get_paginated_response(data)
+        return Response(
+            row_serializer.render(
+                queryset.iterator(chunk_size=self.row_chunk_size)
+            )
+        )
+
+
+class IdempotentCreateMixin:
+    """
+    Make ``create`` safe to retry with an ``Idempotency-Key`` header.
+
+    The key is stored per user, in the transaction of the create, with a
+    fingerprint of the request and the response. A retry with the same key
+    gets that response again (marked ``Idempotent-Replayed: true``) without
+    running the create; the same key with a different request gets a 422.
+    Failed creates store nothing, so they can be retried with the same key.
+    """
+
+    def create(
+        self,
+        request: Request,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> HttpResponseBase:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        max_length = IdempotencyKey._meta.get_field('key').max_length
+        if not 0 < len(key) <= max_length:
+            raise ValidationError({
+                IDEMPOTENCY_HEADER: [
+                    f'Must have between 1 and {max_length} characters.'
+                ]
+            })
+
+        data = request.data
+        if hasattr(data, 'lists'):
+            data = dict(data.lists())
+        fingerprint = hashlib.sha256(
+            json.dumps(
+                [request.method, request.path, data],
+                sort_keys=True,
+                cls=DjangoJSONEncoder,
+            ).encode()
+        ).hexdigest()
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user=request.user, key=key, fingerprint=fingerprint
+                    )
+            except IntegrityError:
+                # Committed by an earlier (or concurrent) request.
+                record = IdempotencyKey.objects.get(user=request.user, key=key)
+                return self._replay(record, fingerprint)
+
+            response = super().create(request, *args, **kwargs)
+            record.status_code = response.status_code
+            record.response = response.data
+            record.save(update_fields=['status_code', 'response'])
+        return response
+
+    @staticmethod
+    def _replay(record: IdempotencyKey, fingerprint: str) -> Response:
+        if record.fingerprint != fingerprint:
+            return Response(
+                {
+                    'detail': f'This {IDEMPOTENCY_HEADER} was used for a '
+                    'different request.'
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        response = Response(record.response, status=record.status_code)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+class TimedViewMixin:
+    """
+    Time the phases of a REST framework view (see ``apps.core.timing``).
+
+    ``auth``, ``perm`` and ``view`` wrap the ``APIView`` methods of the
+    same stages; ``render`` runs from the end of ``dispatch`` until the
+    response is rendered, after the view returned.
+    """
+
+    def perform_authentication(self, request: Request) -> None:
+        with timing.phase('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request: Request) -> None:
+        with timing.phase('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request: Request, obj: Any) -> None:  # noqa: ANN401
+        with timing.phase('perm'):
+            super().check_object_permissions(request, obj)
+
+    def dispatch(
+        self, request: HttpRequest, *args: tuple, **kwargs: dict
+    ) -> HttpResponseBase:
+        with timing.phase('view'):
+            return super().dispatch(request, *args, **kwargs)
+
+    def finalize_response(
+        self,
+        request: Request,
+        response: HttpResponseBase,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> HttpResponseBase:
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        timings = timing.timing_phases()
+        if (
+            timings is not None
+            and isinstance(response, SimpleTemplateResponse)
+            and not response.is_rendered
+        ):
+            start = time.perf_counter()
+
+            def rendered(response: SimpleTemplateResponse) -> None:
+                timings.add('render', time.perf_counter() - start)
+
+            response.add_post_render_callback(rendered)
+        return response
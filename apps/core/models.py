@@ -1,2 +1,51 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
 
-# Create your models here.
+from .fields import UUIDv7Field
+
+
+class ScopeVersion(models.Model):
+    """
+    Version counter of a cached scope (see ``apps.core.versions``).
+
+    Bumped by the services layer and signals in the writing transaction, so
+    a version can never move ahead of the data it describes.
+    """
+
+    scope = models.CharField(max_length=255, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    modified = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f'{self.scope}@{self.version}'
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a request sent with an ``Idempotency-Key`` header.
+
+    Created in the transaction of the request it guards, so a key exists
+    only if that request's writes committed; see
+    ``apps.core.mixins.IdempotentCreateMixin``.
+    """
+
+    id = UUIDv7Field(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.user_id} / {self.key}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'], name='unique_user_idempotency_key'
+            )
+        ]
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Opt-in seek pagination over a unique, time-ordered key.
+
+    Pages are selected with a ``WHERE (a, b) < (...)`` style predicate built
+    from ``ordering`` instead of ``OFFSET``, so every page costs the same and
+    rows inserted concurrently never shift the pages a client is walking.
+    The last field of ``ordering`` must be unique (e.g. a UUIDv7 primary
+    key) so that the position of a row is unambiguous.
+
+    Pagination only kicks in when the client sends ``cursor`` or
+    ``page_size``; otherwise the full list is returned as before.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 1000
+    ordering: tuple[str, ...] = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: APIView | None = None,
+    ) -> list[Model] | None:
+        page = self._page_queryset(queryset, request)
+        if page is None:
+            return None
+        return self._finish_page(list(page))
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request
+    ) -> list[Model] | None:
+        """Async variant of ``paginate_queryset`` for the async views."""
+        page = self._page_queryset(queryset, request)
+        if page is None:
+            return None
+        return self._finish_page([instance async for instance in page])
+
+    def _page_queryset(
+        self, queryset: QuerySet, request: Request
+    ) -> QuerySet | None:
+        params = request.query_params
+        if (
+            self.cursor_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+        self.position, self.reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(_invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._seek(ordering, self.position))
+        return queryset[: self.page_size + 1]
+
+    def _finish_page(self, results: list[Model]) -> list[Model]:
+        position, reverse = self.position, self.reverse
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        first, last = (results[0], results[-1]) if results else (None, None)
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.next_position = self._position(last) if last else position
+        self.previous_position = self._position(first) if first else position
+        return results
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data: list) -> Response:
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data: list) -> dict[str, Any]:
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:  # noqa: PLR6301
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view: APIView) -> list[dict]:
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def decode_cursor(
+        self, request: Request
+    ) -> tuple[tuple[Any, ...] | None, bool]:
+        """Return the seek position and direction carried by the cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = payload['p'], bool(payload.get('r', False))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = tuple(
+                self.model._meta.get_field(_name(field)).to_python(value)
+                for field, value in zip(self.ordering, values)
+            )
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message) from None
+        return position, reverse
+
+    def encode_cursor(
+        self, position: tuple[Any, ...], *, reverse: bool
+    ) -> str:
+        payload = {'p': [_to_json(value) for value in position]}
+        if reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii')
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def _position(self, instance: Model | dict) -> tuple[Any, ...]:
+        # ``values()`` querysets paginate too, see RowListMixin.
+        if isinstance(instance, dict):
+            return tuple(instance[_name(field)] for field in self.ordering)
+        return tuple(
+            getattr(instance, _name(field)) for field in self.ordering
+        )
+
+    @staticmethod
+    def _seek(ordering: tuple[str, ...], position: tuple[Any, ...]) -> Q:
+        """Build the lexicographic "comes after *position*" predicate."""
+        clauses = []
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{_name(field)}__{lookup}': position[index]})
+            for previous, value in zip(ordering[:index], position[:index]):
+                clause &= Q(**{_name(previous): value})
+            clauses.append(clause)
+        return reduce(or_, clauses)
+
+
+def _name(field: str) -> str:
+    return field.lstrip('-')
+
+
+def _invert(field: str) -> str:
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def _to_json(value: object) -> str | int | float:
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from collections.abc import Mapping
+from typing import Any
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON.
+
+    Streaming views write their own body and only use this class for content
+    negotiation; anything rendered through it (e.g. an error payload) becomes
+    a single JSON line.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(  # noqa: PLR6301
+        self,
+        data: Any,  # noqa: ANN401
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        if data is None:
+            return b''
+        return JSONRenderer().render(data) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Comma-separated values.
+
+    Like ``NDJSONRenderer`` this is mostly a negotiation marker; mappings are
+    rendered as a header row followed by a single value row.
+    """
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(  # noqa: PLR6301
+        self,
+        data: Any,  # noqa: ANN401
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        if data is None:
+            return b''
+        if not isinstance(data, Mapping):
+            data = {'detail': data}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(data.keys())
+        writer.writerow(
+            json.dumps(value) if isinstance(value, (list, dict)) else value
+            for value in data.values()
+        )
+        return buffer.getvalue().encode(self.charset)
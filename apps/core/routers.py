@@ -0,0 +1,177 @@
+"""
+Read replica routing.
+
+``ReplicaRouter`` sends reads of the ``core``, ``trees`` and ``users`` apps
+to a healthy replica from ``settings.DATABASE_REPLICAS`` and everything
+else to ``default``. ``core`` goes along so version counters (see
+``apps.core.versions``) are never newer than the rows they describe.
+
+A context (a request, see ``ReplicaPinningMiddleware``) reads from one
+replica, picked on its first read, so its reads never go back in time.
+Once it writes, ``db_for_write`` pins it to the primary for the rest of the
+context. The middleware also pins unsafe methods from the start, and
+clients that wrote for ``REPLICA_PIN_SECONDS`` more, so they read their own
+writes despite replication lag. ``use_primary`` pins code that must not
+read stale rows, such as the background job workers.
+
+Replicas are probed at most every ``REPLICA_HEALTH_INTERVAL`` seconds per
+process; one that fails the probe or, on PostgreSQL, lags more than
+``REPLICA_MAX_LAG`` seconds gets no reads until a later probe passes. When
+no replica is healthy, reads go to the primary.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Model
+
+__all__ = [
+    'ROUTED_APPS',
+    'ReplicaRouter',
+    'healthy_replicas',
+    'is_pinned',
+    'pin',
+    'reset_health',
+    'scope',
+    'use_primary',
+    'wrote',
+]
+
+ROUTED_APPS = frozenset({'core', 'trees', 'users'})
+
+# Replication lag in seconds; zero while the replica has replayed all it got.
+_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+_pinned: ContextVar[bool] = ContextVar('replica_pinned', default=False)
+_replica: ContextVar[str | None] = ContextVar('replica', default=None)
+_wrote: ContextVar[bool] = ContextVar('replica_wrote', default=False)
+
+_lock = threading.Lock()
+# alias -> (monotonic time of the last probe, healthy)
+_health: dict[str, tuple[float, bool]] = {}
+
+
+def pin() -> None:
+    """Read from the primary for the rest of the current context."""
+    _pinned.set(True)
+
+
+def is_pinned() -> bool:
+    return _pinned.get()
+
+
+def wrote() -> bool:
+    """Whether the current context wrote to the primary."""
+    return _wrote.get()
+
+
+@contextmanager
+def scope(*, pinned: bool = False) -> Iterator[None]:
+    """Run the block as a fresh context, restoring the outer one after."""
+    pinned_token = _pinned.set(pinned)
+    replica_token = _replica.set(None)
+    wrote_token = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _wrote.reset(wrote_token)
+        _replica.reset(replica_token)
+        _pinned.reset(pinned_token)
+
+
+def use_primary() -> AbstractContextManager[None]:
+    """Read from the primary inside the block."""
+    return scope(pinned=True)
+
+
+def _probe(alias: str) -> bool:
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(_LAG_SQL)
+                return float(cursor.fetchone()[0]) <= settings.REPLICA_MAX_LAG
+            cursor.execute('SELECT 1')
+            return True
+    except DatabaseError:
+        connection.close_if_unusable_or_obsolete()
+        return False
+
+
+def healthy_replicas() -> list[str]:
+    """Return the replicas that passed their last probe, probing if due."""
+    now = time.monotonic()
+    healthy = []
+    for alias in settings.DATABASE_REPLICAS:
+        checked_at, ok = _health.get(alias, (float('-inf'), False))
+        if now - checked_at >= settings.REPLICA_HEALTH_INTERVAL:
+            with _lock:
+                # Another thread may have probed while this one waited.
+                checked_at, ok = _health.get(alias, (float('-inf'), False))
+                if now - checked_at >= settings.REPLICA_HEALTH_INTERVAL:
+                    ok = _probe(alias)
+                    _health[alias] = (time.monotonic(), ok)
+        if ok:
+            healthy.append(alias)
+    return healthy
+
+
+def reset_health() -> None:
+    """Forget every probe result, so replicas are probed on next use."""
+    with _lock:
+        _health.clear()
+
+
+class ReplicaRouter:
+    """Database router for ``settings.DATABASE_ROUTERS``."""
+
+    def db_for_read(self, model: type[Model], **hints: object) -> str | None:  # noqa: PLR6301
+        if (
+            not settings.DATABASE_REPLICAS
+            or model._meta.app_label not in ROUTED_APPS
+        ):
+            return None
+        if _pinned.get():
+            return DEFAULT_DB_ALIAS
+        alias = _replica.get()
+        if alias is None:
+            replicas = healthy_replicas()
+            alias = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS  # noqa: S311
+            _replica.set(alias)
+        return alias
+
+    def db_for_write(self, model: type[Model], **hints: object) -> str | None:  # noqa: PLR6301
+        if not settings.DATABASE_REPLICAS:
+            return None
+        pin()
+        _wrote.set(True)
+        # Not the instance's database: it may have been read from a replica.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(  # noqa: PLR6301
+        self, obj1: Model, obj2: Model, **hints: object
+    ) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(  # noqa: PLR6301
+        self, db: str, app_label: str, **hints: object
+    ) -> bool | None:
+        return False if db in settings.DATABASE_REPLICAS else None
@@ -0,0 +1,164 @@
+"""
+Pre-generated OpenAPI schema.
+
+Generating the schema introspects every view and serializer, so it is done
+once per code version instead of per request: ``build_schema`` (run at
+deploy or startup) writes it to ``settings.SCHEMA_FILE`` together with the
+``code_version`` it was generated for, and skips the work while that
+version is current. ``SchemaView`` serves it from memory, rendered and
+gzipped once per format and process.
+
+The code version is ``settings.CODE_VERSION`` (e.g. the deployed commit)
+or, without it, a digest of the project's sources and of the versions of
+the packages that shape the schema. A process that finds no schema file
+for its version generates the schema itself, once, and writes the file.
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from importlib import metadata
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+__all__ = ['Document', 'build', 'code_version', 'document', 'reset']
+
+logger = logging.getLogger(__name__)
+
+# Packages whose upgrades can change the generated schema
+PACKAGES = ('django', 'djangorestframework', 'drf-spectacular')
+
+RENDERERS: dict[str, type[BaseRenderer]] = {
+    'json': OpenApiJsonRenderer,
+    'yaml': OpenApiYamlRenderer,
+}
+
+_lock = threading.Lock()
+_schema: dict[str, Any] | None = None
+_documents: dict[str, Document] = {}
+
+
+class Document(NamedTuple):
+    content: bytes
+    gzipped: bytes
+    etag: str
+
+
+@functools.cache
+def _source_digest() -> str:
+    digest = hashlib.sha256()
+    for package in PACKAGES:
+        digest.update(f'{package}=={metadata.version(package)}\n'.encode())
+    base_dir = Path(settings.BASE_DIR)
+    sources = sorted(
+        path
+        for directory in ('apps', 'trees_everywhere')
+        for path in (base_dir / directory).rglob('*.py')
+    )
+    for path in sources:
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def code_version() -> str:
+    """Return the version the schema file must have been generated for."""
+    return settings.CODE_VERSION or _source_digest()
+
+
+def _generate() -> dict[str, Any]:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def _read(path: Path, version: str) -> dict[str, Any] | None:
+    """Return the schema stored in *path* if it is for *version*."""
+    try:
+        stored = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stored, dict) or stored.get('version') != version:
+        return None
+    return stored['schema']
+
+
+def _write(path: Path, version: str, schema: dict[str, Any]) -> None:
+    content = JSONRenderer().render({'version': version, 'schema': schema})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write aside and rename, so readers never see a partial file.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        Path(tmp).replace(path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def build(*, force: bool = False) -> bool:
+    """
+    Write the schema file unless it is already for the current version.
+
+    Returns whether the schema was generated.
+    """
+    path = Path(settings.SCHEMA_FILE)
+    version = code_version()
+    if not force and _read(path, version) is not None:
+        return False
+    _write(path, version, _generate())
+    return True
+
+
+def _load() -> dict[str, Any]:
+    global _schema  # noqa: PLW0603
+    if _schema is None:
+        path = Path(settings.SCHEMA_FILE)
+        version = code_version()
+        schema = _read(path, version)
+        if schema is None:
+            logger.warning(
+                'No schema file for version %s; generating it', version
+            )
+            schema = _generate()
+            try:
+                _write(path, version, schema)
+            except OSError:
+                logger.warning('Could not write %s', path, exc_info=True)
+            # Serve the file's form of the schema, whichever way it came.
+            schema = json.loads(JSONRenderer().render(schema))
+        _schema = schema
+    return _schema
+
+
+def document(media_format: str) -> Document:
+    """Return the schema rendered as ``json`` or ``yaml``."""
+    with _lock:
+        if media_format not in _documents:
+            content = RENDERERS[media_format]().render(_load())
+            _documents[media_format] = Document(
+                content=content,
+                gzipped=gzip.compress(content, mtime=0),
+                etag=f'W/"{code_version()}-{media_format}"',
+            )
+        return _documents[media_format]
+
+
+def reset() -> None:
+    """Forget the schema loaded by this process."""
+    global _schema  # noqa: PLW0603
+    with _lock:
+        _schema = None
+        _documents.clear()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.request import Request
+
+from . import timing
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+class Fieldset(NamedTuple):
+    """The fields a client asked for; ``fields`` is ``None`` for all."""
+
+    fields: tuple[str, ...] | None
+    expand: frozenset[str]
+
+
+def parse_fieldset(
+    request: Request | None,
+    readable: list[str],
+    expandable: list[str],
+) -> Fieldset | None:
+    """
+    Read ``?fields=`` and ``?expand=`` from *request*.
+
+    Both take comma-separated names. Returns ``None`` when the client sent
+    neither, and raises ``ValidationError`` on unknown names.
+    """
+    if request is None:
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    if FIELDS_QUERY_PARAM not in params and EXPAND_QUERY_PARAM not in params:
+        return None
+
+    fields = _names(params, FIELDS_QUERY_PARAM)
+    expand = _names(params, EXPAND_QUERY_PARAM)
+    errors = {}
+    unknown = [name for name in fields if name not in readable]
+    if unknown:
+        errors[FIELDS_QUERY_PARAM] = [
+            f'Unknown fields: {", ".join(unknown)}. '
+            f'Choose from: {", ".join(readable)}.'
+        ]
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        errors[EXPAND_QUERY_PARAM] = [
+            f'Unknown expansions: {", ".join(unknown)}. '
+            f'Choose from: {", ".join(expandable)}.'
+        ]
+    if errors:
+        raise serializers.ValidationError(errors)
+    return Fieldset(fields=tuple(fields) or None, expand=frozenset(expand))
+
+
+def _names(params: Any, name: str) -> list[str]:  # noqa: ANN401
+    names = (
+        part.strip()
+        for value in params.getlist(name)
+        for part in value.split(',')
+    )
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients trim a ``ModelSerializer`` with ``?fields=``/``?expand=``.
+
+    Without either parameter the serializer renders as declared. Otherwise
+    only the listed ``fields`` are rendered (every readable field when the
+    parameter is missing), and the nested objects named in
+    ``Meta.expandable`` come back as plain primary keys unless listed in
+    ``expand``. Write-only fields are never affected.
+    """
+
+    @cached_property
+    def fieldset(self) -> Fieldset | None:
+        """The requested fieldset, or ``None`` to render as declared."""
+        fields = super().get_fields()
+        return parse_fieldset(
+            self.context.get('request'),
+            readable=[
+                name for name, field in fields.items() if not field.write_only
+            ],
+            expandable=list(getattr(self.Meta, 'expandable', ())),
+        )
+
+    def get_fields(self) -> dict[str, serializers.Field]:
+        fields = super().get_fields()
+        fieldset = self.fieldset
+        if fieldset is None:
+            return fields
+
+        expandable = self.Meta.expandable
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if fieldset.fields is not None and name not in fieldset.fields:
+                del fields[name]
+            elif name in expandable and name not in fieldset.expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, source=field.source
+                )
+        return fields
+
+
+class TimedSerializerMixin:
+    """
+    Time ``to_representation`` as the ``serialize`` phase of the request.
+
+    See ``apps.core.timing``; a nested or listed serializer is timed once,
+    as part of the outermost one.
+    """
+
+    def to_representation(self, instance: Any) -> Any:  # noqa: ANN401
+        if timing.timing_phases() is None:
+            return super().to_representation(instance)
+        with timing.phase('serialize'):
+            return super().to_representation(instance)
@@ -0,0 +1,41 @@
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import metrics, timing
+from .authentication import BearerTokenAuthentication
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(instance: Token, **kwargs: Any) -> None:  # noqa: ANN401
+    BearerTokenAuthentication.invalidate(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_user_tokens(
+    instance: Any,  # noqa: ANN401
+    created: bool,  # noqa: FBT001
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    # Covers deactivation as well as any other change to the cached user.
+    if created:
+        return
+    keys = Token.objects.filter(user_id=instance.pk).values_list(
+        'key', flat=True
+    )
+    BearerTokenAuthentication.invalidate(*keys)
+
+
+@receiver(connection_created)
+def track_connection(
+    connection: BaseDatabaseWrapper,
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    metrics.DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+    timing.watch(connection)
@@ -0,0 +1,108 @@
+"""
+Test helpers shared by the apps.
+
+``QueryBudgetMixin`` guards every endpoint of a URLconf against N+1
+regressions: each URL name gets a maximum query count, and the count is
+measured with N and 10N seeded rows so that any per-row query fails the
+suite even when it still fits the budget.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+from django.db import connection
+from django.http import HttpResponseBase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+__all__ = ['QueryBudgetMixin', 'count_queries', 'url_names']
+
+
+def url_names(urlconf: str) -> set[str]:
+    """Return the namespaced names of every pattern of ``urlconf``."""
+    resolver = get_resolver(urlconf)
+    namespace = getattr(resolver.urlconf_module, 'app_name', None)
+    prefix = f'{namespace}:' if namespace else ''
+    return {f'{prefix}{name}' for name in _walk(resolver.url_patterns)}
+
+
+def _walk(patterns: list[URLPattern | URLResolver]) -> Iterator[str]:
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+def count_queries(response_factory: Any) -> tuple[HttpResponseBase, int]:  # noqa: ANN401
+    """
+    Call ``response_factory`` and count the queries it runs.
+
+    Streaming responses are consumed inside the capture, since their
+    queries only run while the body is iterated.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = response_factory()
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return response, len(queries)
+
+
+class QueryBudgetMixin:
+    """
+    Per-endpoint query budgets for a ``TestCase``.
+
+    Set ``urlconf`` and ``budgets`` (URL name -> max queries, one entry per
+    name of the URLconf) and implement ``seed(n)`` to add ``n`` rows of
+    everything the endpoints read. ``request_endpoint(name)`` issues a GET
+    with ``self.client`` by default; override it for endpoints that need
+    arguments, a body or another method.
+    """
+
+    urlconf: str
+    budgets: dict[str, int]
+    scale = 5
+
+    def seed(self, n: int) -> None:
+        raise NotImplementedError
+
+    def request_endpoint(self, name: str) -> HttpResponseBase:
+        return self.client.get(reverse(name))
+
+    def measure(self, name: str) -> int:
+        response, queries = count_queries(lambda: self.request_endpoint(name))
+        assert response.status_code < 400, (  # noqa: PLR2004
+            f'{name} answered {response.status_code}'
+        )
+        return queries
+
+    def test_every_url_name_has_a_budget(self) -> None:
+        """New endpoints must be given a query budget."""
+        missing = url_names(self.urlconf) - set(self.budgets)
+        assert not missing, f'No query budget for {sorted(missing)}'
+
+    # Periodic version rechecks would add queries depending on timing.
+    @override_settings(ACCOUNT_MEMBERSHIP_RECHECK_INTERVAL=3600)
+    def test_query_count_is_bounded_and_flat(self) -> None:
+        """No endpoint exceeds its budget or runs queries per row."""
+        self.seed(self.scale)
+        for name in self.budgets:
+            self.measure(name)  # warm caches and lazily created rows
+        small = {name: self.measure(name) for name in self.budgets}
+
+        self.seed(self.scale * 9)
+        for name in self.budgets:
+            self.measure(name)  # reload what the seeding invalidated
+        large = {name: self.measure(name) for name in self.budgets}
+
+        for name, budget in self.budgets.items():
+            with self.subTest(name):
+                assert small[name] <= budget, (
+                    f'{name} ran {small[name]} queries, budget is {budget}'
+                )
+                assert large[name] == small[name], (
+                    f'{name} ran {small[name]} queries with {self.scale} '
+                    f'rows and {large[name]} with {self.scale * 10}'
+                )
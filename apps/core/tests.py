@@ -1,2 +1,683 @@
+import contextlib
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.base import BaseHandler
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from apps.core import checks, metrics, routers, schema, timing
+from apps.core.authentication import BearerTokenAuthentication
+from apps.core.cache import TTLCache
+from apps.core.middleware import ReplicaPinningMiddleware
+from apps.trees import batch, nearby, services
+from apps.trees.models import Tree
+from apps.users.models import Account, User
+from trees_everywhere import warmup
+
+
+class TTLCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.now = 0.0
+        self.cache = TTLCache(max_size=2, ttl=10, clock=lambda: self.now)
+
+    def test_entries_expire_after_ttl(self) -> None:
+        """A value is served until its TTL elapses."""
+        self.cache.set('a', 1)
+        self.now = 9.9
+        assert self.cache.get('a') == 1
+        self.now = 10
+        assert self.cache.get('a') is None
+        assert self.cache.stats() == {'hits': 1, 'misses': 1, 'size': 0}
+
+    def test_lookups_are_reported(self) -> None:  # noqa: PLR6301
+        """on_lookup sees every lookup the counters count."""
+        lookups = []
+        cache = TTLCache(max_size=2, ttl=10, on_lookup=lookups.append)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+
+        assert lookups == [True, False]
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        """Reading an entry protects it from eviction."""
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        assert self.cache.get('a') == 1
+        assert self.cache.get('b') is None
+        assert self.cache.get('c') == 3  # noqa: PLR2004
+
+
+class BearerTokenAuthenticationTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        BearerTokenAuthentication.local_cache().clear()
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = BearerTokenAuthentication()
+
+    def test_cached_token_skips_the_database(self) -> None:
+        """The second authentication is served from the cache."""
+        before = BearerTokenAuthentication.cache_stats()
+        sample = ('auth_token_cache_lookups_total', {'result': 'hit'})
+        hits = REGISTRY.get_sample_value(*sample) or 0
+        self.authentication.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(
+                self.token.key
+            )
+
+        assert user == self.user
+        assert token.user is user
+        after = BearerTokenAuthentication.cache_stats()
+        assert after['misses'] == before['misses'] + 1
+        assert after['hits'] == before['hits'] + 1
+        assert REGISTRY.get_sample_value(*sample) == hits + 1
+
+    def test_deleted_token_is_evicted(self) -> None:
+        """Deleting a token revokes it immediately."""
+        key = self.token.key
+        self.authentication.authenticate_credentials(key)
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):  # noqa: PT027
+            self.authentication.authenticate_credentials(key)
+
+    def test_deactivated_user_is_rejected(self) -> None:
+        """Deactivating the user drops their cached token."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.key}')
+        url = reverse('trees:tree-list-create')
+        assert client.get(url).status_code == HTTPStatus.OK
+
+        self.user.is_active = False
+        self.user.save()
+
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_other_processes_see_revocations_within_the_local_ttl(
+        self,
+    ) -> None:
+        """A token revoked elsewhere stops working once the LRU entry ends."""
+        local_cache = BearerTokenAuthentication.local_cache()
+        assert local_cache.ttl == settings.AUTH_TOKEN_LOCAL_CACHE_TTL
+        key = self.token.key
+        self.authentication.authenticate_credentials(key)
+        # Deleted by another process: this one's LRU is not told.
+        Token.objects.filter(pk=key)._raw_delete('default')
+        self.authentication.authenticate_credentials(key)
+
+        later = time.monotonic() + local_cache.ttl
+        with (
+            mock.patch.object(local_cache, '_clock', return_value=later),
+            self.assertRaises(AuthenticationFailed),  # noqa: PT027
+        ):
+            self.authentication.authenticate_credentials(key)
+
+    def test_shared_token_cache_requires_a_shared_cache(self) -> None:  # noqa: PLR6301
+        """Revocations would not reach other processes' local caches."""
+        local = 'django.core.cache.backends.locmem.LocMemCache'
+        shared = 'django.core.cache.backends.redis.RedisCache'
+        with override_settings(
+            AUTH_TOKEN_CACHE_SHARED=True,
+            CACHES={'default': {'BACKEND': local}},
+        ):
+            errors = checks.check_token_cache()
+            assert [error.id for error in errors] == ['core.E003']
+        with override_settings(
+            AUTH_TOKEN_CACHE_SHARED=True,
+            CACHES={'default': {'BACKEND': shared}},
+        ):
+            assert checks.check_token_cache() == []
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTestCase(TestCase):
+    """
+    A second alias, ``replica``, shares the test database connection.
+
+    Rows read through it report ``_state.db == 'replica'``, which tells
+    where the router sent each query.
+    """
+
+    def setUp(self) -> None:  # noqa: D401, N802
+        connections['replica'] = connections['default']
+        routers.reset_health()
+        cache.clear()
+        with routers.scope():
+            self.tree = Tree.objects.create(
+                name='Ipê Amarelo', scientific_name='Handroanthus albus'
+            )
+        self.middleware = ReplicaPinningMiddleware(self._view)
+        self.factory = RequestFactory()
+
+    def tearDown(self) -> None:  # noqa: D401, N802, PLR6301
+        del connections['replica']
+        routers.reset_health()
+
+    def _view(self, request: HttpRequest) -> HttpResponse:
+        """Read a tree, write one if asked, and read it again."""
+        before = Tree.objects.get(pk=self.tree.pk)._state.db
+        if 'write' in request.GET:
+            Tree.objects.create(name=request.GET['write'], scientific_name='x')
+        after = Tree.objects.get(pk=self.tree.pk)._state.db
+        return HttpResponse(f'{before} {after}')
+
+    def _request(
+        self, method: str = 'get', token: str = 'a', **params: str
+    ) -> str:
+        request = getattr(self.factory, method)(
+            '/', params, HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        return self.middleware(request).content.decode()
+
+    def test_reads_go_to_replicas_until_the_context_writes(self) -> None:
+        """A write pins the rest of the context to the primary."""
+        with routers.scope():
+            assert Tree.objects.get(pk=self.tree.pk)._state.db == 'replica'
+            Tree.objects.create(name='Sakura', scientific_name='x')
+            assert Tree.objects.first()._state.db == 'default'
+        with routers.scope():
+            assert Tree.objects.first()._state.db == 'replica'
+        with routers.use_primary():
+            assert Tree.objects.first()._state.db == 'default'
+        # Apps outside the project keep Django's default routing.
+        assert Token.objects.all().db == 'default'
+
+    def test_middleware_pins_writers(self) -> None:
+        """Unsafe methods and clients that just wrote read the primary."""
+        assert self._request() == 'replica replica'
+        assert self._request('post') == 'default default'
+        assert self._request(token='b') == 'replica replica'
+
+        assert self._request(token='c', write='Sakura') == 'replica default'
+        assert self._request(token='c') == 'default default'
+        assert self._request(token='d') == 'replica replica'
+
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            self._request(token='e', write='Pau-Brasil')
+            assert self._request(token='e') == 'replica replica'
+
+    def test_unhealthy_replicas_get_no_reads(self) -> None:
+        """Failed probes send reads to the primary until a probe passes."""
+        with mock.patch.object(routers, '_probe', return_value=False) as probe:
+            assert self._request() == 'default default'
+            assert self._request() == 'default default'
+        assert probe.call_count == 1
+
+        with override_settings(REPLICA_HEALTH_INTERVAL=0):
+            assert self._request() == 'replica replica'
+        assert routers.healthy_replicas() == ['replica']
+
+    def test_pins_require_a_shared_cache(self) -> None:  # noqa: PLR6301
+        """Another worker process could not see a pin in a local cache."""
+        local = 'django.core.cache.backends.locmem.LocMemCache'
+        shared = 'django.core.cache.backends.redis.RedisCache'
+        with override_settings(CACHES={'default': {'BACKEND': local}}):
+            errors = checks.check_replica_pin_cache()
+            assert [error.id for error in errors] == ['core.E001']
+            with override_settings(REPLICA_PIN_SECONDS=0):
+                assert checks.check_replica_pin_cache() == []
+        with override_settings(CACHES={'default': {'BACKEND': shared}}):
+            assert checks.check_replica_pin_cache() == []
+
+    def test_replicas_are_not_migrated(self) -> None:  # noqa: PLR6301
+        """Schema changes reach replicas through replication only."""
+        router = routers.ReplicaRouter()
+        assert router.allow_migrate('replica', 'trees') is False
+        assert router.allow_migrate('default', 'trees') is None
+
+
+class RequestTimingTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        BearerTokenAuthentication.local_cache().clear()
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.key}')
+        self.url = reverse('trees:planted-tree-list-by-accounts')
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header_lists_queries_and_phases(self) -> None:
+        """Every phase of a REST framework view shows up in the header."""
+        account = Account.objects.create(name='Reforestation')
+        self.user.accounts.add(account)
+        tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        services.plant_trees(
+            user=self.user,
+            account=account,
+            plants=[(tree, (Decimal('-23.5505'), Decimal('-46.6333')))],
+        )
+
+        response = self.client.get(self.url)
+
+        assert response.status_code == HTTPStatus.OK
+        metrics = {
+            metric.split(';')[0]: metric
+            for metric in response['Server-Timing'].split(', ')
+        }
+        assert set(metrics) == {
+            'total',
+            'db',
+            'auth',
+            'perm',
+            'serialize',
+            'view',
+            'render',
+        }
+        assert metrics['db'].endswith(' queries"')
+        assert 'desc="0 ' not in metrics['db']
+
+    @override_settings(SERVER_TIMING=True)
+    def test_views_outside_the_project_are_not_instrumented(self) -> None:
+        """Only views that opt in get their phases timed."""
+        response = self.client.get(reverse('swagger-ui'))
+
+        assert response.status_code == HTTPStatus.OK
+        metrics = {
+            metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')
+        }
+        assert metrics == {'total', 'db'}
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_nothing_is_recorded_by_default(self) -> None:
+        """With timings off the middleware only passes the request on."""
+        with (
+            mock.patch.object(timing, 'record') as record,
+            self.assertNoLogs('apps.core.timing'),
+        ):
+            response = self.client.get(self.url)
+
+        assert 'Server-Timing' not in response
+        record.assert_not_called()
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_logged_as_json(self) -> None:
+        """A sampled request logs one JSON line without its queries."""
+        with self.assertLogs('apps.core.timing', 'INFO') as logs:
+            response = self.client.get(self.url)
+
+        assert 'Server-Timing' not in response
+        (record,) = logs.records
+        entry = json.loads(record.getMessage())
+        assert record.levelname == 'INFO'
+        assert entry['path'] == self.url
+        assert entry['status'] == HTTPStatus.OK
+        assert entry['db_queries'] > 0
+        assert 'auth_ms' in entry
+        assert 'queries' not in entry
+
+    @override_settings(SERVER_TIMING_SLOW_MS=0.001)
+    def test_slow_requests_dump_their_queries(self) -> None:
+        """Requests over the threshold are logged with every query."""
+        with self.assertLogs('apps.core.timing', 'WARNING') as logs:
+            self.client.get(self.url)
+
+        entry = json.loads(logs.records[0].getMessage())
+        assert entry['slow'] is True
+        assert len(entry['queries']) == entry['db_queries']
+        assert {query['alias'] for query in entry['queries']} == {'default'}
+        assert any('SELECT' in query['sql'] for query in entry['queries'])
+
+
+class AsyncMiddlewareTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        BearerTokenAuthentication.local_cache().clear()
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.token = Token.objects.create(user=self.user)
+        Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+    @override_settings(DEBUG=True)
+    def test_middleware_stack_stays_async(self) -> None:
+        """Under ASGI no middleware is adapted to a thread and back."""
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            BaseHandler().load_middleware(is_async=True)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_async_views_are_timed_and_counted(self) -> None:
+        """Queries run by the async ORM in a thread are still recorded."""
+        url = reverse('trees-async:tree-list-create')
+        view = {'view': 'AsyncTreeListView', 'method': 'GET'}
+        before = REGISTRY.get_sample_value(
+            'http_request_duration_seconds_count', view
+        )
+
+        response = async_to_sync(AsyncClient().get)(
+            url, headers={'Authorization': f'Bearer {self.token.key}'}
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert 'desc="0 ' not in response['Server-Timing']
+        after = REGISTRY.get_sample_value(
+            'http_request_duration_seconds_count', view
+        )
+        assert after == (before or 0) + 1
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        BearerTokenAuthentication.local_cache().clear()
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.account = Account.objects.create(name='Reforestation')
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.key}')
+
+    @staticmethod
+    def _sample(name: str, **labels: str) -> float:
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    def test_requests_are_timed_by_view_and_method(self) -> None:
+        """Latency, queries and token cache lookups reach /metrics."""
+        view = {'view': 'PlantedTreeListByAccountsAPIView'}
+        before = {
+            'requests': self._sample(
+                'http_request_duration_seconds_count', **view, method='GET'
+            ),
+            'queries': self._sample('db_queries_total', **view),
+            'misses': self._sample(
+                'auth_token_cache_lookups_total', result='miss'
+            ),
+            'hits': self._sample(
+                'auth_token_cache_lookups_total', result='hit'
+            ),
+        }
+        url = reverse('trees:planted-tree-list-by-accounts')
+        self.client.get(url)
+        self.client.get(url)
+
+        assert (
+            self._sample(
+                'http_request_duration_seconds_count', **view, method='GET'
+            )
+            == before['requests'] + 2
+        )
+        assert self._sample('db_queries_total', **view) > before['queries']
+        assert (
+            self._sample('auth_token_cache_lookups_total', result='miss')
+            == before['misses'] + 1
+        )
+        assert (
+            self._sample('auth_token_cache_lookups_total', result='hit')
+            == before['hits'] + 1
+        )
+        assert self._sample('http_requests_in_progress', method='GET') == 0
+
+        body = self.client.get('/metrics').content.decode()
+        assert (
+            'http_request_duration_seconds_bucket{'
+            'le="0.005",method="GET",view="PlantedTreeListByAccountsAPIView"}'
+        ) in body
+
+    def test_bulk_rows_are_counted_once_committed(self) -> None:
+        """Planted rows count on commit; refused items count right away."""
+        planted = self._sample('trees_bulk_planted_rows_total')
+        rejected = self._sample('trees_bulk_rejected_rows_total')
+        plants = [
+            (self.tree, (Decimal('-23.5'), Decimal('-46.6'))),
+            (self.tree, (Decimal('-23.6'), Decimal('-46.6'))),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            services.plant_trees(
+                user=self.user, account=self.account, plants=plants
+            )
+        with contextlib.suppress(batch.InvalidPlantings):
+            services.plant_trees(
+                user=self.user,
+                account=self.account,
+                plants=[*plants, plants[0]],
+                reject_duplicates=True,
+            )
+
+        assert self._sample('trees_bulk_planted_rows_total') == planted + 2
+        assert self._sample('trees_bulk_rejected_rows_total') == rejected + 3
+
+    @override_settings(METRICS_TOKEN='scraper')
+    def test_metrics_token_is_required_when_set(self) -> None:  # noqa: PLR6301
+        """Scrapes without the configured bearer token are refused."""
+        client = APIClient()
+        assert client.get('/metrics').status_code == HTTPStatus.UNAUTHORIZED
+
+        client.credentials(HTTP_AUTHORIZATION='Bearer scraper')
+        response = client.get('/metrics')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+
+    def test_production_requires_a_metrics_token(self) -> None:  # noqa: PLR6301
+        """``check --deploy`` fails while /metrics is public."""
+        with override_settings(DEBUG=False, METRICS_TOKEN=''):
+            errors = checks.check_metrics_token()
+            assert [error.id for error in errors] == ['core.E002']
+        with override_settings(DEBUG=False, METRICS_TOKEN='scraper'):
+            assert checks.check_metrics_token() == []
+
+    def test_view_phases_are_not_timed_for_metrics_alone(self) -> None:
+        """Without request timings, metrics only count the queries."""
+        with mock.patch.object(timing.Timings, 'add') as add:
+            self.client.get(reverse('trees:planted-tree-list-by-accounts'))
+
+        add.assert_not_called()
+
+    def test_worker_processes_are_added_up(self) -> None:  # noqa: PLR6301
+        """With a shared directory, /metrics sums every process's samples."""
+        script = (
+            'import sys; from prometheus_client import Counter; '
+            "Counter('trees_bulk_planted_rows', '').inc(int(sys.argv[1]))"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            environ = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+            for rows in ('3', '4'):
+                subprocess.run(
+                    [sys.executable, '-c', script, rows],
+                    env=environ,
+                    check=True,
+                )
+            with mock.patch.dict(os.environ, environ):
+                body = metrics.export().decode()
+
+        assert 'trees_bulk_planted_rows_total 7.0' in body
+
+    def test_only_samples_of_dead_processes_are_removed(self) -> None:  # noqa: PLR6301
+        """Files of running processes, like this one, are kept."""
+        script = (
+            'from prometheus_client import Counter; '
+            "Counter('trees_bulk_planted_rows', '').inc()"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            environ = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+            subprocess.run(
+                [sys.executable, '-c', script], env=environ, check=True
+            )
+            (dead,) = Path(directory).glob('*.db')
+            live = Path(directory) / f'counter_{os.getpid()}.db'
+            live.write_bytes(b'')
+            with mock.patch.dict(os.environ, environ):
+                metrics.remove_dead_samples()
+
+            assert not dead.exists()
+            assert live.exists()
+
+
+class SchemaTestCase(SimpleTestCase):
+    document = {'openapi': '3.0.3', 'info': {'title': 'Trees'}, 'paths': {}}
+
+    def setUp(self) -> None:  # noqa: D401, N802
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'openapi.json'
+        overrides = override_settings(SCHEMA_FILE=self.path, CODE_VERSION='1')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        schema.reset()
+        self.addCleanup(schema.reset)
+        patcher = mock.patch.object(
+            schema, '_generate', return_value=self.document
+        )
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _build(self) -> str:  # noqa: PLR6301
+        out = StringIO()
+        call_command('build_schema', stdout=out)
+        return out.getvalue()
+
+    def test_schema_is_built_once_per_code_version(self) -> None:
+        """The build step does nothing until the code version changes."""
+        assert 'Wrote' in self._build()
+        assert 'up to date' in self._build()
+        assert json.loads(self.path.read_bytes()) == {
+            'version': '1',
+            'schema': self.document,
+        }
+
+        with override_settings(CODE_VERSION='2'):
+            assert 'Wrote' in self._build()
+        assert self.generate.call_count == 2  # noqa: PLR2004
+
+    def test_schema_is_served_from_memory(self) -> None:
+        """Requests read the built file once and revalidate by ETag."""
+        self._build()
+        self.generate.reset_mock()
+        client = APIClient()
+        url = reverse('schema')
+
+        response = client.get(url, {'format': 'json'})
+        assert response.status_code == HTTPStatus.OK
+        assert json.loads(response.content) == self.document
+        assert response['Vary'] == 'Accept, Accept-Encoding'
+
+        compressed = client.get(
+            url, {'format': 'json'}, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.content) == response.content
+        assert compressed['ETag'] != response['ETag']
+        revalidated = client.get(
+            url,
+            {'format': 'json'},
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert revalidated.status_code == HTTPStatus.OK
+        assert revalidated['Content-Encoding'] == 'gzip'
+
+        yaml = client.get(url)
+        assert yaml.content.startswith(b'openapi: 3.0.3')
+        assert yaml['ETag'] != response['ETag']
+
+        revalidated = client.get(
+            url, {'format': 'json'}, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+        self.generate.assert_not_called()
+
+    def test_missing_schema_is_generated_once(self) -> None:
+        """Without a file for its version, a process writes one itself."""
+        client = APIClient()
+        with self.assertLogs('apps.core.schema', 'WARNING'):
+            client.get(reverse('schema'))
+        client.get(reverse('schema'), {'format': 'json'})
+
+        self.generate.assert_called_once()
+        assert 'up to date' in self._build()
+
+
+class WarmupTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(
+            SCHEMA_FILE=Path(directory.name) / 'openapi.json', CODE_VERSION='1'
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for module in (nearby, schema):
+            module.reset()
+            self.addCleanup(module.reset)
+
+    def test_master_is_warmed_up_before_forking(self) -> None:  # noqa: PLR6301
+        """The master loads the shared state and then drops connections."""
+        with (
+            mock.patch.object(
+                schema, '_generate', return_value={'openapi': '3.0.3'}
+            ) as generate,
+            mock.patch.object(schema.logger, 'warning'),
+            mock.patch.object(warmup.connections, 'close_all') as close,
+            mock.patch.object(warmup.caches, 'close_all'),
+            mock.patch.object(warmup.logger, 'warning') as warning,
+            mock.patch.object(warmup.gc, 'freeze') as freeze,
+        ):
+            warmup.before_fork()
+            schema.document('json')
+
+        warning.assert_not_called()
+        assert nearby.is_warm()
+        assert nearby._thread is None
+        freeze.assert_called_once()
+        generate.assert_called_once()
+        close.assert_called()
+
+    def test_master_reuses_the_index_loaded_on_import(self) -> None:  # noqa: PLR6301
+        """The import-time thread is waited for, not raced or repeated."""
+        with (
+            mock.patch.object(nearby, 'warm', wraps=nearby.warm) as warm,
+            mock.patch.object(schema, '_generate', return_value={}),
+            mock.patch.object(schema.logger, 'warning'),
+            mock.patch.object(warmup.connections, 'close_all'),
+            mock.patch.object(warmup.caches, 'close_all'),
+            mock.patch.object(warmup.gc, 'freeze'),
+        ):
+            thread = nearby.warm_in_background()
+            warmup.before_fork()
+
+        assert not thread.is_alive()
+        assert nearby.is_warm()
+        warm.assert_called_once()
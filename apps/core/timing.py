@@ -0,0 +1,222 @@
+"""
+Per-request timings for ``RequestTimingMiddleware``.
+
+While a request is recorded, every query on every database alias is counted
+and timed (see ``watch``), and the project's REST framework views and
+serializers time their phases with ``phase``:
+
+* ``auth``: ``perform_authentication`` (``BearerTokenAuthentication``);
+* ``perm``: ``check_permissions`` and ``check_object_permissions``;
+* ``view``: ``dispatch``, which includes the two above, the handler and
+  serialization;
+* ``serialize``: ``to_representation`` of the response serializers;
+* ``render``: from the end of ``dispatch`` until the response is rendered.
+
+Views opt in with ``apps.core.mixins.TimedViewMixin`` and serializers with
+``apps.core.serializers.TimedSerializerMixin``; other views (the browsable
+API's, drf-spectacular's) are left alone. A phase entered again while it
+runs (a serializer nested in another one) is timed once. Outside a
+recorded request the mixins only read a context variable.
+
+Streamed response bodies are produced after the middleware returns, so
+their queries and time are not included.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+__all__ = [
+    'MAX_DUMPED_QUERIES',
+    'Timings',
+    'current',
+    'log',
+    'phase',
+    'record',
+    'timing_phases',
+    'watch',
+]
+
+MAX_DUMPED_QUERIES = 1000
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Timings | None] = ContextVar('timings', default=None)
+
+
+class Timings:
+    """Query counts and phase durations, in seconds, of one request."""
+
+    __slots__ = (
+        '_active',
+        'db',
+        'dump',
+        'phases',
+        'queries',
+        'sql',
+        'time_phases',
+        'total',
+    )
+
+    def __init__(self, *, dump: bool = False, phases: bool = True) -> None:
+        # Without *phases* only the queries are counted (see ``phase``).
+        self.time_phases = phases
+        self.phases: dict[str, float] = {}
+        self.queries = 0
+        self.db = 0.0
+        self.total = 0.0
+        # (alias, sql, seconds) of the first MAX_DUMPED_QUERIES queries
+        self.dump = dump
+        self.sql: list[tuple[str, str, float]] = []
+        self._active: set[str] = set()
+
+    def query(self, alias: str, sql: str, seconds: float) -> None:
+        self.queries += 1
+        self.db += seconds
+        if self.dump and len(self.sql) < MAX_DUMPED_QUERIES:
+            self.sql.append((alias, sql, seconds))
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self) -> str:
+        """Return the value of a ``Server-Timing`` header, in milliseconds."""
+        metrics = [
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        metrics.extend(
+            f'{name};dur={seconds * 1000:.1f}'
+            for name, seconds in self.phases.items()
+        )
+        return ', '.join(metrics)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'total_ms': round(self.total * 1000, 3),
+            'db_queries': self.queries,
+            'db_ms': round(self.db * 1000, 3),
+            **{
+                f'{name}_ms': round(seconds * 1000, 3)
+                for name, seconds in self.phases.items()
+            },
+        }
+
+
+def current() -> Timings | None:
+    """The timings of the request being recorded, if any."""
+    return _current.get()
+
+
+def timing_phases() -> Timings | None:
+    """The timings of the request being recorded, if it times phases."""
+    timings = _current.get()
+    return timings if timings is not None and timings.time_phases else None
+
+
+def _record_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,  # noqa: ANN401
+    many: bool,  # noqa: FBT001
+    context: dict[str, Any],
+) -> Any:  # noqa: ANN401
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.query(
+            context['connection'].alias, sql, time.perf_counter() - start
+        )
+
+
+def watch(connection: BaseDatabaseWrapper) -> None:
+    """
+    Feed the queries of *connection* to the request being recorded.
+
+    Called for every new connection (``apps.core.signals``). The wrapper
+    stays installed and reads a context variable, so it also sees queries
+    that async code runs in another thread.
+    """
+    if _record_query not in connection.execute_wrappers:
+        # First, so ``execute_wrapper`` blocks still pop their own wrapper.
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+@contextmanager
+def record(*, dump: bool = False, phases: bool = True) -> Iterator[Timings]:
+    """
+    Record the queries and phases run inside the block.
+
+    With *dump*, the SQL of the queries is kept as well (without params);
+    without *phases*, only the queries are counted and timed. Inside
+    another ``record`` block, the outer timings are yielded and go on
+    recording.
+    """
+    outer = _current.get()
+    if outer is not None:
+        outer.dump = outer.dump or dump
+        outer.time_phases = outer.time_phases or phases
+        yield outer
+        return
+    timings = Timings(dump=dump, phases=phases)
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - start
+        _current.reset(token)
+
+
+def log(
+    timings: Timings, *, method: str, path: str, status: int, slow: bool
+) -> None:
+    """
+    Write the timings as a JSON log line.
+
+    Slow requests are logged as warnings, with their queries.
+    """
+    entry = {
+        'method': method,
+        'path': path,
+        'status': status,
+        **timings.as_dict(),
+    }
+    if not slow:
+        logger.info(json.dumps(entry))
+        return
+    entry['slow'] = True
+    entry['queries'] = [
+        {'alias': alias, 'sql': sql, 'ms': round(seconds * 1000, 3)}
+        for alias, sql, seconds in timings.sql
+    ]
+    logger.warning(json.dumps(entry))
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the block as phase *name* of the request being recorded."""
+    timings = timing_phases()
+    if timings is None or name in timings._active:  # noqa: SLF001
+        yield
+        return
+    timings._active.add(name)  # noqa: SLF001
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+        timings._active.discard(name)  # noqa: SLF001
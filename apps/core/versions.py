@@ -0,0 +1,115 @@
+"""
+Per-scope version counters for cheap HTTP validators.
+
+A scope names a slice of data that list endpoints depend on, such as the
+tree catalog or the plantings of one account. Writers ``bump`` the scopes
+they touch; readers build an ETag and ``Last-Modified`` from ``lookup`` with
+a single primary-key query instead of running their list query.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from .models import ScopeVersion
+
+__all__ = [
+    'Validators',
+    'acurrent',
+    'alookup',
+    'bump',
+    'current',
+    'lookup',
+]
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime | None
+
+
+def bump(*scopes: str) -> None:
+    """Advance the version of every scope; call inside the write."""
+    now = timezone.now()
+    # Sorted scopes keep the row-lock order stable between transactions.
+    for scope in sorted(set(scopes)):
+        updated = ScopeVersion.objects.filter(scope=scope).update(
+            version=F('version') + 1, modified=now
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                ScopeVersion.objects.create(
+                    scope=scope, version=1, modified=now
+                )
+        except IntegrityError:
+            # A concurrent transaction created the row first.
+            ScopeVersion.objects.filter(scope=scope).update(
+                version=F('version') + 1, modified=now
+            )
+
+
+def current(scope: str) -> tuple[int, datetime | None]:
+    """Return the version and modification time of *scope*."""
+    row = _rows([scope]).values_list('version', 'modified').first()
+    return row or (0, None)
+
+
+async def acurrent(scope: str) -> tuple[int, datetime | None]:
+    """Async variant of ``current``."""
+    row = await _rows([scope]).values_list('version', 'modified').afirst()
+    return row or (0, None)
+
+
+def lookup(scopes: Iterable[str], *variant: object) -> Validators:
+    """
+    Return validators for data depending on *scopes*.
+
+    Everything else the representation depends on (URL, media type, ...)
+    goes in *variant*. Scopes never bumped count as version 0.
+    """
+    scopes = sorted(set(scopes))
+    rows = _rows(scopes).values_list('scope', 'version', 'modified')
+    return _validators(scopes, rows, variant)
+
+
+async def alookup(scopes: Iterable[str], *variant: object) -> Validators:
+    """Async variant of ``lookup``."""
+    scopes = sorted(set(scopes))
+    rows = _rows(scopes).values_list('scope', 'version', 'modified')
+    return _validators(scopes, [row async for row in rows], variant)
+
+
+def _rows(scopes: list[str]) -> QuerySet[ScopeVersion]:
+    return ScopeVersion.objects.filter(scope__in=scopes)
+
+
+def _validators(
+    scopes: list[str],
+    rows: Iterable[tuple[str, int, datetime]],
+    variant: tuple[object, ...],
+) -> Validators:
+    versions = dict.fromkeys(scopes, (0, None))
+    versions.update(
+        (scope, (version, modified)) for scope, version, modified in rows
+    )
+    digest = hashlib.sha256()
+    for scope in scopes:
+        digest.update(f'{scope}={versions[scope][0]};'.encode())
+    for part in variant:
+        digest.update(f'{part};'.encode())
+    modified = [stamp for _, stamp in versions.values() if stamp is not None]
+    return Validators(
+        etag=f'"{digest.hexdigest()[:32]}"',
+        last_modified=(
+            max(modified) if len(modified) == len(versions) else None
+        ),
+    )
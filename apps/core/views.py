@@ -1,2 +1,68 @@
+import hmac
+import re
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.request import Request
+
+from . import metrics as registry
+from . import schema
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Serve the Prometheus metrics.
+
+    With ``METRICS_TOKEN`` set, scrapes must send it as a bearer token.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        given = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(given.encode(), expected.encode()):
+            return HttpResponse(status=401)
+    return HttpResponse(registry.export(), content_type=CONTENT_TYPE_LATEST)
+
+
+class SchemaView(SpectacularAPIView):
+    """
+    Serve the pre-generated schema (see ``apps.core.schema``) from memory.
+
+    Responses are gzipped for clients accepting it and carry an ETag per
+    encoding.
+    Requests for another ``lang`` or ``version`` are generated as usual.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(
+        self, request: Request, *args: tuple, **kwargs: dict
+    ) -> HttpResponseBase:
+        if request.GET.get('lang') or request.GET.get('version'):
+            return super().get(request, *args, **kwargs)
+
+        renderer, media_type = self.perform_content_negotiation(request)
+        document = schema.document(renderer.format)
+        compress = ACCEPTS_GZIP.search(
+            request.headers.get('Accept-Encoding', '')
+        )
+        # Each encoding is a different representation, with its own ETag.
+        etag = f'{document.etag[:-1]}-gz"' if compress else document.etag
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                document.gzipped if compress else document.content,
+                content_type=media_type,
+            )
+            if compress:
+                response['Content-Encoding'] = 'gzip'
+            response['Content-Disposition'] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        return response
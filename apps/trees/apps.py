@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TreesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.trees'
+
+    def ready(self) -> None:  # noqa: PLR6301
+        from . import signals  # noqa: F401, PLC0415
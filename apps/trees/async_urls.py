@@ -0,0 +1,40 @@
+"""
+Async variants of the read endpoints, mounted under ``/api/async/``.
+
+URL names match ``apps.trees.urls`` so a client (or a proxy rule) can move
+one endpoint at a time from the sync to the async implementation.
+"""
+
+from django.urls import path
+
+from . import async_views
+
+app_name = 'trees-async'
+
+urlpatterns = [
+    path(
+        'trees/',
+        async_views.AsyncTreeListView.as_view(),
+        name='tree-list-create',
+    ),
+    path(
+        'trees/<uuid:pk>/',
+        async_views.AsyncTreeDetailView.as_view(),
+        name='tree-detail',
+    ),
+    path(
+        'trees-planted/my/',
+        async_views.AsyncPlantedTreeListByUserView.as_view(),
+        name='planted-tree-list-by-user',
+    ),
+    path(
+        'trees-planted/accounts/',
+        async_views.AsyncPlantedTreeListByAccountsView.as_view(),
+        name='planted-tree-list-by-accounts',
+    ),
+    path(
+        'trees-planted/<uuid:pk>/',
+        async_views.AsyncPlantedTreeDetailView.as_view(),
+        name='planted-tree-detail',
+    ),
+]
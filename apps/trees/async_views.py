@@ -0,0 +1,241 @@
+"""
+Async (ASGI) variants of the read endpoints.
+
+These views serve the same JSON as their DRF counterparts in
+``apps.trees.views`` but never hold a worker thread while waiting on the
+database or the client: authentication, permission checks, the conditional
+GET lookup and the queries all go through Django's async ORM and cache
+APIs. They are mounted by ``apps.trees.async_urls`` under ``/api/async/``
+with the same URL names, so each endpoint can be switched per URL.
+
+Only JSON is rendered; the browsable API stays on the sync views.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from apps.core import versions
+from apps.users import membership
+
+from . import catalog, services
+from .models import PlantedTree, Tree
+from .pagination import PlantedTreeCursorPagination
+from .serializers import PlantedTreeSerializer, TreeSerializer
+
+CHUNK_SIZE = 2000
+
+
+class AsyncAPIView(View):
+    """
+    Read-only async view with DRF authentication and error responses.
+
+    Authenticators from ``DEFAULT_AUTHENTICATION_CLASSES`` that implement
+    ``aauthenticate`` are awaited directly; the others run in a thread.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    renderer = JSONRenderer()
+
+    async def dispatch(
+        self, request: HttpRequest, *args: tuple, **kwargs: dict
+    ) -> HttpResponse:
+        self.drf_request = Request(request)
+        self.authenticators = [
+            authentication()
+            for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ]
+        try:
+            request.user = await self.authenticate()
+            if not request.user.is_authenticated:
+                raise exceptions.NotAuthenticated
+            return await super().dispatch(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            return self.handle_exception(exc)
+
+    async def authenticate(self) -> Model | AnonymousUser:
+        for authenticator in self.authenticators:
+            if hasattr(authenticator, 'aauthenticate'):
+                result = await authenticator.aauthenticate(self.request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(
+                    self.drf_request
+                )
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
+
+    def handle_exception(self, exc: Exception) -> HttpResponse:
+        response = exception_handler(exc, {'view': self})
+        status = response.status_code
+        headers = {
+            name: response[name]
+            for name in ('WWW-Authenticate', 'Retry-After')
+            if response.has_header(name)
+        }
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            header = self.authenticators[0].authenticate_header(
+                self.drf_request
+            )
+            if header:
+                headers['WWW-Authenticate'] = header
+            else:
+                status = exceptions.PermissionDenied.status_code
+        return self.render(response.data, status=status, headers=headers)
+
+    def render(
+        self,
+        data: Any,  # noqa: ANN401
+        status: int = 200,
+        headers: dict[str, str] | None = None,
+    ) -> HttpResponse:
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            headers=headers,
+            content_type=self.renderer.media_type,
+        )
+
+
+class AsyncListView(AsyncAPIView):
+    """
+    Async list endpoint with the same conditional GET and opt-in keyset
+    pagination as the sync views.
+    """
+
+    serializer_class: type
+    pagination_class: type | None = None
+
+    async def get_queryset(self) -> QuerySet:
+        raise NotImplementedError
+
+    async def get_version_scopes(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        validators = await versions.alookup(
+            await self.get_version_scopes(),
+            request.get_full_path(),
+            self.renderer.media_type,
+        )
+        last_modified = validators.last_modified
+        response = get_conditional_response(
+            request,
+            etag=validators.etag,
+            last_modified=(
+                int(last_modified.timestamp()) if last_modified else None
+            ),
+        )
+        if response is None:
+            response = self.render(await self.list())
+
+        response['ETag'] = validators.etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    async def list(self) -> Any:  # noqa: ANN401
+        queryset = await self.get_queryset()
+        if self.pagination_class is not None:
+            paginator = self.pagination_class()
+            page = await paginator.apaginate_queryset(
+                queryset, self.drf_request
+            )
+            if page is not None:
+                return paginator.get_paginated_data(
+                    self.serializer_class(page, many=True).data
+                )
+        instances = [
+            instance
+            async for instance in queryset.aiterator(chunk_size=CHUNK_SIZE)
+        ]
+        return self.serializer_class(instances, many=True).data
+
+
+class AsyncTreeListView(AsyncListView):
+    serializer_class = TreeSerializer
+
+    async def get_queryset(self) -> QuerySet[Tree]:  # noqa: PLR6301
+        return Tree.objects.all()
+
+    async def get_version_scopes(self) -> list[str]:  # noqa: PLR6301
+        return [catalog.CATALOG_SCOPE]
+
+
+class AsyncTreeDetailView(AsyncAPIView):
+    async def get(self, request: HttpRequest, pk: UUID) -> HttpResponse:
+        try:
+            tree = await Tree.objects.aget(pk=pk)
+        except Tree.DoesNotExist:
+            raise Http404 from None
+        return self.render(TreeSerializer(tree).data)
+
+
+class AsyncPlantedTreeListByUserView(AsyncListView):
+    serializer_class = PlantedTreeSerializer
+    pagination_class = PlantedTreeCursorPagination
+
+    async def get_queryset(self) -> QuerySet[PlantedTree]:
+        return PlantedTree.objects.for_user(self.request.user).with_details()
+
+    async def get_version_scopes(self) -> list[str]:
+        account_ids = await membership.aget_account_ids(self.request.user)
+        return [
+            catalog.CATALOG_SCOPE,
+            services.user_scope(self.request.user.pk),
+            membership.user_scope(self.request.user.pk),
+            *map(membership.account_scope, account_ids),
+        ]
+
+
+class AsyncPlantedTreeListByAccountsView(AsyncListView):
+    serializer_class = PlantedTreeSerializer
+    pagination_class = PlantedTreeCursorPagination
+
+    async def get_queryset(self) -> QuerySet[PlantedTree]:
+        account_ids = await membership.aget_account_ids(self.request.user)
+        return PlantedTree.objects.for_accounts(account_ids).with_details()
+
+    async def get_version_scopes(self) -> list[str]:
+        account_ids = await membership.aget_account_ids(self.request.user)
+        return [
+            catalog.CATALOG_SCOPE,
+            membership.user_scope(self.request.user.pk),
+            *map(services.account_scope, account_ids),
+            *map(membership.account_scope, account_ids),
+        ]
+
+
+class AsyncPlantedTreeDetailView(AsyncAPIView):
+    async def get(self, request: HttpRequest, pk: UUID) -> HttpResponse:
+        try:
+            planted_tree = await PlantedTree.objects.with_details().aget(pk=pk)
+        except PlantedTree.DoesNotExist:
+            raise Http404 from None
+        # Same rule as apps.core.permissions.IsOwner.
+        if planted_tree.user_id != request.user.pk:
+            raise exceptions.PermissionDenied
+        return self.render(PlantedTreeSerializer(planted_tree).data)
@@ -0,0 +1,272 @@
+"""
+Whole-batch validation of bulk plantings.
+
+Running DRF fields and validators item by item costs more than the insert
+itself for large batches. Here a batch is checked column by column:
+``parse`` turns the raw ``tree_id``/``latitude``/``longitude`` values of a
+request into ``UUID``/``Decimal`` columns, checking types, precision and
+ranges in one pass per column, and ``check`` finds exact repeats of
+``(tree, latitude, longitude)``, inside the batch and among the plantings
+the account made in the last ``TREES_DUPLICATE_WINDOW`` seconds (one
+query). Errors are index-aligned, like DRF ``many=True`` errors: one dict
+per item, empty for valid items.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from datetime import timedelta
+from decimal import Decimal, DecimalException
+from typing import Any
+from uuid import UUID
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from apps.users.models import Account
+
+from .models import PlantedTree, Tree
+from .validators import (
+    MAX_LATITUDE,
+    MAX_LONGITUDE,
+    MIN_LATITUDE,
+    MIN_LONGITUDE,
+    range_message,
+)
+
+__all__ = ['Errors', 'InvalidPlantings', 'check', 'parse']
+
+MAX_DIGITS = 9
+DECIMAL_PLACES = 6
+MAX_WHOLE_DIGITS = MAX_DIGITS - DECIMAL_PLACES
+MAX_STRING_LENGTH = 1000
+
+Errors = list[dict[str, list[str]]]
+Plant = tuple[Tree, tuple[Decimal, Decimal]]
+
+_MISSING = object()
+_INFINITIES = (Decimal('Inf'), Decimal('-Inf'))
+_QUANTUM = Decimal(1).scaleb(-DECIMAL_PLACES)
+
+
+class InvalidPlantings(ValueError):  # noqa: N818
+    """Raised by ``services.plant_trees`` with the per-item ``errors``."""
+
+    def __init__(self, errors: Errors) -> None:
+        super().__init__('Some plantings are invalid.')
+        self.errors = errors
+
+
+class _Invalid(Exception):  # noqa: N818
+    pass
+
+
+def _message(field: type[serializers.Field], key: str, **kwargs: Any) -> str:  # noqa: ANN401
+    messages = {}
+    for klass in reversed(field.__mro__):
+        messages.update(getattr(klass, 'default_error_messages', {}))
+    return str(messages[key]).format(**kwargs)
+
+
+def _to_uuid(value: Any) -> UUID:  # noqa: ANN401
+    if isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        raise _Invalid(_message(serializers.UUIDField, 'invalid')) from None
+
+
+def _to_decimal(value: Any) -> Decimal:  # noqa: ANN401
+    """Parse like ``DecimalField(max_digits=9, decimal_places=6)``."""
+    if isinstance(value, Decimal):
+        number = value
+    else:
+        text = str(value).strip()
+        if len(text) > MAX_STRING_LENGTH:
+            raise _Invalid(
+                _message(serializers.DecimalField, 'max_string_length')
+            )
+        try:
+            number = Decimal(text)
+        except DecimalException:
+            number = None
+    if number is None or number.is_nan() or number in _INFINITIES:
+        raise _Invalid(_message(serializers.DecimalField, 'invalid'))
+
+    _, digits, exponent = number.as_tuple()
+    if exponent >= 0:
+        total, places = len(digits) + exponent, 0
+    else:
+        places = -exponent
+        total = max(len(digits), places)
+    if total > MAX_DIGITS:
+        raise _Invalid(
+            _message(
+                serializers.DecimalField, 'max_digits', max_digits=MAX_DIGITS
+            )
+        )
+    if places > DECIMAL_PLACES:
+        raise _Invalid(
+            _message(
+                serializers.DecimalField,
+                'max_decimal_places',
+                max_decimal_places=DECIMAL_PLACES,
+            )
+        )
+    if total - places > MAX_WHOLE_DIGITS:
+        raise _Invalid(
+            _message(
+                serializers.DecimalField,
+                'max_whole_digits',
+                max_whole_digits=MAX_WHOLE_DIGITS,
+            )
+        )
+    return number.quantize(_QUANTUM)
+
+
+def _column(
+    items: Sequence[dict],
+    name: str,
+    convert: Callable[[Any], Any],
+    errors: Errors,
+) -> list[Any]:
+    """Convert the *name* values of *items*; ``None`` where invalid."""
+    required = _message(serializers.Field, 'required')
+    null = _message(serializers.Field, 'null')
+    values = []
+    for index, item in enumerate(items):
+        value = item.get(name, _MISSING)
+        try:
+            if value is _MISSING:
+                raise _Invalid(required)  # noqa: TRY301
+            if value is None:
+                raise _Invalid(null)  # noqa: TRY301
+            values.append(convert(value))
+        except _Invalid as exc:
+            errors[index][name] = [str(exc)]
+            values.append(None)
+    return values
+
+
+def _check_range(
+    name: str,
+    values: Sequence[Decimal | None],
+    bounds: tuple[Decimal, Decimal],
+    errors: Errors,
+) -> None:
+    low, high = bounds
+    for index, value in enumerate(values):
+        if value is not None and not low <= value <= high:
+            errors[index][name] = [range_message(value, low, high)]
+
+
+def parse(items: Any) -> tuple[list[dict[str, Any]], Errors]:  # noqa: ANN401
+    """
+    Validate the raw items of a bulk request, column by column.
+
+    Returns ``{'tree_id', 'latitude', 'longitude'}`` dicts and the
+    per-item errors; the dicts of invalid items are incomplete.
+    """
+    errors: Errors = [{} for _ in items]
+    records = [item if isinstance(item, dict) else {} for item in items]
+    tree_ids = _column(records, 'tree_id', _to_uuid, errors)
+    latitudes = _column(records, 'latitude', _to_decimal, errors)
+    longitudes = _column(records, 'longitude', _to_decimal, errors)
+    _check_range('latitude', latitudes, (MIN_LATITUDE, MAX_LATITUDE), errors)
+    _check_range(
+        'longitude', longitudes, (MIN_LONGITUDE, MAX_LONGITUDE), errors
+    )
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    _message(
+                        serializers.Serializer,
+                        'invalid',
+                        datatype=type(item).__name__,
+                    )
+                ]
+            }
+
+    plants = [
+        {'tree_id': tree_id, 'latitude': latitude, 'longitude': longitude}
+        for tree_id, latitude, longitude in zip(
+            tree_ids, latitudes, longitudes, strict=True
+        )
+    ]
+    return plants, errors
+
+
+def _recent_keys(
+    account: Account,
+    latitudes: Sequence[Decimal],
+    longitudes: Sequence[Decimal],
+    window: int,
+) -> set[tuple[UUID, Decimal, Decimal]]:
+    """Return the keys planted for *account* in the batch's bounding box."""
+    rows = (
+        PlantedTree.objects
+        .filter(
+            account=account,
+            planted_at__gte=timezone.now() - timedelta(seconds=window),
+            latitude__range=(min(latitudes), max(latitudes)),
+            longitude__range=(min(longitudes), max(longitudes)),
+        )
+        .order_by()
+        .values_list('tree_id', 'latitude', 'longitude')
+    )
+    return set(rows)
+
+
+def check(
+    account: Account,
+    plants: Sequence[Plant],
+    *,
+    duplicates: bool = True,
+) -> Errors | None:
+    """
+    Check ``(tree, (latitude, longitude))`` plants before they are inserted.
+
+    Coordinates are range-checked again, so direct callers of the services
+    are covered too. With *duplicates*, repeats inside the batch and of
+    the account's recent plantings are rejected. Returns the per-item
+    errors, or ``None`` when the batch is clean.
+    """
+    errors: Errors = [{} for _ in plants]
+    latitudes = [plant[1][0] for plant in plants]
+    longitudes = [plant[1][1] for plant in plants]
+    _check_range('latitude', latitudes, (MIN_LATITUDE, MAX_LATITUDE), errors)
+    _check_range(
+        'longitude', longitudes, (MIN_LONGITUDE, MAX_LONGITUDE), errors
+    )
+
+    window = settings.TREES_DUPLICATE_WINDOW
+    if duplicates and plants:
+        keys = [
+            (plant[0].pk, latitude, longitude)
+            for plant, latitude, longitude in zip(
+                plants, latitudes, longitudes, strict=True
+            )
+        ]
+        recent = (
+            _recent_keys(account, latitudes, longitudes, window)
+            if window > 0
+            else set()
+        )
+        first: dict[tuple[UUID, Decimal, Decimal], int] = {}
+        for index, key in enumerate(keys):
+            if key in recent:
+                message = 'This tree was already planted here recently.'
+            elif key in first:
+                message = f'Duplicate of item {first[key]}.'
+            else:
+                first[key] = index
+                continue
+            errors[index].setdefault(
+                api_settings.NON_FIELD_ERRORS_KEY, []
+            ).append(message)
+
+    return errors if any(errors) else None
@@ -0,0 +1,282 @@
+"""
+Micro-benchmarks of the planting hot paths.
+
+Each benchmark is registered with ``@benchmark`` as a setup function that
+receives a ``Fixture`` and returns the callable to time. ``run`` times every
+selected benchmark ``repeat`` times and returns plain dicts, ready to be
+dumped as JSON by the ``run_benchmarks`` command.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import statistics
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.db.models import Count, QuerySet
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.core.serializers import Fieldset
+from apps.users import membership
+from apps.users.models import Account, User
+
+from . import batch, services
+from .models import PlantedTree, Tree
+from .serializers import (
+    PlantedTreeItemSerializer,
+    PlantedTreeRowSerializer,
+    PlantedTreeSerializer,
+)
+
+__all__ = ['BENCHMARKS', 'ROWS', 'Fixture', 'benchmark', 'run', 'select']
+
+PLANT_TREES_BATCH_SIZES = (1, 10, 100, 1000)
+SERIALIZER_ROWS = 500
+SPARSE_FIELDS = 'id,latitude,longitude,tree'
+ASGI_CONCURRENCY = (1, 50)
+ASGI_ENDPOINTS = ('tree-list-create', 'planted-tree-list-by-user')
+ASGI_PAGE_SIZE = 100
+VALIDATION_ITEMS = 10_000
+
+
+@dataclass
+class Fixture:
+    """The data a benchmark works on: the busiest user and their account."""
+
+    user: User
+    account: Account
+    tree: Tree
+
+    @classmethod
+    def busiest(cls) -> Fixture:
+        """Pick the user with the most plantings, and their top account."""
+        top = (
+            PlantedTree.objects
+            .order_by()
+            .values('user_id', 'account_id')
+            .annotate(total=Count('id'))
+            .order_by('-total', 'user_id', 'account_id')
+            .first()
+        )
+        if top is None:
+            msg = 'No planted trees to benchmark; run seed_trees first.'
+            raise LookupError(msg)
+        return cls(
+            user=User.objects.get(pk=top['user_id']),
+            account=Account.objects.get(pk=top['account_id']),
+            tree=Tree.objects.order_by('pk').first(),
+        )
+
+
+Setup = Callable[[Fixture], Callable[[], object]]
+BENCHMARKS: dict[str, Setup] = {}
+# Rows processed per call, for the benchmarks that report throughput.
+ROWS: dict[str, int] = {}
+
+
+def benchmark(name: str, rows: int | None = None) -> Callable[[Setup], Setup]:
+    """Register a benchmark setup function under *name*."""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        if rows is not None:
+            ROWS[name] = rows
+        return setup
+
+    return register
+
+
+@benchmark('services.plant_tree')
+def plant_tree(fixture: Fixture) -> Callable[[], object]:
+    return lambda: services.plant_tree(
+        user=fixture.user,
+        account=fixture.account,
+        tree=fixture.tree,
+        latitude=Decimal('-23.550520'),
+        longitude=Decimal('-46.633308'),
+    )
+
+
+def _plant_trees(batch_size: int) -> Setup:
+    def setup(fixture: Fixture) -> Callable[[], object]:
+        plants = [
+            (fixture.tree, (Decimal('-23.550520'), Decimal('-46.633308')))
+        ] * batch_size
+        return lambda: services.plant_trees(
+            user=fixture.user, account=fixture.account, plants=plants
+        )
+
+    return setup
+
+
+for _batch_size in PLANT_TREES_BATCH_SIZES:
+    benchmark(f'services.plant_trees[{_batch_size}]')(
+        _plant_trees(_batch_size)
+    )
+
+
+def _serializer_rows(fixture: Fixture) -> QuerySet[PlantedTree]:
+    return PlantedTree.objects.for_accounts([fixture.account]).with_details()[
+        :SERIALIZER_ROWS
+    ]
+
+
+@benchmark('serializers.PlantedTreeSerializer.many', rows=SERIALIZER_ROWS)
+def serialize_planted_trees(fixture: Fixture) -> Callable[[], object]:
+    # Rows are loaded once: only rendering is timed.
+    planted_trees = list(_serializer_rows(fixture))
+    return lambda: PlantedTreeSerializer(planted_trees, many=True).data
+
+
+@benchmark(
+    'serializers.PlantedTreeSerializer.many[sparse]', rows=SERIALIZER_ROWS
+)
+def serialize_sparse_planted_trees(fixture: Fixture) -> Callable[[], object]:
+    planted_trees = list(_serializer_rows(fixture))
+    request = Request(APIRequestFactory().get('/', {'fields': SPARSE_FIELDS}))
+    return lambda: (
+        PlantedTreeSerializer(
+            planted_trees, many=True, context={'request': request}
+        ).data
+    )
+
+
+@benchmark('serializers.PlantedTreeRowSerializer.many', rows=SERIALIZER_ROWS)
+def serialize_planted_tree_rows(fixture: Fixture) -> Callable[[], object]:
+    serializer = PlantedTreeRowSerializer(
+        Fieldset(fields=tuple(SPARSE_FIELDS.split(',')), expand=frozenset())
+    )
+    rows = list(_serializer_rows(fixture).values(*serializer.lookups))
+    return lambda: serializer.render(rows)
+
+
+def _bulk_items(fixture: Fixture) -> list[dict[str, str]]:
+    return [
+        {
+            'tree_id': str(fixture.tree.pk),
+            'latitude': f'{index % 179 - 89}.{index:06d}',
+            'longitude': f'{index % 359 - 179}.{index * 7 % 10**6:06d}',
+        }
+        for index in range(VALIDATION_ITEMS)
+    ]
+
+
+@benchmark('validation.bulk.per_item', rows=VALIDATION_ITEMS)
+def validate_bulk_per_item(fixture: Fixture) -> Callable[[], object]:
+    # What PlantedTreeItemSerializer(many=True) did before apps.trees.batch.
+    items = _bulk_items(fixture)
+    return lambda: serializers.ListSerializer(
+        child=PlantedTreeItemSerializer(), data=items
+    ).is_valid(raise_exception=True)
+
+
+@benchmark('validation.bulk.batch', rows=VALIDATION_ITEMS)
+def validate_bulk_batch(fixture: Fixture) -> Callable[[], object]:
+    items = _bulk_items(fixture)
+    return lambda: batch.parse(items)
+
+
+@benchmark('validation.bulk.check', rows=VALIDATION_ITEMS)
+def check_bulk_batch(fixture: Fixture) -> Callable[[], object]:
+    items, _ = batch.parse(_bulk_items(fixture))
+    plants = [
+        (fixture.tree, (item['latitude'], item['longitude'])) for item in items
+    ]
+    return lambda: batch.check(fixture.account, plants)
+
+
+@benchmark('managers.for_user')
+def for_user(fixture: Fixture) -> Callable[[], object]:
+    return lambda: list(PlantedTree.objects.for_user(fixture.user))
+
+
+@benchmark('managers.for_accounts')
+def for_accounts(fixture: Fixture) -> Callable[[], object]:
+    account_ids = membership.get_account_ids(fixture.user)
+    return lambda: list(PlantedTree.objects.for_accounts(account_ids))
+
+
+def _asgi(namespace: str, url_name: str, concurrency: int) -> Setup:
+    def setup(fixture: Fixture) -> Callable[[], object]:
+        token, _ = Token.objects.get_or_create(user=fixture.user)
+        url = reverse(f'{namespace}:{url_name}')
+        headers = {'Authorization': f'Bearer {token.key}'}
+        data = {'page_size': ASGI_PAGE_SIZE}
+
+        async def fire() -> None:
+            client = AsyncClient()
+            await asyncio.gather(
+                *(
+                    client.get(url, data, headers=headers)
+                    for _ in range(concurrency)
+                )
+            )
+
+        return async_to_sync(fire)
+
+    return setup
+
+
+# Concurrent requests through the ASGI handler, in process: compares how the
+# sync and async views behave under load, not the server in front of them.
+for _url_name in ASGI_ENDPOINTS:
+    for _concurrency in ASGI_CONCURRENCY:
+        for _label, _namespace in (
+            ('sync', 'trees'),
+            ('async', 'trees-async'),
+        ):
+            benchmark(f'asgi.{_label}.{_url_name}[c={_concurrency}]')(
+                _asgi(_namespace, _url_name, _concurrency)
+            )
+
+
+def select(patterns: Iterable[str] = ()) -> list[str]:
+    """Return the registered names matching any of the glob *patterns*."""
+    patterns = list(patterns) or ['*']
+    return [
+        name
+        for name in BENCHMARKS
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+def run(
+    fixture: Fixture,
+    names: Iterable[str],
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+) -> list[dict[str, object]]:
+    """Time each benchmark; durations are in seconds per call."""
+    results = []
+    for name in names:
+        target = BENCHMARKS[name](fixture)
+        for _ in range(warmup):
+            target()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            target()
+            timings.append(time.perf_counter() - started)
+        result = {
+            'name': name,
+            'repeat': repeat,
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.fmean(timings),
+            'stdev': statistics.stdev(timings) if repeat > 1 else 0.0,
+        }
+        if name in ROWS:
+            result['rows_per_second'] = ROWS[name] / result['median']
+        results.append(result)
+    return results
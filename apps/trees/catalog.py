@@ -0,0 +1,165 @@
+"""
+In-process snapshot of the ``Tree`` catalog.
+
+The catalog is small and rarely changes, yet every planting has to check
+its tree reference. ``snapshot()`` keeps an immutable copy of the table,
+keyed by id and by name, tagged with the ``trees:catalog`` scope version
+(see ``apps.core.versions``). Saving or deleting a ``Tree`` drops the copy
+of this process (``apps.trees.signals``); other processes notice the new
+version within ``TREES_CATALOG_RECHECK_INTERVAL`` seconds, or immediately
+when asked for an id they do not know.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable
+from types import MappingProxyType
+from typing import Any
+from uuid import UUID
+
+from django.conf import settings
+from django.db import router, transaction
+
+from apps.core import versions
+
+from .models import Tree
+
+__all__ = [
+    'Snapshot',
+    'TreeEntry',
+    'get',
+    'get_by_name',
+    'invalidate',
+    'resolve',
+    'snapshot',
+]
+
+CATALOG_SCOPE = 'trees:catalog'
+FIELDS = ('id', 'name', 'scientific_name')
+
+
+class TreeEntry:
+    """Read-only copy of a ``Tree`` row."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, id: UUID, name: str, scientific_name: str) -> None:  # noqa: A002
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'scientific_name', scientific_name)
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        msg = 'TreeEntry is immutable'
+        raise AttributeError(msg)
+
+    def __repr__(self) -> str:
+        return f'TreeEntry({self.id}, {self.name!r})'
+
+    def to_model(self) -> Tree:
+        """Return a fresh ``Tree`` instance, as if loaded from the DB."""
+        return Tree.from_db(
+            router.db_for_read(Tree),
+            FIELDS,
+            (self.id, self.name, self.scientific_name),
+        )
+
+
+class Snapshot:
+    """The catalog at one scope version."""
+
+    __slots__ = ('by_id', 'by_name', 'version')
+
+    def __init__(
+        self, version: tuple[int, Any], entries: Iterable[TreeEntry]
+    ) -> None:
+        entries = list(entries)
+        self.version = version
+        self.by_id = MappingProxyType({entry.id: entry for entry in entries})
+        self.by_name = MappingProxyType({
+            entry.name: entry for entry in entries
+        })
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+_lock = threading.Lock()
+_snapshot: Snapshot | None = None
+_checked_at = 0.0
+
+
+def _load() -> Snapshot:
+    # Version first: a concurrent write can only make the rows newer than
+    # the version, which the next check then reloads.
+    version = versions.current(CATALOG_SCOPE)
+    rows = Tree.objects.order_by().values_list(*FIELDS)
+    return Snapshot(version, (TreeEntry(*row) for row in rows))
+
+
+def snapshot(*, recheck: bool = False) -> Snapshot:
+    """
+    Return the current catalog snapshot.
+
+    The version is checked against the database at most every
+    ``TREES_CATALOG_RECHECK_INTERVAL`` seconds, or now with *recheck*.
+    """
+    global _snapshot, _checked_at  # noqa: PLW0603
+    current, checked_at = _snapshot, _checked_at
+    now = time.monotonic()
+    interval = settings.TREES_CATALOG_RECHECK_INTERVAL
+    if current is not None and not recheck and now - checked_at < interval:
+        return current
+
+    with _lock:
+        if _snapshot is not None and _snapshot is not current:
+            return _snapshot  # another thread refreshed it
+        if current is None or versions.current(CATALOG_SCOPE) != (
+            current.version
+        ):
+            current = _load()
+        _snapshot, _checked_at = current, now
+        return current
+
+
+def invalidate() -> None:
+    """Drop this process's snapshot, now and when the transaction ends."""
+    global _snapshot  # noqa: PLW0603
+    _snapshot = None
+    transaction.on_commit(_drop)
+
+
+def _drop() -> None:
+    global _snapshot  # noqa: PLW0603
+    _snapshot = None
+
+
+def get(tree_id: UUID) -> TreeEntry | None:
+    """Return the entry of *tree_id*; unknown ids trigger a recheck."""
+    entry = snapshot().by_id.get(tree_id)
+    if entry is None:
+        entry = snapshot(recheck=True).by_id.get(tree_id)
+    return entry
+
+
+def get_by_name(name: str) -> TreeEntry | None:
+    return snapshot().by_name.get(name)
+
+
+def resolve(tree_ids: Iterable[UUID]) -> dict[UUID, Tree]:
+    """
+    Map every known id of *tree_ids* to a ``Tree`` instance.
+
+    Like ``Tree.objects.in_bulk`` but without a query, unless an id is
+    missing from the snapshot, which triggers one recheck.
+    """
+    tree_ids = set(tree_ids)
+    by_id = snapshot().by_id
+    if not tree_ids <= by_id.keys():
+        by_id = snapshot(recheck=True).by_id
+    return {
+        tree_id: by_id[tree_id].to_model()
+        for tree_id in tree_ids
+        if tree_id in by_id
+    }
@@ -0,0 +1,303 @@
+"""
+Per-zoom grid aggregates of plantings, for clustered map views.
+
+For every zoom of ``ZOOMS`` the globe is cut into square cells of
+``cell_size(zoom)`` microdegrees (``CELLS_PER_TILE`` cells along the side
+of a web map tile at that zoom), and ``PlantingClusterCell`` keeps the count
+and coordinate sums of each account's plantings of each species per cell.
+Like ``apps.trees.stats``, the planting services update the cells in their
+transaction, a ``post_delete`` receiver takes deleted plantings out, and
+``rebuild_planting_clusters`` recomputes everything. A zoomed-out map then
+reads a few hundred cells instead of every planting; boxes spanning more
+than ``MAX_CELLS`` cells of the zoom asked for are refused.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import NamedTuple
+from uuid import UUID
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    Expression,
+    F,
+    IntegerField,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Least, Round
+
+from . import geo, stats
+from .models import PlantedTree, PlantingClusterCell
+
+__all__ = [
+    'MAX_CELLS',
+    'ZOOMS',
+    'Cluster',
+    'cell_count',
+    'cell_size',
+    'forget_plantings',
+    'level',
+    'rebuild',
+    'record_plantings',
+    'within',
+]
+
+ZOOMS = (2, 5, 8, 11, 14)
+CELLS_PER_TILE = 8
+# Cells one request may cover: a 4K screen of tiles at any zoom.
+MAX_CELLS = 16_384
+# Cell keys per locking read, well below SQLite's expression depth limit.
+LOCK_CHUNK_SIZE = 250
+
+_KEY = ('account_id', 'zoom', 'row', 'column', 'tree_id')
+_SUMS = ('count', 'latitude_sum', 'longitude_sum')
+
+
+class Cluster(NamedTuple):
+    """Plantings of one cell: centroid, total and count per tree id."""
+
+    latitude: float
+    longitude: float
+    count: int
+    species: dict[UUID, int]
+
+
+def cell_size(zoom: int) -> int:
+    """Return the side of the cells of *zoom*, in microdegrees."""
+    return 360 * geo.MICRODEGREES // (CELLS_PER_TILE << zoom)
+
+
+def _shape(zoom: int) -> tuple[int, int]:
+    size = cell_size(zoom)
+    return (
+        math.ceil(180 * geo.MICRODEGREES / size),
+        math.ceil(360 * geo.MICRODEGREES / size),
+    )
+
+
+def _cell(zoom: int, latitude: int, longitude: int) -> tuple[int, int]:
+    """Return the ``(row, column)`` of a coordinate in microdegrees."""
+    size = cell_size(zoom)
+    rows, columns = _shape(zoom)
+    return (
+        min((latitude + 90 * geo.MICRODEGREES) // size, rows - 1),
+        min((longitude + 180 * geo.MICRODEGREES) // size, columns - 1),
+    )
+
+
+def level(zoom: int) -> int:
+    """Return the stored zoom serving a map at *zoom*."""
+    return max(
+        (stored for stored in ZOOMS if stored <= zoom), default=ZOOMS[0]
+    )
+
+
+def _apply(planted_trees: Iterable[PlantedTree], sign: int) -> None:
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for planted_tree in planted_trees:
+        latitude = geo.to_microdegrees(planted_tree.latitude)
+        longitude = geo.to_microdegrees(planted_tree.longitude)
+        for zoom in ZOOMS:
+            row, column = _cell(zoom, latitude, longitude)
+            delta = deltas[
+                planted_tree.account_id,
+                zoom,
+                row,
+                column,
+                planted_tree.tree_id,
+            ]
+            delta[0] += 1
+            delta[1] += latitude
+            delta[2] += longitude
+
+    if not deltas:
+        return
+
+    # Only the cells touched are locked, in key order, with one locking
+    # read per LOCK_CHUNK_SIZE of them and one bulk write per call.
+    existing = []
+    for keys in itertools.batched(sorted(deltas), LOCK_CHUNK_SIZE):
+        cells = Q()
+        for key in keys:
+            cells |= Q(**dict(zip(_KEY, key, strict=True)))
+        existing.extend(
+            PlantingClusterCell.objects
+            .select_for_update()
+            .filter(cells)
+            .order_by(*_KEY)
+        )
+    changed = []
+    for cell in existing:
+        delta = deltas.pop(tuple(getattr(cell, name) for name in _KEY), None)
+        if delta is None:
+            continue
+        cell.count += sign * delta[0]
+        cell.latitude_sum += sign * delta[1]
+        cell.longitude_sum += sign * delta[2]
+        changed.append(cell)
+    PlantingClusterCell.objects.bulk_update(changed, _SUMS)
+    if sign < 0 or not deltas:
+        return
+
+    try:
+        with transaction.atomic():
+            PlantingClusterCell.objects.bulk_create(
+                PlantingClusterCell(
+                    **dict(zip(_KEY, key, strict=True)),
+                    **dict(zip(_SUMS, delta, strict=True)),
+                )
+                for key, delta in sorted(deltas.items())
+            )
+    except IntegrityError:
+        # A concurrent transaction created some of the cells first.
+        for key, (count, latitude_sum, longitude_sum) in sorted(
+            deltas.items()
+        ):
+            stats.increment(
+                PlantingClusterCell,
+                dict(zip(_KEY, key, strict=True)),
+                count,
+                latitude_sum=latitude_sum,
+                longitude_sum=longitude_sum,
+            )
+
+
+def record_plantings(planted_trees: Iterable[PlantedTree]) -> None:
+    """Add freshly inserted plantings to the cells."""
+    _apply(planted_trees, 1)
+
+
+def forget_plantings(planted_trees: Iterable[PlantedTree]) -> None:
+    """Remove deleted plantings from the cells."""
+    _apply(planted_trees, -1)
+
+
+def _microdegrees(field: str) -> Expression:
+    return Cast(Round(F(field) * geo.MICRODEGREES), BigIntegerField())
+
+
+def _index(field: str, offset: int, size: int, last: int) -> Expression:
+    return Least(
+        (_microdegrees(field) + offset * geo.MICRODEGREES) / size,
+        Value(last),
+        output_field=IntegerField(),
+    )
+
+
+@transaction.atomic
+def rebuild(batch_size: int = 2000) -> int:
+    """Recompute every cell from ``PlantedTree``; returns the cell count."""
+    PlantingClusterCell.objects.all().delete()
+    total = 0
+    for zoom in ZOOMS:
+        size = cell_size(zoom)
+        rows, columns = _shape(zoom)
+        cells = (
+            PlantedTree.objects
+            .order_by()
+            .values(
+                'account_id',
+                'tree_id',
+                row=_index('latitude', 90, size, rows - 1),
+                column=_index('longitude', 180, size, columns - 1),
+            )
+            .annotate(
+                count=Count('id'),
+                latitude_sum=Sum(_microdegrees('latitude')),
+                longitude_sum=Sum(_microdegrees('longitude')),
+            )
+        )
+        total += len(
+            PlantingClusterCell.objects.bulk_create(
+                (
+                    PlantingClusterCell(zoom=zoom, **cell)
+                    for cell in cells.iterator(chunk_size=batch_size)
+                ),
+                batch_size=batch_size,
+            )
+        )
+    return total
+
+
+def _window(
+    bbox: geo.BoundingBox, stored: int
+) -> tuple[tuple[int, int], list[tuple[int, int]]]:
+    """Return the row range and column ranges of *bbox* at *stored*."""
+    first_row, _ = _cell(stored, geo.to_microdegrees(bbox.south), 0)
+    last_row, _ = _cell(stored, geo.to_microdegrees(bbox.north), 0)
+    columns = []
+    for west, east in bbox.longitude_spans():
+        _, first = _cell(stored, 0, geo.to_microdegrees(west))
+        _, last = _cell(stored, 0, geo.to_microdegrees(east))
+        columns.append((first, last))
+    return (first_row, last_row), columns
+
+
+def cell_count(bbox: geo.BoundingBox, zoom: int) -> int:
+    """Return how many cells of the stored zoom serving *zoom* cover *bbox*."""
+    (first_row, last_row), columns = _window(bbox, level(zoom))
+    return (last_row - first_row + 1) * sum(
+        last - first + 1 for first, last in columns
+    )
+
+
+def within(
+    account_ids: Iterable[UUID], bbox: geo.BoundingBox, zoom: int
+) -> list[Cluster]:
+    """
+    Return the clusters of the accounts' plantings covering *bbox*.
+
+    Cells come from the stored zoom closest below *zoom*. Cells crossing
+    the edge of the box are returned whole. Callers keep the box within
+    ``MAX_CELLS`` cells (``ClusterQuerySerializer`` does).
+    """
+    stored = level(zoom)
+    (first_row, last_row), spans = _window(bbox, stored)
+    columns = Q()
+    for first, last in spans:
+        columns |= Q(column__range=(first, last))
+
+    cells = (
+        PlantingClusterCell.objects
+        .filter(
+            account__in=account_ids,
+            zoom=stored,
+            row__range=(first_row, last_row),
+            count__gt=0,
+        )
+        .filter(columns)
+        .order_by('row', 'column')
+        .values_list(
+            'row',
+            'column',
+            'tree_id',
+            'count',
+            'latitude_sum',
+            'longitude_sum',
+        )
+    )
+    totals = {}
+    for row, column, tree_id, count, latitude_sum, longitude_sum in cells:
+        total = totals.setdefault((row, column), [0, 0, 0, defaultdict(int)])
+        total[0] += count
+        total[1] += latitude_sum
+        total[2] += longitude_sum
+        total[3][tree_id] += count
+
+    return [
+        Cluster(
+            latitude=round(latitude_sum / count / geo.MICRODEGREES, 6),
+            longitude=round(longitude_sum / count / geo.MICRODEGREES, 6),
+            count=count,
+            species=dict(species),
+        )
+        for count, latitude_sum, longitude_sum, species in totals.values()
+    ]
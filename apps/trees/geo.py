@@ -0,0 +1,199 @@
+"""
+Fixed-grid spatial keys and great-circle helpers for planted trees.
+
+The globe is cut into ``CELL_SIZE_MICRODEGREES`` squares numbered row by row
+from the south-west corner, so a bounding box maps to one contiguous range
+of cell ids per grid row and can be pruned with a plain B-tree index on any
+database backend.
+"""
+
+from __future__ import annotations
+
+import math
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.db.models import Expression, F, FloatField, Q, Value
+from django.db.models.functions import (
+    ASin,
+    Cast,
+    Cos,
+    Least,
+    Power,
+    Radians,
+    Sin,
+    Sqrt,
+)
+
+__all__ = [
+    'EARTH_RADIUS_METERS',
+    'MAX_DISTANCE_METERS',
+    'BoundingBox',
+    'cell_filter',
+    'cell_ranges',
+    'coordinate_filter',
+    'distance_expression',
+    'grid_cell',
+    'haversine',
+    'radius_bbox',
+    'to_microdegrees',
+]
+
+EARTH_RADIUS_METERS = 6_371_008.8
+MAX_DISTANCE_METERS = math.pi * EARTH_RADIUS_METERS
+MICRODEGREES = 1_000_000
+CELL_SIZE_MICRODEGREES = 100_000  # 0.1°, roughly 11 km at the equator
+GRID_ROWS = 180 * MICRODEGREES // CELL_SIZE_MICRODEGREES
+GRID_COLUMNS = 360 * MICRODEGREES // CELL_SIZE_MICRODEGREES
+MAX_PRUNED_ROWS = 64
+
+
+class BoundingBox(NamedTuple):
+    """Box in degrees; ``west > east`` means it crosses the antimeridian."""
+
+    south: float
+    west: float
+    north: float
+    east: float
+
+    def longitude_spans(self) -> list[tuple[float, float]]:
+        if self.west <= self.east:
+            return [(self.west, self.east)]
+        return [(self.west, 180.0), (-180.0, self.east)]
+
+
+def to_microdegrees(value: Decimal | float) -> int:
+    """Return *value* degrees as an integer number of microdegrees."""
+    return int(Decimal(str(value)).scaleb(6).to_integral_value())
+
+
+def _row(latitude: Decimal | float) -> int:
+    row = (to_microdegrees(latitude) + 90 * MICRODEGREES) // (
+        CELL_SIZE_MICRODEGREES
+    )
+    return min(max(row, 0), GRID_ROWS - 1)
+
+
+def _column(longitude: Decimal | float) -> int:
+    column = (to_microdegrees(longitude) + 180 * MICRODEGREES) // (
+        CELL_SIZE_MICRODEGREES
+    )
+    return min(max(column, 0), GRID_COLUMNS - 1)
+
+
+def grid_cell(latitude: Decimal | float, longitude: Decimal | float) -> int:
+    """Return the id of the grid cell containing the coordinate."""
+    return _row(latitude) * GRID_COLUMNS + _column(longitude)
+
+
+def cell_ranges(bbox: BoundingBox) -> list[tuple[int, int]]:
+    """
+    Return inclusive ``(first, last)`` cell id ranges covering *bbox*.
+
+    Each grid row contributes one range per longitude span. Very tall boxes
+    collapse to a single latitude band so the SQL stays small; the exact
+    coordinate filter applied afterwards keeps the result correct.
+    """
+    first_row, last_row = _row(bbox.south), _row(bbox.north)
+    spans = [
+        (_column(west), _column(east)) for west, east in bbox.longitude_spans()
+    ]
+    full_width = any(
+        first == 0 and last == GRID_COLUMNS - 1 for first, last in spans
+    )
+    if full_width or last_row - first_row + 1 > MAX_PRUNED_ROWS:
+        return [(first_row * GRID_COLUMNS, (last_row + 1) * GRID_COLUMNS - 1)]
+    return [
+        (row * GRID_COLUMNS + first, row * GRID_COLUMNS + last)
+        for row in range(first_row, last_row + 1)
+        for first, last in spans
+    ]
+
+
+def cell_filter(bbox: BoundingBox) -> Q:
+    """Return a ``grid_cell`` predicate covering *bbox*."""
+    query = Q()
+    for first, last in cell_ranges(bbox):
+        query |= Q(grid_cell__range=(first, last))
+    return query
+
+
+def coordinate_filter(bbox: BoundingBox) -> Q:
+    """Return the exact ``latitude``/``longitude`` predicate for *bbox*."""
+    longitude = Q()
+    for west, east in bbox.longitude_spans():
+        longitude |= Q(
+            longitude__gte=_as_decimal(west), longitude__lte=_as_decimal(east)
+        )
+    return (
+        Q(
+            latitude__gte=_as_decimal(bbox.south),
+            latitude__lte=_as_decimal(bbox.north),
+        )
+        & longitude
+    )
+
+
+def _as_decimal(value: float) -> Decimal:
+    return Decimal(str(value))
+
+
+def radius_bbox(
+    latitude: float, longitude: float, radius_meters: float
+) -> BoundingBox:
+    """Return the smallest lat/lon box enclosing a great-circle radius."""
+    angular = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+    south, north = latitude - angular, latitude + angular
+    if south <= -90 or north >= 90:  # noqa: PLR2004
+        return BoundingBox(max(south, -90.0), -180.0, min(north, 90.0), 180.0)
+
+    spread = math.degrees(
+        math.asin(
+            min(
+                1.0,
+                math.sin(radius_meters / EARTH_RADIUS_METERS)
+                / math.cos(math.radians(latitude)),
+            )
+        )
+    )
+    if spread >= 180:  # noqa: PLR2004
+        return BoundingBox(south, -180.0, north, 180.0)
+    west, east = longitude - spread, longitude + spread
+    if west < -180:  # noqa: PLR2004
+        west += 360
+    if east > 180:  # noqa: PLR2004
+        east -= 360
+    return BoundingBox(south, west, north, east)
+
+
+def haversine(
+    latitude1: float, longitude1: float, latitude2: float, longitude2: float
+) -> float:
+    """Return the great-circle distance between two points in meters."""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(longitude2 - longitude1) / 2
+    a = (
+        math.sin(half_dphi) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_expression(latitude: float, longitude: float) -> Expression:
+    """Return a portable SQL haversine distance (meters) to the point."""
+    row_latitude = Cast(F('latitude'), FloatField())
+    row_longitude = Cast(F('longitude'), FloatField())
+    origin_latitude = Value(float(latitude), output_field=FloatField())
+    origin_longitude = Value(float(longitude), output_field=FloatField())
+
+    a = Power(Sin(Radians(row_latitude - origin_latitude) / 2), 2) + Cos(
+        Radians(origin_latitude)
+    ) * Cos(Radians(row_latitude)) * Power(
+        Sin(Radians(row_longitude - origin_longitude) / 2), 2
+    )
+    return (
+        2
+        * EARTH_RADIUS_METERS
+        * ASin(Least(Value(1.0, output_field=FloatField()), Sqrt(a)))
+    )
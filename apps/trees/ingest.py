@@ -0,0 +1,216 @@
+"""
+Building blocks of the streaming bulk-planting ingest.
+
+An upload is parsed record by record (NDJSON or CSV), validated in batches
+and written one batch per short transaction, either with ``bulk_create`` or,
+on PostgreSQL, with ``COPY ... FROM STDIN``. Nothing here holds more than a
+single batch in memory. ``services.ingest_plantings`` wires the pieces
+together.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any
+
+from django.db import connections, router
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import catalog
+from .models import PlantedTree, Tree
+from .validators import validate_latitude, validate_longitude
+
+__all__ = [
+    'IngestReport',
+    'COPY_COLUMNS',
+    'copy_planted_trees',
+    'copy_rows',
+    'parse_csv',
+    'parse_ndjson',
+    'validate_batch',
+]
+
+MAX_REPORTED_ERRORS = 1000
+
+Record = tuple[int, dict[str, Any] | None, str | None]
+
+
+@dataclass
+class IngestReport:
+    """Outcome of an ingest run; only the first errors are kept."""
+
+    accepted: int = 0
+    rejected: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def reject(self, row: int, errors: Any) -> None:  # noqa: ANN401
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors),
+        }
+
+
+def _lines(stream: Iterable[bytes]) -> Iterator[str]:
+    for line in stream:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line
+
+
+def parse_ndjson(stream: Iterable[bytes]) -> Iterator[Record]:
+    """Yield ``(row, data, error)`` for each non-blank NDJSON line."""
+    row = 0
+    for line in _lines(stream):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f'Invalid JSON: {exc}'
+            continue
+        if not isinstance(data, dict):
+            yield row, None, 'Expected a JSON object.'
+            continue
+        yield row, data, None
+
+
+def parse_csv(stream: Iterable[bytes]) -> Iterator[Record]:
+    """Yield ``(row, data, error)`` for each CSV record after the header."""
+    reader = csv.DictReader(_lines(stream))
+    try:
+        reader.fieldnames  # noqa: B018
+    except csv.Error as exc:
+        yield 0, None, f'Invalid CSV header: {exc}'
+        return
+    row = 0
+    while True:
+        row += 1
+        try:
+            data = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            # The reader moves on to the next record, like NDJSON lines.
+            yield row, None, f'Invalid CSV: {exc}'
+            continue
+        yield row, data, None
+
+
+class PlantingRowSerializer(serializers.Serializer):
+    tree_id = serializers.UUIDField()
+    latitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, validators=[validate_latitude]
+    )
+    longitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, validators=[validate_longitude]
+    )
+
+
+def validate_batch(
+    batch: Iterable[Record], report: IngestReport
+) -> list[tuple[Tree, Decimal, Decimal]]:
+    """
+    Validate a batch of parsed records.
+
+    Invalid records are added to *report*; the valid ones are returned as
+    ``(tree, latitude, longitude)`` with trees resolved from the catalog
+    snapshot.
+    """
+    row_serializer = PlantingRowSerializer()
+    candidates = []
+    for row, data, error in batch:
+        if error is not None:
+            report.reject(row, {'non_field_errors': [error]})
+            continue
+        try:
+            candidates.append((row, row_serializer.run_validation(data)))
+        except serializers.ValidationError as exc:
+            report.reject(row, exc.detail)
+
+    trees = catalog.resolve(data['tree_id'] for _, data in candidates)
+    valid = []
+    for row, data in candidates:
+        tree = trees.get(data['tree_id'])
+        if tree is None:
+            report.reject(
+                row, {'tree_id': [f'Tree "{data["tree_id"]}" does not exist.']}
+            )
+            continue
+        valid.append((tree, data['latitude'], data['longitude']))
+    return valid
+
+
+# Column order of ``copy_rows``.
+COPY_COLUMNS = (
+    'id',
+    'planted_at',
+    'modified_at',
+    'user',
+    'tree',
+    'account',
+    'latitude',
+    'longitude',
+    'grid_cell',
+)
+
+
+def copy_rows(rows: Iterable[Iterable[Any]]) -> None:
+    """
+    Insert raw ``PlantedTree`` rows with PostgreSQL ``COPY FROM STDIN``.
+
+    Each row holds the values of ``COPY_COLUMNS``, in that order.
+    """
+    opts = PlantedTree._meta
+    connection = connections[router.db_for_write(PlantedTree)]
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+        quote(opts.db_table),
+        ', '.join(quote(opts.get_field(name).column) for name in COPY_COLUMNS),
+    )
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def copy_planted_trees(planted_trees: list[PlantedTree]) -> None:
+    """
+    Insert *planted_trees* with PostgreSQL ``COPY FROM STDIN``.
+
+    Primary keys, ``planted_at`` and ``modified_at`` are filled in on the
+    instances, which mirrors what ``bulk_create`` does.
+    """
+    attnames = [
+        PlantedTree._meta.get_field(name).attname for name in COPY_COLUMNS
+    ]
+    now = timezone.now()
+    for planted_tree in planted_trees:
+        planted_tree.planted_at = now
+        planted_tree.modified_at = now
+    copy_rows(
+        [getattr(planted_tree, attname) for attname in attnames]
+        for planted_tree in planted_trees
+    )
+    alias = router.db_for_write(PlantedTree)
+    for planted_tree in planted_trees:
+        planted_tree._state.adding = False
+        planted_tree._state.db = alias
@@ -0,0 +1,252 @@
+"""
+Bulk plantings run in the background by ``run_planting_jobs``.
+
+A request stores its raw plants in a ``PlantingJob`` and answers at once.
+The ``run_planting_jobs`` command claims pending jobs, oldest first, and
+runs each one in a worker process, at most ``TREES_JOB_ACCOUNT_CONCURRENCY``
+at a time per account, so one account's backlog cannot hold up the rest.
+
+``run`` validates the whole batch like the bulk endpoint does (types,
+ranges, tree ids and repeats) and then plants it in chunks of
+``TREES_JOB_CHUNK_SIZE``. Every chunk commits together with the job's
+``planted`` count, under a lock on the job row: a job whose worker died is
+handed out again after ``TREES_JOB_STALE_AFTER`` seconds, and one that hit
+a database error right away (up to ``TREES_JOB_MAX_ATTEMPTS`` runs); it
+resumes at the first chunk that was not committed, and two workers never
+plant the same chunk.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import DatabaseError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from apps.users.models import Account, User
+
+from . import batch, catalog, services
+from .models import PlantingJob
+
+__all__ = [
+    'MAX_REPORTED_ERRORS',
+    'claim',
+    'enqueue',
+    'requeue_stale',
+    'run',
+]
+
+MAX_REPORTED_ERRORS = 1000
+
+logger = logging.getLogger(__name__)
+
+Status = PlantingJob.Status
+
+
+def enqueue(user: User, account: Account, plants: list[Any]) -> PlantingJob:
+    """
+    Queue the raw bulk items *plants* for *account*.
+
+    Raises:
+        PermissionDenied: If the user does not belong to the account.
+    """
+    services.ensure_account_member(user, account)
+    return PlantingJob.objects.create(
+        user=user, account=account, plants=plants, total=len(plants)
+    )
+
+
+def requeue_stale() -> int:
+    """Hand out again the running jobs whose worker stopped reporting."""
+    cutoff = timezone.now() - timedelta(seconds=settings.TREES_JOB_STALE_AFTER)
+    return PlantingJob.objects.filter(
+        status=Status.RUNNING, heartbeat_at__lt=cutoff
+    ).update(status=Status.PENDING)
+
+
+def claim(limit: int, per_account: int) -> list[UUID]:
+    """
+    Mark up to *limit* pending jobs as running and return their ids.
+
+    Jobs are taken oldest first, skipping accounts that already run
+    *per_account* jobs. Each job is claimed with a conditional update, so
+    concurrent dispatchers never claim the same job.
+    """
+    if limit <= 0:
+        return []
+    running = dict(
+        PlantingJob.objects
+        .filter(status=Status.RUNNING)
+        .order_by()
+        .values('account_id')
+        .annotate(jobs=Count('pk'))
+        .values_list('account_id', 'jobs')
+    )
+    full = [
+        account_id
+        for account_id, jobs in running.items()
+        if jobs >= per_account
+    ]
+    candidates = (
+        PlantingJob.objects
+        .filter(status=Status.PENDING)
+        .exclude(account_id__in=full)
+        .order_by('created')
+        .values_list('pk', 'account_id')[: limit * per_account]
+    )
+
+    claimed = []
+    now = timezone.now()
+    for pk, account_id in candidates:
+        if running.get(account_id, 0) >= per_account:
+            continue
+        updated = PlantingJob.objects.filter(
+            pk=pk, status=Status.PENDING
+        ).update(
+            status=Status.RUNNING,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if updated:
+            running[account_id] = running.get(account_id, 0) + 1
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def _report(errors: batch.Errors) -> list[dict[str, Any]]:
+    """Keep the first invalid items, as ``{"item", "errors"}``."""
+    return [
+        {'item': index, 'errors': item_errors}
+        for index, item_errors in enumerate(errors)
+        if item_errors
+    ][:MAX_REPORTED_ERRORS]
+
+
+def _validate(job: PlantingJob) -> tuple[list[batch.Plant], batch.Errors]:
+    """Parse the job's raw items and resolve their trees."""
+    items, errors = batch.parse(job.plants)
+    trees = catalog.resolve(
+        item['tree_id']
+        for item, item_errors in zip(items, errors, strict=True)
+        if not item_errors
+    )
+    plants = []
+    for item, item_errors in zip(items, errors, strict=True):
+        if item_errors:
+            continue
+        tree = trees.get(item['tree_id'])
+        if tree is None:
+            item_errors['tree_id'] = [
+                f'Invalid pk "{item["tree_id"]}" - object does not exist.'
+            ]
+            continue
+        plants.append((tree, (item['latitude'], item['longitude'])))
+    return plants, errors
+
+
+def _finish(job: PlantingJob, status: str, **fields: Any) -> None:  # noqa: ANN401
+    PlantingJob.objects.filter(pk=job.pk, status=Status.RUNNING).update(
+        status=status,
+        plants=[],
+        finished_at=timezone.now(),
+        **fields,
+    )
+
+
+def _plant_chunk(
+    job: PlantingJob, start: int, plants: Sequence[batch.Plant]
+) -> bool:
+    """Plant ``plants`` from ``start``; ``False`` if the job moved on."""
+    with transaction.atomic():
+        locked = (
+            PlantingJob.objects
+            .select_for_update()
+            .filter(pk=job.pk, status=Status.RUNNING, planted=start)
+            .exists()
+        )
+        if not locked:
+            return False
+        services.plant_trees(user=job.user, account=job.account, plants=plants)
+        updated = PlantingJob.objects.filter(
+            pk=job.pk, status=Status.RUNNING, planted=start
+        ).update(planted=start + len(plants), heartbeat_at=timezone.now())
+        if not updated:
+            # Without row locks (SQLite), another worker got there first.
+            transaction.set_rollback(True)
+            return False
+    return True
+
+
+def _execute(job: PlantingJob) -> str | None:
+    plants, errors = _validate(job)
+    if not any(errors) and job.planted == 0:
+        # Later chunks would see the earlier ones as repeats, so the batch
+        # is checked as a whole, once, before planting anything.
+        errors = batch.check(job.account, plants) or errors
+    if any(errors):
+        _finish(
+            job,
+            Status.FAILED,
+            invalid=sum(1 for item_errors in errors if item_errors),
+            errors=_report(errors),
+            detail=str(batch.InvalidPlantings(errors)),
+        )
+        return Status.FAILED
+
+    size = settings.TREES_JOB_CHUNK_SIZE
+    for start in range(job.planted, len(plants), size):
+        if not _plant_chunk(job, start, plants[start : start + size]):
+            return None
+    _finish(job, Status.SUCCEEDED)
+    return Status.SUCCEEDED
+
+
+def run(job_id: UUID) -> str | None:
+    """
+    Run a claimed job to the end and return its final status.
+
+    Returns ``PENDING`` when a database error sent the job back to the
+    queue, and ``None`` when the job is not running (anymore) or was taken
+    over by another worker.
+    """
+    job = (
+        PlantingJob.objects
+        .select_related('user', 'account')
+        .filter(pk=job_id, status=Status.RUNNING)
+        .first()
+    )
+    if job is None:
+        return None
+    try:
+        return _execute(job)
+    except (PermissionDenied, batch.InvalidPlantings) as exc:
+        _finish(job, Status.FAILED, detail=str(exc))
+        return Status.FAILED
+    except DatabaseError:
+        # Often transient (lock timeouts, failovers): retry from the last
+        # committed chunk a few times before giving up.
+        if job.attempts >= settings.TREES_JOB_MAX_ATTEMPTS:
+            logger.exception('Planting job %s failed', job.pk)
+            _finish(job, Status.FAILED, detail='Database error.')
+            return Status.FAILED
+        logger.warning(
+            'Planting job %s will be retried', job.pk, exc_info=True
+        )
+        PlantingJob.objects.filter(pk=job.pk, status=Status.RUNNING).update(
+            status=Status.PENDING
+        )
+        return Status.PENDING
+    except Exception:
+        logger.exception('Planting job %s failed', job.pk)
+        _finish(job, Status.FAILED, detail='Internal error.')
+        raise
@@ -0,0 +1,26 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.trees import clusters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-zoom planting cluster cells from PlantedTree.'
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows fetched and inserted per round trip.',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        cells = clusters.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt {cells} cluster cells over {len(clusters.ZOOMS)} '
+                'zoom levels.'
+            )
+        )
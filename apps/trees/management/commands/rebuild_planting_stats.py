@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.trees import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the planting rollup tables from PlantedTree.'
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows fetched and inserted per round trip.',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        account_rows, user_rows = stats.rebuild(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt {account_rows} account/tree and {user_rows} '
+                'user monthly rollups.'
+            )
+        )
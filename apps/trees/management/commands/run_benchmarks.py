@@ -0,0 +1,113 @@
+import json
+import platform
+import subprocess  # noqa: S404
+from pathlib import Path
+from typing import Any
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.trees import benchmarks, synthetic
+from apps.trees.models import PlantedTree
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(  # noqa: S603
+            ['git', 'rev-parse', 'HEAD'],  # noqa: S607
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the planting services, serializer and manager hot paths and '
+        'write the results as JSON. Everything runs in a transaction that '
+        'is rolled back, so the database is left untouched.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            'patterns',
+            nargs='*',
+            help='Glob patterns of benchmark names (default: all).',
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument(
+            '--seed-planted',
+            type=int,
+            default=0,
+            help=(
+                'Generate this many synthetic plantings (see seed_trees) '
+                'before timing instead of using the existing data.'
+            ),
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            type=Path,
+            help='Write the JSON results here instead of stdout.',
+        )
+        parser.add_argument(
+            '--list', action='store_true', help='List benchmark names.'
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        names = benchmarks.select(options['patterns'])
+        if options['list']:
+            self.stdout.write('\n'.join(names))
+            return
+
+        with transaction.atomic():
+            if options['seed_planted']:
+                planted = options['seed_planted']
+                synthetic.generate(
+                    users=max(planted // 100, 1),
+                    accounts=max(planted // 1000, 1),
+                    trees=50,
+                    planted_trees=planted,
+                    seed=options['seed'],
+                )
+            fixture = benchmarks.Fixture.busiest()
+            dataset = {
+                'planted_trees': PlantedTree.objects.count(),
+                'user_planted_trees': PlantedTree.objects.filter(
+                    user=fixture.user
+                ).count(),
+            }
+            results = benchmarks.run(
+                fixture,
+                names,
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+            )
+            transaction.set_rollback(True)
+
+        report = {
+            'commit': _git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'dataset': dataset,
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output'] is None:
+            self.stdout.write(output)
+        else:
+            options['output'].write_text(output + '\n')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Wrote {len(results)} results to {options["output"]}.'
+                )
+            )
@@ -0,0 +1,109 @@
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from typing import Any
+from uuid import UUID
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections
+
+from apps.core import routers
+from apps.trees import jobs, worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued bulk plantings in a pool of worker processes.'
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=settings.TREES_JOB_PROCESSES,
+            help='Worker processes; 0 runs the jobs in this process.',
+        )
+        parser.add_argument(
+            '--per-account',
+            type=int,
+            default=settings.TREES_JOB_ACCOUNT_CONCURRENCY,
+            help='Jobs of the same account running at the same time.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds between looks at the queue.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for jobs.',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        # The queue must be read from the primary, never from a replica.
+        with routers.use_primary():
+            self._dispatch(options)
+
+    def _dispatch(self, options: dict[str, Any]) -> None:
+        processes = options['processes']
+        per_account = max(options['per_account'], 1)
+        if processes <= 0:
+            self._run_inline(per_account, options)
+            return
+
+        # Workers are spawned, not forked: they open their own connections.
+        connections.close_all()
+        running: dict[Future, UUID] = {}
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=worker.setup,
+        ) as executor:
+            while True:
+                jobs.requeue_stale()
+                for job_id in jobs.claim(
+                    processes - len(running), per_account
+                ):
+                    running[executor.submit(worker.run, job_id)] = job_id
+                if not running:
+                    if options['once']:
+                        break
+                    self._idle(options['poll_interval'])
+                    continue
+                done, _ = wait(
+                    running,
+                    timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self._report(running.pop(future), future)
+
+    def _run_inline(self, per_account: int, options: dict[str, Any]) -> None:
+        while True:
+            jobs.requeue_stale()
+            claimed = jobs.claim(1, per_account)
+            if not claimed and options['once']:
+                return
+            for job_id in claimed:
+                self.stdout.write(f'Job {job_id}: {jobs.run(job_id)}.')
+            if not claimed:
+                self._idle(options['poll_interval'])
+
+    @staticmethod
+    def _idle(seconds: float) -> None:
+        # Do not hold a connection open while the queue is empty.
+        connections.close_all()
+        time.sleep(seconds)
+
+    def _report(self, job_id: UUID, future: Future) -> None:
+        exc = future.exception()
+        if exc is None:
+            self.stdout.write(f'Job {job_id}: {future.result()}.')
+        else:
+            self.stderr.write(f'Job {job_id} crashed: {exc!r}.')
@@ -0,0 +1,75 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from apps.trees import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate deterministic synthetic users, accounts, memberships, '
+        'tree species and plantings for local profiling.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:  # noqa: PLR6301
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--accounts', type=int, default=100)
+        parser.add_argument('--trees', type=int, default=200)
+        parser.add_argument(
+            '--planted',
+            type=int,
+            default=100_000,
+            help='Number of PlantedTree rows.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Same seed, same rows; use a new seed to add more data.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows written per round trip.',
+        )
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=10,
+            help='Spread plantings over this many years.',
+        )
+
+    def handle(self, *args: tuple, **options: dict[str, Any]) -> None:
+        started = time.perf_counter()
+        planted = options['planted']
+        step = max(planted // 10, options['batch_size'])
+        reported = 0
+
+        def progress(written: int) -> None:
+            nonlocal reported
+            if written - reported >= step or written == planted:
+                reported = written
+                self.stdout.write(f'{written}/{planted} planted trees')
+
+        with transaction.atomic():
+            report = synthetic.generate(
+                options['users'],
+                options['accounts'],
+                options['trees'],
+                planted,
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                years=options['years'],
+                progress=progress,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Seeded {report.users} users, {report.accounts} accounts, '
+                f'{report.memberships} memberships, {report.trees} trees and '
+                f'{report.planted_trees} planted trees in '
+                f'{time.perf_counter() - started:.1f}s.'
+            )
+        )
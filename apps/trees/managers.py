@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from uuid import UUID
+
 from django.db import models
 
 from apps.users.models import Account
 
+from . import geo
+
+NEAREST_FIRST_RADIUS = 1000.0
+NEAREST_RADIUS_GROWTH = 8
+
 
 class PlantedTreeQuerySet(models.QuerySet):
     """Custom QuerySet fro class PlantedTree."""
@@ -12,10 +20,72 @@ class PlantedTreeQuerySet(models.QuerySet):
         """Return planted trees that belong to user."""
         return self.filter(user=user)
 
-    def for_accounts(self, accounts: list[Account]) -> PlantedTreeQuerySet:
+    def for_accounts(
+        self, accounts: Iterable[Account | UUID]
+    ) -> PlantedTreeQuerySet:
         """Return planted trees whose account is within accounts."""
         return self.filter(account__in=accounts)
 
+    def with_details(self) -> PlantedTreeQuerySet:
+        """Load everything ``PlantedTreeSerializer`` nests, in 2 queries."""
+        return self.select_related('user', 'tree', 'account').prefetch_related(
+            'user__accounts'
+        )
+
+    def within_bbox(self, bbox: geo.BoundingBox) -> PlantedTreeQuerySet:
+        """Return planted trees inside *bbox*, pruned by grid cell first."""
+        return self.filter(geo.cell_filter(bbox)).filter(
+            geo.coordinate_filter(bbox)
+        )
+
+    def within_radius(
+        self, latitude: float, longitude: float, radius: float
+    ) -> PlantedTreeQuerySet:
+        """
+        Return planted trees within *radius* meters of the point.
+
+        Rows are annotated with their great-circle ``distance`` in meters.
+        """
+        bbox = geo.radius_bbox(latitude, longitude, radius)
+        return (
+            self
+            .within_bbox(bbox)
+            .annotate(distance=geo.distance_expression(latitude, longitude))
+            .filter(distance__lte=radius)
+        )
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius: float | None = None,
+    ) -> list[models.Model]:
+        """
+        Return the *k* planted trees nearest to the point, nearest first.
+
+        Searches growing radii with ``within_radius`` until *k* rows turn up
+        or *radius* meters (default: the whole globe) are covered. Rows are
+        annotated with their ``distance`` in meters.
+        """
+        limit = geo.MAX_DISTANCE_METERS if radius is None else radius
+        search = min(NEAREST_FIRST_RADIUS, limit)
+        while True:
+            found = list(
+                self
+                .within_radius(latitude, longitude, search)
+                .order_by('distance', 'id')
+                .values_list('pk', 'distance')[:k]
+            )
+            if len(found) == k or search >= limit:
+                break
+            search = min(search * NEAREST_RADIUS_GROWTH, limit)
+
+        rows = self.in_bulk([pk for pk, _ in found])
+        for pk, distance in found:
+            rows[pk].distance = distance
+        return [rows[pk] for pk, _ in found]
+
 
 class PlantedTreeManager(models.Manager):
     """Manager that exposes PlantedTreeQuerySet helpers."""
@@ -26,5 +96,27 @@ class PlantedTreeManager(models.Manager):
     def for_user(self, user: models.Model) -> PlantedTreeQuerySet:
         return self.get_queryset().for_user(user)
 
-    def for_accounts(self, accounts: list[Account]) -> PlantedTreeQuerySet:
+    def for_accounts(
+        self, accounts: Iterable[Account | UUID]
+    ) -> PlantedTreeQuerySet:
         return self.get_queryset().for_accounts(accounts)
+
+    def within_bbox(self, bbox: geo.BoundingBox) -> PlantedTreeQuerySet:
+        return self.get_queryset().within_bbox(bbox)
+
+    def within_radius(
+        self, latitude: float, longitude: float, radius: float
+    ) -> PlantedTreeQuerySet:
+        return self.get_queryset().within_radius(latitude, longitude, radius)
+
+    def with_details(self) -> PlantedTreeQuerySet:
+        return self.get_queryset().with_details()
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius: float | None = None,
+    ) -> list[models.Model]:
+        return self.get_queryset().nearest(latitude, longitude, k, radius)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:19
+
+import apps.trees.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0002_initial'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='plantedtree',
+            name='latitude',
+            field=models.DecimalField(decimal_places=6, max_digits=9, validators=[apps.trees.validators.validate_latitude]),
+        ),
+        migrations.AlterField(
+            model_name='plantedtree',
+            name='longitude',
+            field=models.DecimalField(decimal_places=6, max_digits=9, validators=[apps.trees.validators.validate_longitude]),
+        ),
+        migrations.AddIndex(
+            model_name='plantedtree',
+            index=models.Index(fields=['user', '-planted_at', '-id'], name='trees_plant_user_seek_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantedtree',
+            index=models.Index(fields=['account', '-planted_at', '-id'], name='trees_plant_account_seek_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+from apps.trees import geo
+
+
+def fill_grid_cells(apps, schema_editor):
+    PlantedTree = apps.get_model('trees', 'PlantedTree')
+    # Explicit alias: the replica router would send reads elsewhere.
+    manager = PlantedTree.objects.db_manager(schema_editor.connection.alias)
+    planted_trees = manager.only('id', 'latitude', 'longitude')
+    batch = []
+    for planted_tree in planted_trees.iterator(chunk_size=2000):
+        planted_tree.grid_cell = geo.grid_cell(
+            planted_tree.latitude, planted_tree.longitude
+        )
+        batch.append(planted_tree)
+        if len(batch) >= 2000:
+            manager.bulk_update(batch, ['grid_cell'])
+            batch = []
+    manager.bulk_update(batch, ['grid_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0003_plantedtree_seek_indexes'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantedtree',
+            name='grid_cell',
+            field=models.PositiveIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_grid_cells, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='plantedtree',
+            index=models.Index(fields=['grid_cell', 'account'], name='trees_plant_grid_cell_idx'),
+        ),
+    ]
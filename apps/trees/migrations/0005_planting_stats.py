@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:31
+
+import apps.core.fields
+import django.db.models.deletion
+import uuid6
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0004_plantedtree_grid_cell'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountTreeMonthlyStat',
+            fields=[
+                ('id', apps.core.fields.UUIDv7Field(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('month', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.account')),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trees.tree')),
+            ],
+            options={
+                'ordering': ['-month'],
+                'constraints': [models.UniqueConstraint(fields=('account', 'tree', 'month'), name='unique_account_tree_month_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserMonthlyStat',
+            fields=[
+                ('id', apps.core.fields.UUIDv7Field(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('month', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='unique_user_month_stat')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:04
+
+import apps.core.fields
+import django.db.models.deletion
+import uuid6
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0005_planting_stats'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantingClusterCell',
+            fields=[
+                ('id', apps.core.fields.UUIDv7Field(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('row', models.PositiveIntegerField()),
+                ('column', models.PositiveIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('latitude_sum', models.BigIntegerField(default=0)),
+                ('longitude_sum', models.BigIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.account')),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='trees.tree')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('account', 'zoom', 'row', 'column', 'tree'), name='unique_planting_cluster_cell')],
+            },
+        ),
+    ]
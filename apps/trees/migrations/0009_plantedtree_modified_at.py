@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trees', '0008_planting_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantedtree',
+            name='modified_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='plantedtree',
+            index=models.Index(fields=['modified_at'], name='trees_plant_modified_idx'),
+        ),
+    ]
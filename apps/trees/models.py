@@ -1,9 +1,12 @@
+from typing import Any
+
 from django.conf import settings
-from django.db import models
+from django.db import models, router, transaction
 from django.utils import timezone
 
 from apps.core.fields import UUIDv7Field
 
+from . import geo
 from .managers import PlantedTreeManager
 from .validators import validate_latitude, validate_longitude
 
@@ -44,6 +47,9 @@ class PlantedTree(models.Model):
         decimal_places=6,
         validators=[validate_longitude],
     )
+    grid_cell = models.PositiveIntegerField(editable=False)
+    # Lets other processes' nearby indexes pick up edits (apps.trees.nearby).
+    modified_at = models.DateTimeField(auto_now=True)
 
     objects = PlantedTreeManager()
 
@@ -54,8 +60,206 @@ class PlantedTree(models.Model):
     def __str__(self) -> str:
         return f'{self.tree.name} planted by {self.user.username}'
 
+    def save(self, *args: tuple, **kwargs: dict[str, Any]) -> None:
+        self.grid_cell = geo.grid_cell(self.latitude, self.longitude)
+        # One transaction with the rollups and cells that the signal
+        # receivers (apps.trees.signals) move along with the row.
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-planted_at']
         indexes = [
             models.Index(fields=['user', 'account']),
+            models.Index(
+                fields=['user', '-planted_at', '-id'],
+                name='trees_plant_user_seek_idx',
+            ),
+            models.Index(
+                fields=['account', '-planted_at', '-id'],
+                name='trees_plant_account_seek_idx',
+            ),
+            models.Index(
+                fields=['grid_cell', 'account'],
+                name='trees_plant_grid_cell_idx',
+            ),
+            models.Index(
+                fields=['modified_at'], name='trees_plant_modified_idx'
+            ),
+        ]
+
+
+class AccountTreeMonthlyStat(models.Model):
+    """Number of ``tree`` plantings under ``account`` during ``month``."""
+
+    id = UUIDv7Field(primary_key=True)
+    account = models.ForeignKey(
+        'users.Account', on_delete=models.CASCADE, related_name='+'
+    )
+    tree = models.ForeignKey(Tree, on_delete=models.CASCADE, related_name='+')
+    month = models.DateField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.account_id} / {self.tree_id} / {self.month}'
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['account', 'tree', 'month'],
+                name='unique_account_tree_month_stat',
+            )
+        ]
+
+
+class UserMonthlyStat(models.Model):
+    """Number of trees planted by ``user`` during ``month``."""
+
+    id = UUIDv7Field(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    month = models.DateField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.user_id} / {self.month}'
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month'], name='unique_user_month_stat'
+            )
+        ]
+
+
+class PlantingClusterCell(models.Model):
+    """
+    Plantings of ``tree`` under ``account`` inside one cell of a zoom grid.
+
+    Coordinate sums are in microdegrees, so the centroid of the cell's
+    plantings is ``sum / count``. See ``apps.trees.clusters``.
+    """
+
+    id = UUIDv7Field(primary_key=True)
+    account = models.ForeignKey(
+        'users.Account', on_delete=models.CASCADE, related_name='+'
+    )
+    tree = models.ForeignKey(Tree, on_delete=models.CASCADE, related_name='+')
+    zoom = models.PositiveSmallIntegerField()
+    row = models.PositiveIntegerField()
+    column = models.PositiveIntegerField()
+    count = models.IntegerField(default=0)
+    latitude_sum = models.BigIntegerField(default=0)
+    longitude_sum = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.account_id} / z{self.zoom} {self.row}:{self.column}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['account', 'zoom', 'row', 'column', 'tree'],
+                name='unique_planting_cluster_cell',
+            )
+        ]
+
+
+class UploadSession(models.Model):
+    """
+    A bulk planting sent in numbered chunks; see ``apps.trees.uploads``.
+
+    Each chunk is planted in its own transaction together with its
+    ``UploadChunk`` row, so a client can resume after any failure by
+    sending only the chunks the session does not list.
+    """
+
+    id = UUIDv7Field(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    account = models.ForeignKey(
+        'users.Account', on_delete=models.CASCADE, related_name='+'
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    committed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f'{self.user_id} / {self.account_id} / {self.created}'
+
+
+class UploadChunk(models.Model):
+    """A processed chunk of an ``UploadSession``."""
+
+    id = UUIDv7Field(primary_key=True)
+    session = models.ForeignKey(
+        UploadSession, on_delete=models.CASCADE, related_name='chunks'
+    )
+    number = models.PositiveIntegerField()
+    planted = models.PositiveIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.session_id} #{self.number}'
+
+    class Meta:
+        ordering = ['number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'number'], name='unique_upload_chunk'
+            )
+        ]
+
+
+class PlantingJob(models.Model):
+    """
+    A bulk planting run by ``run_planting_jobs``; see ``apps.trees.jobs``.
+
+    The raw plants are kept until the job finishes. ``planted`` is updated
+    in the transaction of every chunk it plants, so a job picked up again
+    after a worker died, or after a database error, resumes where it
+    stopped.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        RUNNING = 'running'
+        SUCCEEDED = 'succeeded'
+        FAILED = 'failed'
+
+    id = UUIDv7Field(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    account = models.ForeignKey(
+        'users.Account', on_delete=models.CASCADE, related_name='+'
+    )
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    plants = models.JSONField(default=list)
+    total = models.PositiveIntegerField()
+    planted = models.PositiveIntegerField(default=0)
+    invalid = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+    detail = models.CharField(max_length=255, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f'{self.account_id} / {self.created} / {self.status}'
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'created'], name='plantingjob_status_idx'
+            )
         ]
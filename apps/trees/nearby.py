@@ -0,0 +1,373 @@
+"""
+In-process index of planting locations for nearest-neighbour queries.
+
+Every process keeps the coordinates of all plantings in ``geo`` grid cells,
+grouped by account, and finds the plantings nearest to a point by visiting
+rings of cells outward from it until no unvisited cell can hold anything
+closer. Only ids come out of the index; rows are then read by primary key,
+which also weeds out plantings deleted by other processes, and their
+distances are measured again from the rows read.
+
+Server processes load the index in the background at startup
+(``warm_in_background`` is called from the WSGI and ASGI entry points). The
+planting services and the ``PlantedTree`` signals then update it once their
+transaction commits, and plantings made or edited by other processes are
+pulled by ``modified_at`` every ``TREES_NEARBY_REFRESH_INTERVAL`` seconds.
+Until the index is warm, or with ``TREES_NEARBY_INDEX`` off, ``nearest``
+runs ``PlantedTreeQuerySet.nearest`` against the database instead.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+import time
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from uuid import UUID
+
+from django.conf import settings
+from django.db import connections
+
+from . import geo
+from .models import PlantedTree
+
+__all__ = [
+    'add',
+    'discard',
+    'is_warm',
+    'nearest',
+    'reset',
+    'wait',
+    'warm',
+    'warm_in_background',
+]
+
+CHUNK_SIZE = 10_000
+# How far back a refresh looks for rows committed after ``modified_at``.
+REFRESH_OVERLAP_SECONDS = 60.0
+CELL_RADIANS = math.radians(geo.CELL_SIZE_MICRODEGREES / geo.MICRODEGREES)
+MAX_RING = max(geo.GRID_ROWS, geo.GRID_COLUMNS // 2)
+
+Entry = tuple[float, float, UUID]
+Match = tuple[float, UUID, UUID, int]
+
+
+class _Index:
+    """Plantings as ``{account id: {grid cell: [entry, ...]}}``."""
+
+    def __init__(self, synced_at: float) -> None:
+        self.accounts: dict[UUID, dict[int, list[Entry]]] = {}
+        # Where each planting is filed: (account id, grid cell).
+        self.places: dict[UUID, tuple[UUID, int]] = {}
+        self.synced_at = synced_at
+        self.checked_at = time.monotonic()
+
+    def insert(
+        self,
+        pk: UUID,
+        account_id: UUID,
+        latitude: float,
+        longitude: float,
+        cell: int,
+    ) -> None:
+        # An edited planting replaces what was indexed for it.
+        self.remove(pk)
+        self.places[pk] = (account_id, cell)
+        cells = self.accounts.setdefault(account_id, {})
+        cells.setdefault(cell, []).append((
+            float(latitude),
+            float(longitude),
+            pk,
+        ))
+
+    def remove(self, pk: UUID) -> None:
+        place = self.places.pop(pk, None)
+        if place is None:
+            return
+        account_id, cell = place
+        entries = self.accounts[account_id][cell]
+        for position, entry in enumerate(entries):
+            if entry[2] == pk:
+                del entries[position]
+                break
+        if not entries:
+            del self.accounts[account_id][cell]
+
+    def search(
+        self,
+        account_ids: Iterable[UUID],
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius: float,
+    ) -> list[Match]:
+        """Return ``(distance, pk, account id, cell)`` of the *k* nearest."""
+        grids = [
+            (account_id, self.accounts[account_id])
+            for account_id in set(account_ids)
+            if account_id in self.accounts
+        ]
+        occupied = sum(len(cells) for _, cells in grids)
+        origin_row, origin_column = divmod(
+            geo.grid_cell(latitude, longitude), geo.GRID_COLUMNS
+        )
+        heap: list[tuple[float, UUID, UUID, int]] = []
+
+        def visit(account_id: UUID, cell: int, entries: list[Entry]) -> None:
+            for entry_latitude, entry_longitude, pk in entries:
+                distance = geo.haversine(
+                    latitude, longitude, entry_latitude, entry_longitude
+                )
+                if distance > radius:
+                    continue
+                item = (-distance, pk, account_id, cell)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+        for ring in range(MAX_RING + 1):
+            bound = _ring_bound(latitude, ring)
+            if bound > radius or (len(heap) == k and -heap[0][0] <= bound):
+                break
+            if 8 * ring > occupied:
+                # Sparse data: scanning what is left beats walking rings.
+                for account_id, cells in grids:
+                    for cell, entries in cells.items():
+                        if _ring_of(cell, origin_row, origin_column) >= ring:
+                            visit(account_id, cell, entries)
+                break
+            for cell in _ring_cells(origin_row, origin_column, ring):
+                for account_id, cells in grids:
+                    entries = cells.get(cell)
+                    if entries:
+                        visit(account_id, cell, entries)
+
+        return sorted(
+            (-distance, pk, account_id, cell)
+            for distance, pk, account_id, cell in heap
+        )
+
+
+def _ring_of(cell: int, origin_row: int, origin_column: int) -> int:
+    row, column = divmod(cell, geo.GRID_COLUMNS)
+    columns = abs(column - origin_column)
+    return max(abs(row - origin_row), min(columns, geo.GRID_COLUMNS - columns))
+
+
+def _ring_cells(origin_row: int, origin_column: int, ring: int) -> set[int]:
+    """Return the cells ``ring`` steps away (Chebyshev, wrapping in x)."""
+    cells = set()
+    for row in range(
+        max(origin_row - ring, 0),
+        min(origin_row + ring, geo.GRID_ROWS - 1) + 1,
+    ):
+        if abs(row - origin_row) == ring:
+            offsets = range(-ring, ring + 1)
+        else:
+            offsets = (-ring, ring)
+        cells.update(
+            row * geo.GRID_COLUMNS
+            + (origin_column + offset) % geo.GRID_COLUMNS
+            for offset in offsets
+        )
+    return cells
+
+
+def _ring_bound(latitude: float, ring: int) -> float:
+    """Return a lower bound of the distance to any point ``ring`` away."""
+    if ring <= 1:
+        return 0.0
+    gap = (ring - 1) * CELL_RADIANS
+    by_latitude = gap * geo.EARTH_RADIUS_METERS
+    farthest = min(
+        abs(math.radians(latitude)) + (ring + 1) * CELL_RADIANS, math.pi / 2
+    )
+    by_longitude = (
+        2
+        * geo.EARTH_RADIUS_METERS
+        * math.asin(math.cos(farthest) * math.sin(min(gap, math.pi) / 2))
+    )
+    return min(by_latitude, by_longitude)
+
+
+_lock = threading.RLock()
+_index: _Index | None = None
+_warming = False
+_thread: threading.Thread | None = None
+
+
+def warm() -> None:
+    """Load every planting into a fresh index and make it current."""
+    global _index  # noqa: PLW0603
+    index = _Index(synced_at=time.time())
+    rows = (
+        PlantedTree.objects
+        .order_by()
+        .values_list('pk', 'account_id', 'latitude', 'longitude', 'grid_cell')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for row in rows:
+        index.insert(*row)
+    # Writes committed while loading are picked up by the first refresh.
+    index.checked_at = 0.0
+    with _lock:
+        _index = index
+
+
+def _warm_and_close() -> None:
+    try:
+        warm()
+    finally:
+        # The thread's connections would otherwise stay open until exit.
+        connections.close_all()
+
+
+def warm_in_background() -> threading.Thread | None:
+    """Start loading the index in a daemon thread, once per process."""
+    global _warming, _thread  # noqa: PLW0603
+    with _lock:
+        if not settings.TREES_NEARBY_INDEX or _warming or _index is not None:
+            return None
+        _warming = True
+        _thread = threading.Thread(
+            target=_warm_and_close, name='nearby-warm', daemon=True
+        )
+    _thread.start()
+    return _thread
+
+
+def wait(timeout: float | None = None) -> bool:
+    """Wait for ``warm_in_background`` to finish; return whether warm."""
+    thread = _thread
+    if thread is not None:
+        thread.join(timeout)
+    return is_warm()
+
+
+def is_warm() -> bool:
+    return _index is not None
+
+
+def reset() -> None:
+    """Drop this process's index; queries use the database until rewarmed."""
+    global _index, _warming  # noqa: PLW0603
+    with _lock:
+        _index, _warming = None, False
+
+
+def _rows_since(timestamp: float) -> list[tuple]:
+    return list(
+        PlantedTree.objects
+        .filter(
+            modified_at__gte=datetime.fromtimestamp(
+                timestamp - REFRESH_OVERLAP_SECONDS, tz=UTC
+            )
+        )
+        .order_by()
+        .values_list('pk', 'account_id', 'latitude', 'longitude', 'grid_cell')
+    )
+
+
+def _refresh(index: _Index, interval: float) -> None:
+    # Claim the refresh first, so requests arriving while it runs keep using
+    # the index as it is instead of starting refreshes of their own, and
+    # only hold the lock to apply the rows once they are fetched.
+    with _lock:
+        checked_at = index.checked_at
+        if time.monotonic() - checked_at < interval:
+            return
+        index.checked_at = time.monotonic()
+        synced_at = index.synced_at
+    started = time.time()
+    try:
+        rows = _rows_since(synced_at)
+    except BaseException:
+        with _lock:
+            index.checked_at = checked_at
+        raise
+    with _lock:
+        for row in rows:
+            index.insert(*row)
+        index.synced_at = max(index.synced_at, started)
+
+
+def _current() -> _Index | None:
+    index = _index
+    if index is None or not settings.TREES_NEARBY_INDEX:
+        return None
+    interval = settings.TREES_NEARBY_REFRESH_INTERVAL
+    if time.monotonic() - index.checked_at >= interval:
+        _refresh(index, interval)
+    return index
+
+
+def add(planted_trees: Iterable[PlantedTree]) -> None:
+    """Index committed plantings; call from ``transaction.on_commit``."""
+    with _lock:
+        if _index is None:
+            return
+        for planted_tree in planted_trees:
+            _index.insert(
+                planted_tree.pk,
+                planted_tree.account_id,
+                planted_tree.latitude,
+                planted_tree.longitude,
+                planted_tree.grid_cell,
+            )
+
+
+def discard(planted_trees: Iterable[PlantedTree]) -> None:
+    """Forget deleted (or moved) plantings."""
+    with _lock:
+        if _index is None:
+            return
+        for planted_tree in planted_trees:
+            _index.remove(planted_tree.pk)
+
+
+def nearest(
+    account_ids: Iterable[UUID],
+    latitude: float,
+    longitude: float,
+    k: int,
+    radius: float | None = None,
+) -> list[PlantedTree]:
+    """
+    Return the *k* plantings of the accounts nearest to the point.
+
+    Rows come nearest first, loaded with ``with_details()`` and annotated
+    with their great-circle ``distance`` in meters; *radius* (meters)
+    optionally caps that distance.
+    """
+    account_ids = list(account_ids)
+    queryset = PlantedTree.objects.for_accounts(account_ids).with_details()
+    index = _current()
+    if index is None:
+        return queryset.nearest(latitude, longitude, k, radius)
+
+    limit = geo.MAX_DISTANCE_METERS if radius is None else radius
+    while True:
+        with _lock:
+            matches = index.search(account_ids, latitude, longitude, k, limit)
+        rows = queryset.in_bulk([pk for _, pk, _, _ in matches])
+        gone = [match for match in matches if match[1] not in rows]
+        if not gone:
+            break
+        # Deleted by another process: forget them and search again.
+        with _lock:
+            for _, pk, _, _ in gone:
+                index.remove(pk)
+
+    # Another process may have moved a planting since it was indexed.
+    found = []
+    for _, pk, _, _ in matches:
+        row = rows[pk]
+        row.distance = geo.haversine(
+            latitude, longitude, float(row.latitude), float(row.longitude)
+        )
+        if row.distance <= limit:
+            found.append(row)
+    return sorted(found, key=lambda row: (row.distance, row.pk))
@@ -0,0 +1,141 @@
+"""
+Packed binary coordinates of plantings, for map rendering.
+
+All integers are little-endian and every section stays 4-byte aligned, so
+a client can map the blocks straight onto typed arrays (``Int32Array``,
+``Uint16Array``, ``numpy.frombuffer``, ...)::
+
+    header   4s H H      magic b'TEPC', version 1, reserved 0
+    block    I           n, the number of records in the block (n > 0)
+             n x i       latitudes, in microdegrees
+             n x i       longitudes, in microdegrees
+             n x H       species indexes
+             n x H       planting days since 1970-01-01 (UTC)
+    ...
+    end      I           0
+    species  I           S, the number of species
+             S x 16s     tree ids; species indexes point into this table
+
+The payload is streamed block by block: rows are read with
+``values_list()`` and each column goes through an ``array`` buffer, so no
+JSON, ``Decimal`` or model instance is built per row. Species get their
+index when first seen, which is why their table comes last.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+from datetime import date
+from itertools import islice
+from uuid import UUID
+
+from django.db.models import F, IntegerField, QuerySet
+from django.db.models.functions import Cast, Round
+
+from . import geo
+
+__all__ = ['CHUNK_SIZE', 'MEDIA_TYPE', 'decode', 'iter_packed']
+
+MEDIA_TYPE = 'application/vnd.trees-everywhere.coordinates'
+MAGIC = b'TEPC'
+VERSION = 1
+CHUNK_SIZE = 8192
+EPOCH = date(1970, 1, 1).toordinal()
+
+_HEADER = struct.Struct('<4sHH')
+_COUNT = struct.Struct('<I')
+
+
+def _microdegrees(field: str) -> Cast:
+    return Cast(Round(F(field) * geo.MICRODEGREES), IntegerField())
+
+
+def _tobytes(buffer: array) -> bytes:
+    if sys.byteorder == 'big':
+        buffer.byteswap()
+    return buffer.tobytes()
+
+
+def iter_packed(
+    queryset: QuerySet, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield the packed payload of *queryset*'s plantings."""
+    species: dict[UUID, int] = {}
+
+    def index(tree_id: UUID) -> int:
+        return species.setdefault(tree_id, len(species))
+
+    yield _HEADER.pack(MAGIC, VERSION, 0)
+
+    rows = (
+        queryset
+        .order_by()
+        .values_list(
+            _microdegrees('latitude'),
+            _microdegrees('longitude'),
+            'tree_id',
+            'planted_at',
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        latitudes, longitudes, tree_ids, planted_at = zip(*chunk)
+        yield b''.join((
+            _COUNT.pack(len(chunk)),
+            _tobytes(array('i', latitudes)),
+            _tobytes(array('i', longitudes)),
+            _tobytes(array('H', map(index, tree_ids))),
+            _tobytes(
+                array(
+                    'H', [moment.toordinal() - EPOCH for moment in planted_at]
+                )
+            ),
+        ))
+    yield (
+        _COUNT.pack(0)
+        + _COUNT.pack(len(species))
+        + b''.join(tree_id.bytes for tree_id in species)
+    )
+
+
+def decode(
+    payload: bytes,
+) -> tuple[list[UUID], list[tuple[int, int, int, int]]]:
+    """
+    Return the species ids and the records of a packed *payload*.
+
+    Records are ``(latitude, longitude, species index, day)`` tuples in
+    the units of the format. Meant for tests and Python clients.
+    """
+    view = memoryview(payload)
+    magic, version, _ = _HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        msg = 'Not a packed coordinates payload.'
+        raise ValueError(msg)
+    offset = _HEADER.size
+
+    records = []
+    while n := _COUNT.unpack_from(view, offset)[0]:
+        offset += _COUNT.size
+        columns = []
+        for typecode in 'iiHH':
+            column = array(typecode)
+            size = column.itemsize * n
+            column.frombytes(view[offset : offset + size])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            columns.append(column)
+            offset += size
+        records.extend(zip(*columns))
+
+    offset += _COUNT.size
+    count = _COUNT.unpack_from(view, offset)[0]
+    offset += _COUNT.size
+    species = [
+        UUID(bytes=bytes(view[offset + 16 * i : offset + 16 * (i + 1)]))
+        for i in range(count)
+    ]
+    return species, records
@@ -0,0 +1,7 @@
+from apps.core.pagination import KeysetCursorPagination
+
+
+class PlantedTreeCursorPagination(KeysetCursorPagination):
+    """Newest plantings first, seeking on ``(planted_at, id)``."""
+
+    ordering = ('-planted_at', '-id')
@@ -1,15 +1,36 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
 from typing import Any
+from uuid import UUID
 
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from apps.core.serializers import (
+    Fieldset,
+    SparseFieldsetMixin,
+    TimedSerializerMixin,
+)
+from apps.users import membership
 from apps.users.models import Account
 from apps.users.serializers import AccountSerializer, UserSerializer
 
-from . import services
-from .models import PlantedTree, Tree
+from . import batch, catalog, clusters, exports, geo, jobs, services, uploads
+from .exports import COLUMNS
+from .models import (
+    AccountTreeMonthlyStat,
+    PlantedTree,
+    PlantingJob,
+    Tree,
+    UploadChunk,
+    UploadSession,
+    UserMonthlyStat,
+)
+from .validators import validate_latitude, validate_longitude
 
 
-class TreeSerializer(serializers.ModelSerializer):
+class TreeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tree
         fields = ('id', 'name', 'scientific_name')
@@ -27,17 +48,35 @@ class CurrentUserAccountPrimaryKeyRelatedField(
             and hasattr(request, 'user')
             and request.user.is_authenticated
         ):
-            return request.user.accounts.all()
+            return Account.objects.filter(
+                pk__in=membership.get_account_ids(request.user)
+            )
         return Account.objects.none()
 
 
-class PlantedTreeSerializer(serializers.ModelSerializer):
+class CatalogTreePrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField resolved from the in-process tree catalog."""
+
+    def to_internal_value(self, data: Any) -> Tree:  # noqa: ANN401
+        try:
+            tree_id = data if isinstance(data, UUID) else UUID(str(data))
+        except ValueError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        entry = catalog.get(tree_id)
+        if entry is None:
+            self.fail('does_not_exist', pk_value=data)
+        return entry.to_model()
+
+
+class PlantedTreeSerializer(
+    TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     user = UserSerializer(read_only=True)
     tree = TreeSerializer(read_only=True)
     account = AccountSerializer(read_only=True)
     age = serializers.IntegerField(read_only=True)
 
-    tree_id = serializers.PrimaryKeyRelatedField(
+    tree_id = CatalogTreePrimaryKeyRelatedField(
         queryset=Tree.objects.all(), source='tree', write_only=True
     )
     account_id = CurrentUserAccountPrimaryKeyRelatedField(
@@ -59,6 +98,7 @@ class PlantedTreeSerializer(serializers.ModelSerializer):
             'account_id',
         )
         read_only_fields = ('planted_at', 'age', 'user')
+        expandable = ('user', 'tree', 'account')
 
     def create(self, validated_data: dict[str, Any]) -> PlantedTree:
         return services.plant_tree(
@@ -66,23 +106,171 @@ class PlantedTreeSerializer(serializers.ModelSerializer):
         )
 
 
+class PlantedTreeRowSerializer:
+    """
+    Read-only rendering of plantings from ``values()`` rows.
+
+    Gives the same JSON as a sparse ``PlantedTreeSerializer`` without
+    building model instances or walking DRF fields for every row. Values
+    are encoded like the exports (see ``apps.trees.exports``). ``user``
+    can't be expanded here: it embeds the ``accounts`` of the planter.
+    """
+
+    # Output key -> export column, flat and expanded.
+    columns = {
+        'id': 'id',
+        'planted_at': 'planted_at',
+        'latitude': 'latitude',
+        'longitude': 'longitude',
+        'age': 'age',
+        'user': 'user_id',
+        'tree': 'tree_id',
+        'account': 'account_id',
+    }
+    expanded_columns = {
+        'tree': {
+            'id': 'tree_id',
+            'name': 'tree_name',
+            'scientific_name': 'tree_scientific_name',
+        },
+        'account': {'id': 'account_id', 'name': 'account_name'},
+    }
+
+    def __init__(self, fieldset: Fieldset) -> None:
+        names = fieldset.fields or tuple(self.columns)
+        self.encoders = exports.encoders()
+        self.lookups = []
+        self.plan = []
+        for name in names:
+            if name in fieldset.expand:
+                getters = [
+                    (key, self._getter(column))
+                    for key, column in self.expanded_columns[name].items()
+                ]
+                self.plan.append((
+                    name,
+                    lambda row, getters=getters: {
+                        key: get(row) for key, get in getters
+                    },
+                ))
+            else:
+                self.plan.append((name, self._getter(self.columns[name])))
+
+    @classmethod
+    def for_fieldset(
+        cls, fieldset: Fieldset | None
+    ) -> PlantedTreeRowSerializer | None:
+        """Return a row serializer for *fieldset*, if it can render it."""
+        if fieldset is None:
+            return None
+        names = fieldset.fields or tuple(cls.columns)
+        if any(
+            name not in cls.columns
+            or (name in fieldset.expand and name not in cls.expanded_columns)
+            for name in names
+        ):
+            return None
+        return cls(fieldset)
+
+    def _getter(self, column: str) -> Callable[[dict], Any]:
+        lookup, encoder = exports.COLUMNS[column]
+        encode = self.encoders[encoder]
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lambda row: encode(row[lookup])
+
+    def render(self, rows: Iterable[dict]) -> list[dict[str, Any]]:
+        plan = self.plan
+        return [{key: get(row) for key, get in plan} for row in rows]
+
+
+class PlantedTreeItemListSerializer(serializers.ListSerializer):
+    """Validates bulk items column by column, see ``apps.trees.batch``."""
+
+    def to_internal_value(self, data: Any) -> list[dict[str, Any]]:  # noqa: ANN401
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(
+                input_type=type(data).__name__
+            )
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]},
+                code='not_a_list',
+            )
+        if not self.allow_empty and not data:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        self.error_messages['empty']
+                    ]
+                },
+                code='empty',
+            )
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(
+                max_length=self.max_length
+            )
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]},
+                code='max_length',
+            )
+
+        plants, errors = batch.parse(data)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return plants
+
+
 class PlantedTreeItemSerializer(serializers.Serializer):
-    tree = TreeSerializer(write_only=True)
-    latitude = serializers.DecimalField(max_digits=9, decimal_places=6)
-    longitude = serializers.DecimalField(max_digits=9, decimal_places=6)
+    id = serializers.UUIDField(read_only=True)
+    planted_at = serializers.DateTimeField(read_only=True)
+    tree_id = serializers.UUIDField()
+    latitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, validators=[validate_latitude]
+    )
+    longitude = serializers.DecimalField(
+        max_digits=9, decimal_places=6, validators=[validate_longitude]
+    )
+
+    class Meta:
+        list_serializer_class = PlantedTreeItemListSerializer
 
 
 class PlantedTreeListSerializer(serializers.Serializer):
-    plants = PlantedTreeItemSerializer(many=True)
+    plants = PlantedTreeItemSerializer(many=True, allow_empty=False)
     account_id = CurrentUserAccountPrimaryKeyRelatedField(
         queryset=Account.objects.none(), write_only=True
     )
 
-    def create(self, validated_data: dict[str, Any]) -> list[PlantedTree]:
-        account = validated_data['account_id']
-        plants_data = validated_data['plants']
+    def validate_plants(  # noqa: PLR6301
+        self, plants_data: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Resolve every ``tree_id`` of the batch from the tree catalog."""
+        trees = catalog.resolve(
+            plant_data['tree_id'] for plant_data in plants_data
+        )
 
-        plants_list = [
+        errors = []
+        for plant_data in plants_data:
+            tree = trees.get(plant_data['tree_id'])
+            if tree is None:
+                errors.append({
+                    'tree_id': [
+                        f'Invalid pk "{plant_data["tree_id"]}" - '
+                        'object does not exist.'
+                    ]
+                })
+                continue
+            plant_data['tree'] = tree
+            errors.append({})
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return plants_data
+
+    @staticmethod
+    def to_plants(plants_data: list[dict[str, Any]]) -> list[batch.Plant]:
+        """Return validated items as ``services.plant_trees`` takes them."""
+        return [
             (
                 plant_data['tree'],
                 (plant_data['latitude'], plant_data['longitude']),
@@ -90,7 +278,247 @@ class PlantedTreeListSerializer(serializers.Serializer):
             for plant_data in plants_data
         ]
 
+    def create(self, validated_data: dict[str, Any]) -> list[PlantedTree]:
         user = self.context['request'].user
-        return services.plant_trees(
-            user=user, account=account, plants=plants_list
+        try:
+            return services.plant_trees(
+                user=user,
+                account=validated_data['account_id'],
+                plants=self.to_plants(validated_data['plants']),
+                reject_duplicates=True,
+            )
+        except batch.InvalidPlantings as exc:
+            raise serializers.ValidationError({'plants': exc.errors}) from exc
+
+    def to_representation(  # noqa: PLR6301
+        self, instance: list[PlantedTree]
+    ) -> dict[str, Any]:
+        return {
+            'plants': PlantedTreeItemSerializer(instance, many=True).data,
+        }
+
+
+class UploadChunkSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = UploadChunk
+        fields = ('number', 'planted', 'created')
+
+
+class UploadSessionSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    """An upload session with the chunks processed so far."""
+
+    account_id = CurrentUserAccountPrimaryKeyRelatedField(
+        queryset=Account.objects.none(), source='account'
+    )
+    chunks = UploadChunkSerializer(many=True, read_only=True)
+    planted = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = (
+            'id',
+            'account_id',
+            'created',
+            'committed_at',
+            'chunks',
+            'planted',
         )
+        read_only_fields = ('created', 'committed_at')
+
+    def get_planted(self, instance: UploadSession) -> int:  # noqa: PLR6301
+        return sum(chunk.planted for chunk in instance.chunks.all())
+
+    def create(self, validated_data: dict[str, Any]) -> UploadSession:
+        return uploads.start(
+            self.context['request'].user, validated_data['account']
+        )
+
+
+class UploadChunkPlantsSerializer(PlantedTreeListSerializer):
+    """The plants of one chunk; the account is the session's."""
+
+    MAX_ITEMS = 10_000
+
+    plants = PlantedTreeItemSerializer(
+        many=True, allow_empty=False, max_length=MAX_ITEMS
+    )
+    account_id = None
+
+
+class UploadCommitSerializer(serializers.Serializer):
+    chunks = serializers.IntegerField(min_value=1, required=False)
+
+
+class PlantingJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    A background bulk planting and its progress.
+
+    The plants are only checked for being a list here; items are validated
+    by the worker and reported in ``errors``.
+    """
+
+    MAX_ITEMS = 100_000
+
+    account_id = CurrentUserAccountPrimaryKeyRelatedField(
+        queryset=Account.objects.none(), source='account'
+    )
+    plants = serializers.ListField(
+        allow_empty=False, max_length=MAX_ITEMS, write_only=True
+    )
+
+    class Meta:
+        model = PlantingJob
+        fields = (
+            'id',
+            'account_id',
+            'plants',
+            'status',
+            'total',
+            'planted',
+            'invalid',
+            'errors',
+            'detail',
+            'created',
+            'started_at',
+            'finished_at',
+        )
+        read_only_fields = (
+            'status',
+            'total',
+            'planted',
+            'invalid',
+            'errors',
+            'detail',
+            'created',
+            'started_at',
+            'finished_at',
+        )
+
+    def create(self, validated_data: dict[str, Any]) -> PlantingJob:
+        return jobs.enqueue(
+            self.context['request'].user,
+            validated_data['account'],
+            validated_data['plants'],
+        )
+
+
+class PlantedTreeDistanceSerializer(PlantedTreeSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(PlantedTreeSerializer.Meta):
+        fields = (*PlantedTreeSerializer.Meta.fields, 'distance')
+
+
+class BoundingBoxQuerySerializer(serializers.Serializer):
+    """Query parameters of a map viewport; ``west > east`` wraps around."""
+
+    south = serializers.FloatField(validators=[validate_latitude])
+    west = serializers.FloatField(validators=[validate_longitude])
+    north = serializers.FloatField(validators=[validate_latitude])
+    east = serializers.FloatField(validators=[validate_longitude])
+
+    def validate(self, attrs: dict[str, Any]) -> geo.BoundingBox:  # noqa: PLR6301
+        if attrs['south'] > attrs['north']:
+            raise serializers.ValidationError(
+                'south must not be greater than north.'
+            )
+        return geo.BoundingBox(**attrs)
+
+
+class ClusterQuerySerializer(BoundingBoxQuerySerializer):
+    MAX_ZOOM = 22
+
+    zoom = serializers.IntegerField(min_value=0, max_value=MAX_ZOOM)
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        zoom = attrs.pop('zoom')
+        bbox = super().validate(attrs)
+        if clusters.cell_count(bbox, zoom) > clusters.MAX_CELLS:
+            raise serializers.ValidationError(
+                f'The box is too large for zoom {zoom}: zoom out or shrink '
+                f'it to at most {clusters.MAX_CELLS} cells.'
+            )
+        return {'bbox': bbox, 'zoom': zoom}
+
+
+class PlantingClusterSerializer(TimedSerializerMixin, serializers.Serializer):
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    count = serializers.IntegerField()
+    species = serializers.DictField(child=serializers.IntegerField())
+
+
+class RadiusQuerySerializer(serializers.Serializer):
+    MAX_RADIUS = 100_000
+    MAX_LIMIT = 1000
+
+    latitude = serializers.FloatField(validators=[validate_latitude])
+    longitude = serializers.FloatField(validators=[validate_longitude])
+    radius = serializers.FloatField(min_value=0, max_value=MAX_RADIUS)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_LIMIT, default=100
+    )
+
+
+class NearestQuerySerializer(serializers.Serializer):
+    MAX_K = 100
+
+    latitude = serializers.FloatField(validators=[validate_latitude])
+    longitude = serializers.FloatField(validators=[validate_longitude])
+    k = serializers.IntegerField(min_value=1, max_value=MAX_K, default=10)
+    radius = serializers.FloatField(min_value=0, required=False)
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    columns = serializers.CharField(required=False)
+
+    def validate_columns(self, value: str) -> list[str]:  # noqa: PLR6301
+        columns = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in columns if name not in COLUMNS]
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown columns: {", ".join(unknown)}. '
+                f'Choose from: {", ".join(COLUMNS)}.'
+            )
+        if not columns:
+            raise serializers.ValidationError('Select at least one column.')
+        return columns
+
+
+class IngestQuerySerializer(serializers.Serializer):
+    MAX_BATCH_SIZE = 10_000
+
+    account_id = CurrentUserAccountPrimaryKeyRelatedField(
+        queryset=Account.objects.none()
+    )
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=MAX_BATCH_SIZE, required=False
+    )
+
+
+class AccountTreeMonthlyStatSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    account_id = serializers.UUIDField(read_only=True)
+    tree_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = AccountTreeMonthlyStat
+        fields = ('account_id', 'tree_id', 'month', 'count')
+
+
+class UserMonthlyStatSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = UserMonthlyStat
+        fields = ('month', 'count')
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    account_id = serializers.UUIDField(required=False)
+    tree_id = serializers.UUIDField(required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
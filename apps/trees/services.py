@@ -1,12 +1,61 @@
+from collections.abc import Iterable
 from decimal import Decimal
+from functools import partial
+from itertools import batched
+from uuid import UUID
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
-from django.db import transaction
+from django.db import connections, router, transaction
 
+from apps.core import metrics, versions
+from apps.users import membership
 from apps.users.models import Account, User
 
+from . import batch, clusters, geo, ingest, nearby, stats
 from .models import PlantedTree, Tree
 
+# Version scopes (see apps.core.versions) of the plantings served by the
+# views; the tree catalog's is catalog.CATALOG_SCOPE.
+
+
+def user_scope(user_id: UUID) -> str:
+    return f'trees:user:{user_id}'
+
+
+def account_scope(account_id: UUID) -> str:
+    return f'trees:account:{account_id}'
+
+
+def bump_planting_scopes(planted_trees: Iterable[PlantedTree]) -> None:
+    """Advance the versions of every user and account of *planted_trees*."""
+    scopes = set()
+    for planted_tree in planted_trees:
+        scopes.add(user_scope(planted_tree.user_id))
+        scopes.add(account_scope(planted_tree.account_id))
+    versions.bump(*scopes)
+
+
+def ensure_account_member(user: User, account: Account) -> None:
+    """
+    Check that *user* may plant trees for *account*.
+
+    Raises:
+        PermissionDenied: If the user does not belong to the account.
+    """
+    if not membership.is_member(user, account.pk):
+        raise PermissionDenied(
+            'User does not have permission to plant in this account.'
+        )
+
+
+def _record_plantings(planted_trees: list[PlantedTree]) -> None:
+    """Update data derived from plantings, in the caller's transaction."""
+    stats.record_plantings(planted_trees)
+    clusters.record_plantings(planted_trees)
+    bump_planting_scopes(planted_trees)
+    transaction.on_commit(partial(nearby.add, planted_trees))
+
 
 @transaction.atomic
 def plant_tree(
@@ -28,23 +77,27 @@ def plant_tree(
     Raises:
         PermissionDenied: If the user does not belong to the account.
     """
-    if not user.accounts.filter(pk=account.pk).exists():
-        raise PermissionDenied(
-            'User does not have permission to plant in this account.'
-        )
+    ensure_account_member(user, account)
 
-    return PlantedTree.objects.create(
+    planted_tree = PlantedTree.objects.create(
         user=user,
         account=account,
         tree=tree,
         latitude=latitude,
         longitude=longitude,
     )
+    # Recorded by apps.trees.signals, like plantings made elsewhere.
+    return planted_tree
 
 
 @transaction.atomic
 def plant_trees(
-    *, user: User, account: Account, plants: list[dict]
+    *,
+    user: User,
+    account: Account,
+    plants: list[dict],
+    batch_size: int | None = None,
+    reject_duplicates: bool = False,
 ) -> list[PlantedTree]:
     """
     Plants multiple trees at specified locations for an account.
@@ -54,13 +107,19 @@ def plant_trees(
         plants: List of tuples, where each tuple contains a `Tree`
         instance and a tuple (latitude, longitude) as `Decimal`.
         account: Account associated with the tree planting.
+        batch_size: Maximum number of rows per INSERT statement.
+        reject_duplicates: Refuse plants repeating a (tree, latitude,
+        longitude) of the batch or of the account's recent plantings.
     Raises:
         PermissionDenied: If the user does not belong to the account.
+        InvalidPlantings: If a plant is out of range or, with
+        `reject_duplicates`, a repeat; nothing is planted.
     """
-    if not user.accounts.filter(pk=account.pk).exists():
-        raise PermissionDenied(
-            'User does not have permission to plant in this account.'
-        )
+    ensure_account_member(user, account)
+    errors = batch.check(account, plants, duplicates=reject_duplicates)
+    if errors is not None:
+        metrics.BULK_REJECTED_ROWS.inc(sum(1 for error in errors if error))
+        raise batch.InvalidPlantings(errors)
 
     planted_trees_to_create = [
         PlantedTree(
@@ -69,8 +128,77 @@ def plant_trees(
             tree=plant[0],
             latitude=plant[1][0],
             longitude=plant[1][1],
+            grid_cell=geo.grid_cell(plant[1][0], plant[1][1]),
         )
         for plant in plants
     ]
 
-    return PlantedTree.objects.bulk_create(planted_trees_to_create)
+    planted_trees = PlantedTree.objects.bulk_create(
+        planted_trees_to_create, batch_size=batch_size
+    )
+    _record_plantings(planted_trees)
+    transaction.on_commit(
+        partial(metrics.BULK_PLANTED_ROWS.inc, len(planted_trees))
+    )
+    return planted_trees
+
+
+def ingest_plantings(
+    *,
+    user: User,
+    account: Account,
+    records: Iterable[ingest.Record],
+    batch_size: int | None = None,
+    use_copy: bool | None = None,
+) -> ingest.IngestReport:
+    """
+    Plants trees from a (possibly huge) stream of parsed upload records.
+
+    Records are validated and written one batch at a time, each batch in
+    its own short transaction, so memory and lock time stay bounded no
+    matter how large the upload is. Rows of batches that were already
+    written stay planted if a later batch fails.
+
+    Args:
+        user: User logged in.
+        account: Account associated with the tree planting.
+        records: ``(row, data, error)`` tuples from ``ingest.parse_*``.
+        batch_size: Rows per batch; ``TREES_INGEST_BATCH_SIZE`` if omitted.
+        use_copy: Write with ``COPY FROM STDIN``; defaults to ``True`` on
+        PostgreSQL when ``TREES_INGEST_USE_COPY`` is enabled.
+    Raises:
+        PermissionDenied: If the user does not belong to the account.
+    """
+    ensure_account_member(user, account)
+
+    batch_size = batch_size or settings.TREES_INGEST_BATCH_SIZE
+    if use_copy is None:
+        vendor = connections[router.db_for_write(PlantedTree)].vendor
+        use_copy = settings.TREES_INGEST_USE_COPY and vendor == 'postgresql'
+
+    report = ingest.IngestReport()
+    for chunk in batched(records, batch_size):
+        valid = ingest.validate_batch(chunk, report)
+        if not valid:
+            continue
+        planted_trees = [
+            PlantedTree(
+                user=user,
+                account=account,
+                tree=tree,
+                latitude=latitude,
+                longitude=longitude,
+                grid_cell=geo.grid_cell(latitude, longitude),
+            )
+            for tree, latitude, longitude in valid
+        ]
+        with transaction.atomic():
+            if use_copy:
+                ingest.copy_planted_trees(planted_trees)
+            else:
+                PlantedTree.objects.bulk_create(
+                    planted_trees, batch_size=batch_size
+                )
+            _record_plantings(planted_trees)
+        report.accepted += len(planted_trees)
+    return report
@@ -0,0 +1,87 @@
+from functools import partial
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core import versions
+
+from . import catalog, clusters, nearby, services, stats
+from .models import PlantedTree, Tree
+
+
+@receiver(post_delete, sender=PlantedTree)
+def forget_planting(instance: PlantedTree, **kwargs: Any) -> None:  # noqa: ANN401
+    stats.forget_plantings([instance])
+    clusters.forget_plantings([instance])
+    services.bump_planting_scopes([instance])
+    transaction.on_commit(partial(nearby.discard, [instance]))
+
+
+# What the rollups, the cluster cells and the nearby index derive from
+DERIVED_FROM = (
+    'user_id',
+    'account_id',
+    'tree_id',
+    'planted_at',
+    'latitude',
+    'longitude',
+    'grid_cell',
+)
+
+
+@receiver(pre_save, sender=PlantedTree)
+def remember_planting(
+    instance: PlantedTree,
+    raw: bool,  # noqa: FBT001
+    using: str,
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    # The stored row, so touch_planting can move what derives from it.
+    if raw or instance._state.adding:
+        return
+    instance._stored = (
+        PlantedTree.objects
+        .using(using)
+        .select_for_update()
+        .filter(pk=instance.pk)
+        .only(*(name.removesuffix('_id') for name in DERIVED_FROM))
+        .first()
+    )
+
+
+@receiver(post_save, sender=PlantedTree)
+def touch_planting(
+    instance: PlantedTree,
+    created: bool,  # noqa: FBT001
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    # Bulk inserts (services.plant_trees, ingest) skip this and record
+    # themselves; single ones, from the services, the admin or the ORM, don't.
+    stored = instance.__dict__.pop('_stored', None)
+    if created:
+        stats.record_plantings([instance])
+        clusters.record_plantings([instance])
+        services.bump_planting_scopes([instance])
+        transaction.on_commit(partial(nearby.add, [instance]))
+        return
+    if stored is not None and any(
+        getattr(stored, name) != getattr(instance, name)
+        for name in DERIVED_FROM
+    ):
+        stats.forget_plantings([stored])
+        clusters.forget_plantings([stored])
+        stats.record_plantings([instance])
+        clusters.record_plantings([instance])
+    changed = [instance] if stored is None else [stored, instance]
+    services.bump_planting_scopes(changed)
+    transaction.on_commit(partial(nearby.discard, [stored or instance]))
+    transaction.on_commit(partial(nearby.add, [instance]))
+
+
+@receiver(post_save, sender=Tree)
+@receiver(post_delete, sender=Tree)
+def touch_catalog(instance: Tree, **kwargs: Any) -> None:  # noqa: ANN401
+    versions.bump(catalog.CATALOG_SCOPE)
+    catalog.invalidate()
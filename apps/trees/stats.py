@@ -0,0 +1,126 @@
+"""
+Incrementally maintained planting rollups.
+
+``AccountTreeMonthlyStat`` and ``UserMonthlyStat`` are kept in step with
+``PlantedTree`` by the planting services (in the same transaction) and by a
+``post_delete`` receiver, so dashboards never aggregate the raw table. The
+``rebuild_planting_stats`` command recomputes both from scratch.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import Any
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Model
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import AccountTreeMonthlyStat, PlantedTree, UserMonthlyStat
+
+__all__ = [
+    'forget_plantings',
+    'increment',
+    'month_of',
+    'rebuild',
+    'record_plantings',
+]
+
+
+def month_of(planted_at: datetime) -> date:
+    """Return the first day of the (current time zone) month of a planting."""
+    return timezone.localdate(planted_at).replace(day=1)
+
+
+def increment(
+    model: type[Model], lookup: dict[str, Any], count: int, **sums: int
+) -> None:
+    """
+    Add *count* (and every other ``field=delta`` of *sums*) to a rollup row.
+
+    The row matching *lookup* is created when missing, unless *count* is
+    negative.
+    """
+    deltas = {'count': count, **sums}
+    changes = {name: F(name) + delta for name, delta in deltas.items()}
+    updated = model.objects.filter(**lookup).update(**changes)
+    if updated or count < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**deltas, **lookup)
+    except IntegrityError:
+        # A concurrent transaction created the row first.
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _apply(planted_trees: Iterable[PlantedTree], sign: int) -> None:
+    by_account = Counter()
+    by_user = Counter()
+    for planted_tree in planted_trees:
+        month = month_of(planted_tree.planted_at)
+        by_account[planted_tree.account_id, planted_tree.tree_id, month] += 1
+        by_user[planted_tree.user_id, month] += 1
+
+    # Sorted keys keep the row-lock order stable between transactions.
+    for (account_id, tree_id, month), count in sorted(by_account.items()):
+        increment(
+            AccountTreeMonthlyStat,
+            {'account_id': account_id, 'tree_id': tree_id, 'month': month},
+            sign * count,
+        )
+    for (user_id, month), count in sorted(by_user.items()):
+        increment(
+            UserMonthlyStat,
+            {'user_id': user_id, 'month': month},
+            sign * count,
+        )
+
+
+def record_plantings(planted_trees: Iterable[PlantedTree]) -> None:
+    """Add freshly inserted plantings to the rollups."""
+    _apply(planted_trees, 1)
+
+
+def forget_plantings(planted_trees: Iterable[PlantedTree]) -> None:
+    """Remove deleted plantings from the rollups."""
+    _apply(planted_trees, -1)
+
+
+@transaction.atomic
+def rebuild(batch_size: int = 2000) -> tuple[int, int]:
+    """
+    Recompute both rollups from ``PlantedTree``.
+
+    Returns the number of account/tree and user rollup rows written.
+    """
+    month = TruncMonth('planted_at', output_field=DateField())
+    plantings = PlantedTree.objects.order_by().annotate(month=month)
+
+    AccountTreeMonthlyStat.objects.all().delete()
+    account_rows = AccountTreeMonthlyStat.objects.bulk_create(
+        (
+            AccountTreeMonthlyStat(**row)
+            for row in plantings
+            .values('account_id', 'tree_id', 'month')
+            .annotate(count=Count('id'))
+            .iterator(chunk_size=batch_size)
+        ),
+        batch_size=batch_size,
+    )
+
+    UserMonthlyStat.objects.all().delete()
+    user_rows = UserMonthlyStat.objects.bulk_create(
+        (
+            UserMonthlyStat(**row)
+            for row in plantings
+            .values('user_id', 'month')
+            .annotate(count=Count('id'))
+            .iterator(chunk_size=batch_size)
+        ),
+        batch_size=batch_size,
+    )
+    return len(account_rows), len(user_rows)
@@ -0,0 +1,295 @@
+"""
+Deterministic synthetic data for local profiling.
+
+``generate`` writes users, accounts, memberships, tree species and
+plantings derived only from its ``seed``: the same arguments always produce
+the same rows, primary keys included, so benchmark runs on different
+commits measure the same data. Plantings are generated as raw rows and
+inserted in batches with ``COPY`` on PostgreSQL and a single
+``executemany`` per batch elsewhere, skipping model instances entirely.
+Since that also skips the signals, ``generate`` bumps the version scopes
+and drops the cached memberships and catalog itself.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import itertools
+import math
+import random
+import uuid
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router
+from django.utils import timezone
+
+from apps.core import versions
+from apps.users import membership
+from apps.users.models import Account, User, UserAccount
+
+from . import catalog, clusters, geo, ingest, services, stats
+from .models import PlantedTree, Tree
+
+__all__ = ['SeedReport', 'generate']
+
+# Timestamps are anchored so that a seed yields the same rows on any day.
+EPOCH = datetime(2025, 1, 1, tzinfo=UTC)
+PASSWORD = 'synthetic'  # noqa: S105
+
+GENERA = (
+    'Handroanthus',
+    'Cerasus',
+    'Caesalpinia',
+    'Araucaria',
+    'Tabebuia',
+    'Cedrela',
+    'Ficus',
+    'Quercus',
+    'Eugenia',
+    'Jacaranda',
+)
+EPITHETS = (
+    'albus',
+    'serrulata',
+    'echinata',
+    'angustifolia',
+    'roseoalba',
+    'fissilis',
+    'benjamina',
+    'robur',
+    'uniflora',
+    'mimosifolia',
+)
+
+
+@dataclass
+class SeedReport:
+    users: int = 0
+    accounts: int = 0
+    memberships: int = 0
+    trees: int = 0
+    planted_trees: int = 0
+
+
+def _uuid7(rng: random.Random, moment: datetime) -> uuid.UUID:
+    """Build a UUIDv7 for *moment* from *rng* instead of the OS."""
+    milliseconds = int(moment.timestamp() * 1000)
+    value = (milliseconds << 80) | rng.getrandbits(80)
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def _insert(rows: Sequence[Sequence[Any]]) -> None:
+    """Insert raw ``COPY_COLUMNS`` rows with a single ``executemany``."""
+    connection = connections[router.db_for_write(PlantedTree)]
+    opts = PlantedTree._meta
+    fields = [opts.get_field(name) for name in ingest.COPY_COLUMNS]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(opts.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    prepare = [
+        functools.partial(field.get_db_prep_save, connection=connection)
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            sql,
+            [
+                [convert(value) for convert, value in zip(prepare, row)]
+                for row in rows
+            ],
+        )
+
+
+def _skewed_weights(rng: random.Random, size: int) -> list[float]:
+    """Cumulative Zipf-like weights: a few popular items, a long tail."""
+    ranks = list(range(1, size + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1 / rank for rank in ranks))
+
+
+def _coordinate(value: float, limit: int) -> Decimal:
+    return Decimal(f'{max(-limit, min(limit, value)):.6f}')
+
+
+def generate(  # noqa: PLR0913, PLR0917
+    users: int,
+    accounts: int,
+    trees: int,
+    planted_trees: int,
+    *,
+    seed: int = 0,
+    batch_size: int = 5000,
+    years: int = 10,
+    progress: Callable[[int], None] | None = None,
+) -> SeedReport:
+    """
+    Write a synthetic data set and refresh the planting rollups.
+
+    Args:
+        users: Number of users; each joins one to three accounts.
+        accounts: Number of accounts, each with its own planting area.
+        trees: Number of tree species, planted with a skewed popularity.
+        planted_trees: Number of plantings, spread over ``years`` years.
+        seed: Seed of every random choice, primary keys included.
+        batch_size: Rows written per round trip.
+        years: How far back plantings go from 2025-01-01.
+        progress: Called with the running planting count after each batch.
+    Raises:
+        IntegrityError: If the same seed was already written.
+    """
+    rng = random.Random(seed)
+    report = SeedReport()
+
+    account_objs = [
+        Account(
+            id=_uuid7(rng, EPOCH),
+            name=f'Synthetic {seed} account {index:06d}',
+        )
+        for index in range(accounts)
+    ]
+    Account.objects.bulk_create(account_objs, batch_size=batch_size)
+    report.accounts = len(account_objs)
+
+    password = make_password(PASSWORD)
+    user_objs = [
+        User(
+            id=_uuid7(rng, EPOCH),
+            username=f'synthetic-{seed}-{index:07d}',
+            email=f'synthetic-{seed}-{index:07d}@example.com',
+            password=password,
+            date_joined=EPOCH,
+        )
+        for index in range(users)
+    ]
+    User.objects.bulk_create(user_objs, batch_size=batch_size)
+    report.users = len(user_objs)
+
+    # Some accounts attract far more members than others.
+    account_weights = _skewed_weights(rng, accounts)
+    memberships = []
+    for user in user_objs:
+        joined = {
+            account_objs[index].id: account_objs[index]
+            for index in (
+                bisect.bisect(
+                    account_weights, rng.random() * account_weights[-1]
+                )
+                for _ in range(rng.randint(1, 3))
+            )
+        }
+        memberships.extend((user, account) for account in joined.values())
+    UserAccount.objects.bulk_create(
+        (
+            UserAccount(id=_uuid7(rng, EPOCH), user=user, account=account)
+            for user, account in memberships
+        ),
+        batch_size=batch_size,
+    )
+    report.memberships = len(memberships)
+
+    tree_objs = [
+        Tree(
+            id=_uuid7(rng, EPOCH),
+            name=f'Synthetic {seed} tree {index:05d}',
+            scientific_name=f'{rng.choice(GENERA)} {rng.choice(EPITHETS)}',
+        )
+        for index in range(trees)
+    ]
+    Tree.objects.bulk_create(tree_objs, batch_size=batch_size)
+    report.trees = len(tree_objs)
+
+    if memberships and tree_objs:
+        report.planted_trees = _plant(
+            rng,
+            memberships,
+            tree_objs,
+            planted_trees,
+            batch_size=batch_size,
+            years=years,
+            progress=progress,
+        )
+        stats.rebuild(batch_size=batch_size)
+        clusters.rebuild(batch_size=batch_size)
+    versions.bump(
+        catalog.CATALOG_SCOPE,
+        *(services.user_scope(user.id) for user, _ in memberships),
+        *(services.account_scope(account.id) for _, account in memberships),
+    )
+    # Both drop this process's copy again once the transaction commits.
+    membership.invalidate(
+        (user.id for user in user_objs),
+        (account.id for account in account_objs),
+    )
+    catalog.invalidate()
+    return report
+
+
+def _plant(  # noqa: PLR0913
+    rng: random.Random,
+    memberships: list[tuple[User, Account]],
+    tree_objs: list[Tree],
+    count: int,
+    *,
+    batch_size: int,
+    years: int,
+    progress: Callable[[int], None] | None,
+) -> int:
+    # Each account plants around its own center, roughly a city wide.
+    centers = {
+        account.id: (rng.uniform(-60, 70), rng.uniform(-180, 180))
+        for _, account in memberships
+    }
+    tree_weights = _skewed_weights(rng, len(tree_objs))
+    span = timedelta(days=365 * years).total_seconds()
+    connection = connections[router.db_for_write(PlantedTree)]
+    use_copy = connection.vendor == 'postgresql'
+    # The only value not derived from the seed: it is when the rows are
+    # written, so other processes' nearby indexes pull them in.
+    modified_at = timezone.now()
+
+    def rows() -> Iterator[tuple[Any, ...]]:
+        for _ in range(count):
+            user, account = rng.choice(memberships)
+            center_latitude, center_longitude = centers[account.id]
+            latitude = _coordinate(rng.gauss(center_latitude, 0.2), 90)
+            longitude = _coordinate(
+                math.remainder(rng.gauss(center_longitude, 0.2), 360), 180
+            )
+            planted_at = EPOCH - timedelta(seconds=rng.random() * span)
+            tree = tree_objs[
+                bisect.bisect(tree_weights, rng.random() * tree_weights[-1])
+            ]
+            # In ingest.COPY_COLUMNS order.
+            yield (
+                _uuid7(rng, planted_at),
+                planted_at,
+                modified_at,
+                user.id,
+                tree.id,
+                account.id,
+                latitude,
+                longitude,
+                geo.grid_cell(latitude, longitude),
+            )
+
+    written = 0
+    for batch in itertools.batched(rows(), batch_size):
+        if use_copy:
+            ingest.copy_rows(batch)
+        else:
+            _insert(batch)
+        written += len(batch)
+        if progress is not None:
+            progress(written)
+    return written
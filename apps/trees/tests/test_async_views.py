@@ -0,0 +1,116 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from apps.core.authentication import BearerTokenAuthentication
+from apps.trees.models import Tree
+from apps.trees.services import plant_tree
+from apps.users.models import Account, User
+
+
+class AsyncViewsTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        BearerTokenAuthentication.local_cache().clear()
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.other = User.objects.create_user(
+            username='ciclano', email='ciclano@email.com', password='test1234'
+        )
+        self.other.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.planted_trees = [
+            plant_tree(
+                user=user,
+                account=self.account,
+                tree=self.tree,
+                latitude=Decimal('12.345678'),
+                longitude=Decimal('-12.345678'),
+            )
+            for user in (self.user, self.user, self.other)
+        ]
+
+        self.authorization = (
+            f'Bearer {Token.objects.create(user=self.user).key}'
+        )
+        self.sync_client = APIClient(HTTP_AUTHORIZATION=self.authorization)
+
+    def _get(
+        self,
+        url: str,
+        data: dict | None = None,
+        headers: dict | None = None,
+        authorization: str | None = None,
+    ) -> object:
+        headers = {
+            'Authorization': authorization or self.authorization,
+            **(headers or {}),
+        }
+        return async_to_sync(AsyncClient().get)(url, data, headers=headers)
+
+    def test_async_views_serve_the_same_json(self) -> None:
+        """Every async endpoint mirrors its sync counterpart."""
+        endpoints = [
+            ('tree-list-create', {}),
+            ('tree-detail', {'pk': self.tree.pk}),
+            ('planted-tree-list-by-user', {}),
+            ('planted-tree-list-by-accounts', {}),
+            ('planted-tree-detail', {'pk': self.planted_trees[0].pk}),
+        ]
+        for name, kwargs in endpoints:
+            with self.subTest(name):
+                expected = self.sync_client.get(
+                    reverse(f'trees:{name}', kwargs=kwargs)
+                )
+                response = self._get(
+                    reverse(f'trees-async:{name}', kwargs=kwargs)
+                )
+
+                assert response.status_code == HTTPStatus.OK
+                assert response['Content-Type'] == 'application/json'
+                assert response.json() == expected.json()
+
+    def test_pagination_and_conditional_get(self) -> None:
+        """Keyset pages and ETags work as on the sync views."""
+        url = reverse('trees-async:planted-tree-list-by-accounts')
+
+        page = self._get(url, data={'page_size': 2}).json()
+        assert len(page['results']) == 2  # noqa: PLR2004
+        rest = self._get(page['next']).json()
+        assert len(rest['results']) == 1
+        assert rest['next'] is None
+
+        etag = self._get(url)['ETag']
+        response = self._get(url, headers={'If-None-Match': etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_authentication_and_permissions(self) -> None:
+        """Anonymous callers get 401 and foreign plantings 403."""
+        url = reverse('trees-async:tree-list-create')
+        response = async_to_sync(AsyncClient().get)(url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response['WWW-Authenticate'] == 'Bearer'
+
+        response = self._get(url, authorization='Bearer nope')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.json() == {'detail': 'Invalid token.'}
+
+        foreign = reverse(
+            'trees-async:planted-tree-detail',
+            kwargs={'pk': self.planted_trees[2].pk},
+        )
+        assert self._get(foreign).status_code == HTTPStatus.FORBIDDEN
+
+        missing = reverse(
+            'trees-async:tree-detail', kwargs={'pk': self.account.pk}
+        )
+        assert self._get(missing).status_code == HTTPStatus.NOT_FOUND
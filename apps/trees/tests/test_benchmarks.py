@@ -0,0 +1,114 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import Sum
+from django.test import TestCase
+
+from apps.core import versions
+from apps.trees import benchmarks, catalog, services, synthetic
+from apps.trees.models import AccountTreeMonthlyStat, PlantedTree, Tree
+from apps.users import membership
+from apps.users.models import UserAccount
+
+
+class SyntheticDataTestCase(TestCase):
+    def _generate(self, seed: int) -> set[tuple]:  # noqa: PLR6301
+        with transaction.atomic():
+            synthetic.generate(20, 4, 5, 300, seed=seed, batch_size=64)
+            rows = set(
+                PlantedTree.objects.values_list(
+                    'id', 'user_id', 'account_id', 'tree_id', 'latitude'
+                )
+            )
+            transaction.set_rollback(True)
+        return rows
+
+    def test_same_seed_yields_same_rows(self) -> None:
+        """Primary keys included, a seed always produces the same data."""
+        first = self._generate(seed=1)
+
+        assert len(first) == 300  # noqa: PLR2004
+        assert self._generate(seed=1) == first
+        assert self._generate(seed=2) != first
+
+    def test_plantings_are_consistent(self) -> None:  # noqa: PLR6301
+        """Planters belong to the account and rollups are up to date."""
+        call_command(
+            'seed_trees',
+            users=20,
+            accounts=4,
+            trees=5,
+            planted=300,
+            stdout=StringIO(),
+        )
+
+        memberships = set(
+            UserAccount.objects.values_list('user_id', 'account_id')
+        )
+        planters = set(
+            PlantedTree.objects.values_list('user_id', 'account_id')
+        )
+        assert planters <= memberships
+        assert PlantedTree.objects.exclude(grid_cell=0).count() == 300  # noqa: PLR2004
+        total = AccountTreeMonthlyStat.objects.aggregate(total=Sum('count'))
+        assert total['total'] == 300  # noqa: PLR2004
+
+    def test_cached_reads_are_invalidated(self) -> None:
+        """Seeding bumps the scopes its bulk inserts bypass the signals of."""
+        before = versions.current(catalog.CATALOG_SCOPE)[0]
+        catalog.snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                'seed_trees',
+                users=20,
+                accounts=4,
+                trees=5,
+                planted=300,
+                stdout=StringIO(),
+            )
+
+        assert versions.current(catalog.CATALOG_SCOPE)[0] > before
+        user, account = UserAccount.objects.values_list(
+            'user_id', 'account_id'
+        ).first()
+        assert versions.current(membership.user_scope(user))[0]
+        assert versions.current(membership.account_scope(account))[0]
+        user_id, account_id = PlantedTree.objects.values_list(
+            'user_id', 'account_id'
+        ).first()
+        assert versions.current(services.user_scope(user_id))[0] == 1
+        assert versions.current(services.account_scope(account_id))[0] == 1
+        assert len(catalog.snapshot()) == Tree.objects.count()
+
+
+class RunBenchmarksCommandTestCase(TestCase):
+    def test_results_are_written_and_rolled_back(self) -> None:  # noqa: PLR6301
+        """Every benchmark is reported and the database is left as is."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.json'
+            call_command(
+                'run_benchmarks',
+                seed_planted=200,
+                repeat=2,
+                output=output,
+                stdout=StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+        assert [result['name'] for result in report['results']] == list(
+            benchmarks.BENCHMARKS
+        )
+        assert report['dataset']['planted_trees'] == 200  # noqa: PLR2004
+        assert all(result['min'] > 0 for result in report['results'])
+        assert not PlantedTree.objects.exists()
+
+    def test_patterns_select_benchmarks(self) -> None:  # noqa: PLR6301
+        """Glob patterns pick benchmarks by name."""
+        assert benchmarks.select(['managers.*']) == [
+            'managers.for_user',
+            'managers.for_accounts',
+        ]
@@ -0,0 +1,258 @@
+import json
+from decimal import Decimal
+from http import HTTPStatus
+from uuid import UUID
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import batch, services
+from apps.trees.models import PlantedTree, Tree
+from apps.trees.serializers import PlantedTreeItemSerializer
+from apps.users.models import Account, User
+
+
+class PlantedTreeBulkCreateViewTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree1 = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.tree2 = Tree.objects.create(
+            name='Sakura', scientific_name='Cerasus serrulata'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('trees:planted-tree-bulk-create')
+
+    def _payload(self, size: int, offset: int = 0) -> dict:
+        """Plants spread over latitudes; *offset* moves them east a bit."""
+        trees = (self.tree1, self.tree2)
+        return {
+            'account_id': str(self.account.id),
+            'plants': [
+                {
+                    'tree_id': str(trees[index % 2].id),
+                    'latitude': f'{index % 90}.5',
+                    'longitude': f'-45.{123456 - offset}',
+                }
+                for index in range(size)
+            ],
+        }
+
+    def _post(self, payload: dict) -> tuple[object, int]:
+        """Post *payload*; cluster cell writes are counted separately."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.cluster_queries = sum(
+            'plantingclustercell' in query['sql'] for query in queries
+        )
+        return response, len(queries) - self.cluster_queries
+
+    def test_bulk_create_plants_every_item(self) -> None:
+        """Each item references its tree by id."""
+        response, _ = self._post(self._payload(3))
+
+        assert response.status_code == HTTPStatus.CREATED
+        created = {UUID(plant['id']) for plant in response.data['plants']}
+        assert created == set(PlantedTree.objects.values_list('id', flat=True))
+        assert PlantedTree.objects.filter(tree=self.tree2).count() == 1
+
+    def test_query_count_does_not_grow_with_payload(self) -> None:
+        """Trees are resolved with one query whatever the batch size."""
+        # Warm the membership cache and create the rollup rows and cluster
+        # cells of every location the payloads use.
+        self._post(self._payload(50))
+
+        _, small = self._post(self._payload(2, offset=1))
+        _, large = self._post(self._payload(50, offset=2))
+
+        assert small == large
+        # A read and batched writes, for 250 cells over every zoom level.
+        assert self.cluster_queries <= 3  # noqa: PLR2004
+
+    def test_unknown_tree_ids_are_reported_per_item(self) -> None:
+        """Missing trees become aggregated, index-aligned errors."""
+        payload = self._payload(3)
+        payload['plants'][1]['tree_id'] = str(self.account.id)
+
+        response, _ = self._post(payload)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.data['plants']
+        assert errors[0] == {}
+        assert 'tree_id' in errors[1]
+        assert errors[2] == {}
+        assert not PlantedTree.objects.exists()
+
+    def test_batch_errors_match_per_item_validation(self) -> None:
+        """Column-wise validation reports what the item serializer would."""
+        items = [
+            {'tree_id': 'x', 'latitude': '91', 'longitude': '0'},
+            {'tree_id': str(self.tree1.id), 'latitude': '1.1234567'},
+            {
+                'tree_id': str(self.tree1.id),
+                'latitude': 'abc',
+                'longitude': None,
+            },
+            {
+                'tree_id': str(self.tree1.id),
+                'latitude': 'NaN',
+                'longitude': '1e3',
+            },
+            {
+                'tree_id': str(self.tree1.id),
+                'latitude': 0,
+                'longitude': -180.5,
+            },
+            {
+                'tree_id': str(self.tree1.id),
+                'latitude': '-90',
+                'longitude': '180',
+            },
+            [],
+        ]
+        expected = []
+        for item in items:
+            serializer = PlantedTreeItemSerializer(data=item)
+            serializer.is_valid()
+            expected.append(json.loads(json.dumps(serializer.errors)))
+
+        _, errors = batch.parse(items)
+
+        assert errors == expected
+        assert errors[5] == {}
+
+    def test_invalid_coordinates_are_reported_per_item(self) -> None:
+        """Out of range items get index-aligned errors, nothing is planted."""
+        payload = self._payload(3)
+        payload['plants'][2]['longitude'] = '181'
+
+        response, _ = self._post(payload)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.data['plants'][:2] == [{}, {}]
+        assert response.data['plants'][2] == {
+            'longitude': ['Value 181.000000 must be between -180 and 180.']
+        }
+        assert not PlantedTree.objects.exists()
+
+    def test_duplicates_are_rejected(self) -> None:
+        """Repeats inside the batch and of recent plantings are refused."""
+        payload = self._payload(3)
+        payload['plants'].append(dict(payload['plants'][1]))
+        response, _ = self._post(payload)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.data['plants'][3] == {
+            'non_field_errors': ['Duplicate of item 1.']
+        }
+
+        response, _ = self._post(self._payload(2))
+        assert response.status_code == HTTPStatus.CREATED
+        response, _ = self._post(self._payload(3))
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert [bool(errors) for errors in response.data['plants']] == [
+            True,
+            True,
+            False,
+        ]
+        assert PlantedTree.objects.count() == 2  # noqa: PLR2004
+
+        with override_settings(TREES_DUPLICATE_WINDOW=0):
+            response, _ = self._post(self._payload(3))
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_services_check_the_batch(self) -> None:
+        """Direct callers get the same checks; duplicates on request."""
+        plants = [
+            (self.tree1, (Decimal('1.5'), Decimal('2.5'))),
+            (self.tree1, (Decimal('1.500000'), Decimal('2.5'))),
+        ]
+        services.plant_trees(
+            user=self.user, account=self.account, plants=plants
+        )
+
+        with self.assertRaises(batch.InvalidPlantings) as raised:  # noqa: PT027
+            services.plant_trees(
+                user=self.user,
+                account=self.account,
+                plants=[*plants, (self.tree2, (Decimal(95), Decimal(0)))],
+                reject_duplicates=True,
+            )
+        assert [list(errors) for errors in raised.exception.errors] == [
+            ['non_field_errors'],
+            ['non_field_errors'],
+            ['latitude'],
+        ]
+        assert PlantedTree.objects.count() == 2  # noqa: PLR2004
+
+    def test_idempotency_key_replays_the_first_response(self) -> None:
+        """A retried key plants nothing and answers like the first time."""
+        headers = {'Idempotency-Key': 'batch-1'}
+        payload = self._payload(3)
+        first = self.client.post(
+            self.url, payload, format='json', headers=headers
+        )
+        retry = self.client.post(
+            self.url, payload, format='json', headers=headers
+        )
+
+        assert first.status_code == retry.status_code == HTTPStatus.CREATED
+        assert retry.json() == first.json()
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert PlantedTree.objects.count() == 3  # noqa: PLR2004
+
+        response = self.client.post(
+            self.url,
+            self._payload(2, offset=1),
+            format='json',
+            headers=headers,
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        # Keys belong to their user.
+        other = User.objects.create_user(username='beltrano', password='x')
+        other.accounts.add(self.account)
+        self.client.force_authenticate(user=other)
+        response = self.client.post(
+            self.url,
+            self._payload(2, offset=2),
+            format='json',
+            headers=headers,
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert PlantedTree.objects.count() == 5  # noqa: PLR2004
+
+    def test_failed_requests_do_not_burn_the_key(self) -> None:
+        """A rejected request can be fixed and sent again with its key."""
+        headers = {'Idempotency-Key': 'batch-1'}
+        payload = self._payload(2)
+        payload['plants'][0]['latitude'] = '95'
+        response = self.client.post(
+            self.url, payload, format='json', headers=headers
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = self.client.post(
+            self.url, self._payload(2), format='json', headers=headers
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'Idempotent-Replayed' not in response
+
+        response = self.client.post(
+            self.url,
+            self._payload(2),
+            format='json',
+            headers={'Idempotency-Key': 'x' * 256},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,100 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core import versions
+from apps.trees import catalog
+from apps.trees.models import PlantedTree, Tree
+from apps.users.models import Account, User
+
+
+class TreeCatalogTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+    def test_lookups_are_served_from_memory(self) -> None:
+        """Once loaded, known ids and names cost no query."""
+        catalog.snapshot(recheck=True)
+
+        with self.assertNumQueries(0):
+            entry = catalog.get(self.tree.id)
+            assert catalog.get_by_name('Ipê Amarelo') is entry
+            tree = catalog.resolve([self.tree.id])[self.tree.id]
+
+        assert tree == self.tree
+        assert tree.scientific_name == 'Handroanthus albus'
+        assert not tree._state.adding
+
+    def test_entries_are_immutable(self) -> None:
+        """Entries cannot be modified in place."""
+        entry = catalog.get(self.tree.id)
+
+        with self.assertRaises(AttributeError):  # noqa: PT027
+            entry.name = 'Sakura'
+
+    def test_saving_a_tree_reloads_the_snapshot(self) -> None:
+        """Renames and deletions are seen by the next lookup."""
+        catalog.snapshot(recheck=True)
+        self.tree.name = 'Ipê Roxo'
+        self.tree.save()
+
+        assert catalog.get(self.tree.id).name == 'Ipê Roxo'
+        assert catalog.get_by_name('Ipê Amarelo') is None
+
+        tree_id = self.tree.id
+        self.tree.delete()
+        assert catalog.get(tree_id) is None
+
+    @override_settings(TREES_CATALOG_RECHECK_INTERVAL=3600)
+    def test_unknown_ids_trigger_a_version_check(self) -> None:  # noqa: PLR6301
+        """Trees added without signals (other processes) are found."""
+        catalog.snapshot(recheck=True)
+        (sakura,) = Tree.objects.bulk_create([
+            Tree(name='Sakura', scientific_name='Cerasus serrulata')
+        ])
+        versions.bump(catalog.CATALOG_SCOPE)
+
+        assert catalog.get(sakura.id).name == 'Sakura'
+
+
+class PlantingWithCatalogTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_single_planting_validates_against_the_catalog(self) -> None:
+        """Valid, unknown and malformed tree ids are told apart."""
+        url = reverse('trees:planted-tree-create')
+        payload = {
+            'tree_id': str(self.tree.id),
+            'account_id': str(self.account.id),
+            'latitude': Decimal('1.5'),
+            'longitude': Decimal('2.5'),
+        }
+
+        response = self.client.post(url, payload, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.data['tree']['name'] == 'Ipê Amarelo'
+        assert PlantedTree.objects.get().tree == self.tree
+
+        payload['tree_id'] = str(self.account.id)
+        response = self.client.post(url, payload, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'tree_id' in response.data
+
+        payload['tree_id'] = 'not-a-uuid'
+        response = self.client.post(url, payload, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
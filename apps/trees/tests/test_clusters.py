@@ -0,0 +1,198 @@
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import clusters, services
+from apps.trees.models import PlantedTree, PlantingClusterCell, Tree
+from apps.users.models import Account, User
+
+
+class PlantingClustersTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.other_account = Account.objects.create(name='Other')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account, self.other_account)
+        self.outsider = User.objects.create_user(
+            username='beltrano', email='beltrano@email.com', password='x'
+        )
+        self.outside_account = Account.objects.create(name='Outside')
+        self.outsider.accounts.add(self.outside_account)
+        self.ipe = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.pau_brasil = Tree.objects.create(
+            name='Pau-Brasil', scientific_name='Paubrasilia echinata'
+        )
+
+        # Two groves in São Paulo, a few hundred meters apart, and one tree
+        # on each side of the antimeridian.
+        sao_paulo = [
+            (self.ipe, (Decimal('-23.550000'), Decimal('-46.630000'))),
+            (self.pau_brasil, (Decimal('-23.550100'), Decimal('-46.630100'))),
+            (self.ipe, (Decimal('-23.560000'), Decimal('-46.660000'))),
+        ]
+        services.plant_trees(
+            user=self.user, account=self.account, plants=sao_paulo
+        )
+        services.plant_tree(
+            self.user,
+            self.other_account,
+            self.ipe,
+            Decimal('-23.550200'),
+            Decimal('-46.630200'),
+        )
+        services.plant_tree(
+            self.user,
+            self.account,
+            self.ipe,
+            Decimal('-16.500000'),
+            Decimal('179.900000'),
+        )
+        services.plant_tree(
+            self.user,
+            self.account,
+            self.pau_brasil,
+            Decimal('-16.500000'),
+            Decimal('-179.900000'),
+        )
+        services.plant_trees(
+            user=self.outsider, account=self.outside_account, plants=sao_paulo
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('trees:planted-tree-clusters')
+
+    @staticmethod
+    def _cells() -> set[tuple]:
+        return set(
+            PlantingClusterCell.objects.filter(count__gt=0).values_list(
+                'account_id',
+                'tree_id',
+                'zoom',
+                'row',
+                'column',
+                'count',
+                'latitude_sum',
+                'longitude_sum',
+            )
+        )
+
+    def test_cells_match_a_rebuild(self) -> None:
+        """Plantings and deletions keep the cells equal to a rebuild."""
+        PlantedTree.objects.filter(
+            user=self.user, latitude=Decimal('-23.560000')
+        ).get().delete()
+        incremental = self._cells()
+
+        out = StringIO()
+        call_command('rebuild_planting_clusters', stdout=out)
+
+        assert self._cells() == incremental
+        assert 'cluster cells' in out.getvalue()
+        assert {cell[2] for cell in incremental} == set(clusters.ZOOMS)
+
+    def test_moving_a_planting_moves_its_cells(self) -> None:
+        """Edited accounts and coordinates leave no stale cells behind."""
+        planted_tree = PlantedTree.objects.get(
+            user=self.user, latitude=Decimal('-23.560000')
+        )
+        planted_tree.account = self.other_account
+        planted_tree.latitude = Decimal('40.700000')
+        planted_tree.longitude = Decimal('-74.000000')
+        planted_tree.save()
+        incremental = self._cells()
+
+        call_command('rebuild_planting_clusters', stdout=StringIO())
+
+        assert self._cells() == incremental
+        # The account's planting in São Paulo and the moved one, in New York.
+        moved = PlantingClusterCell.objects.filter(
+            account=self.other_account, zoom=clusters.ZOOMS[0], count__gt=0
+        )
+        assert sorted(moved.values_list('count', flat=True)) == [1, 1]
+
+    def test_only_touched_cells_are_locked(self) -> None:
+        """A planting locks its own cells, not the rows x columns around."""
+        with CaptureQueriesContext(connection) as queries:
+            services.plant_tree(
+                self.user,
+                self.account,
+                self.ipe,
+                Decimal('-23.550000'),
+                Decimal('-46.630000'),
+            )
+
+        (lock,) = [
+            query['sql']
+            for query in queries
+            if 'trees_plantingclustercell' in query['sql']
+            and query['sql'].startswith('SELECT')
+        ]
+        assert ' IN (' not in lock
+        assert lock.count('"zoom" =') == len(clusters.ZOOMS)
+
+    def test_clusters_by_zoom(self) -> None:
+        """Zooming in splits clusters; other users' accounts never show."""
+        viewport = {'south': -24, 'west': -47, 'north': -23, 'east': -46}
+
+        response = self.client.get(self.url, {**viewport, 'zoom': 3})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {
+                'latitude': -23.552575,
+                'longitude': -46.637575,
+                'count': 4,
+                'species': {
+                    str(self.ipe.pk): 3,
+                    str(self.pau_brasil.pk): 1,
+                },
+            }
+        ]
+
+        street = {
+            'south': -23.57,
+            'west': -46.67,
+            'north': -23.54,
+            'east': -46.62,
+        }
+        response = self.client.get(self.url, {**street, 'zoom': 15})
+        counts = sorted(cluster['count'] for cluster in response.json())
+        assert counts == [1, 3]
+
+    def test_boxes_are_capped_by_zoom(self) -> None:
+        """A box that would read too many cells for its zoom is refused."""
+        world = {'south': -90, 'west': -180, 'north': 90, 'east': 180}
+        response = self.client.get(self.url, {**world, 'zoom': 2})
+        assert response.status_code == HTTPStatus.OK
+
+        response = self.client.get(self.url, {**world, 'zoom': 14})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'too large' in response.json()['non_field_errors'][0]
+
+    def test_antimeridian_and_validation(self) -> None:
+        """Boxes may wrap around; a zoom is required."""
+        response = self.client.get(
+            self.url,
+            {'south': -20, 'west': 179, 'north': -10, 'east': -179, 'zoom': 8},
+        )
+        assert sorted(cluster['longitude'] for cluster in response.json()) == [
+            -179.9,
+            179.9,
+        ]
+
+        response = self.client.get(
+            self.url, {'south': -20, 'west': 179, 'north': -10, 'east': -179}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'zoom' in response.json()
@@ -0,0 +1,160 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import clusters
+from apps.trees.models import (
+    PlantedTree,
+    PlantingClusterCell,
+    Tree,
+    UserMonthlyStat,
+)
+from apps.trees.services import plant_tree
+from apps.users.models import Account, User
+
+
+class ConditionalListTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self._plant()
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _plant(self) -> None:
+        plant_tree(
+            user=self.user,
+            account=self.account,
+            tree=self.tree,
+            latitude=Decimal('12.345678'),
+            longitude=Decimal('-12.345678'),
+        )
+
+    def _revalidate(self, url: str) -> tuple[int, str]:
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response.status_code, etag
+
+    def test_unchanged_lists_answer_304_without_the_list_query(self) -> None:
+        """A matching ETag costs a single version lookup."""
+        for name in (
+            'trees:tree-list-create',
+            'trees:planted-tree-list-by-user',
+            'trees:planted-tree-list-by-accounts',
+        ):
+            with self.subTest(name):
+                url = reverse(name)
+                status, etag = self._revalidate(url)
+
+                assert status == HTTPStatus.NOT_MODIFIED
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                assert response['ETag'] == etag
+                assert response.content == b''
+
+    def test_plantings_change_the_planted_tree_etags(self) -> None:
+        """Planting through the services invalidates both lists."""
+        urls = [
+            reverse('trees:planted-tree-list-by-user'),
+            reverse('trees:planted-tree-list-by-accounts'),
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        catalog_etag = self.client.get(reverse('trees:tree-list-create'))[
+            'ETag'
+        ]
+
+        self._plant()
+
+        for url, etag in zip(urls, etags, strict=True):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK
+            assert len(response.data) == 2  # noqa: PLR2004
+        response = self.client.get(
+            reverse('trees:tree-list-create'), HTTP_IF_NONE_MATCH=catalog_etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_plantings_made_through_the_orm_change_the_etags(self) -> None:
+        """The admin and plain creates bump the scopes and the rollups too."""
+        url = reverse('trees:planted-tree-list-by-user')
+        etag = self.client.get(url)['ETag']
+
+        PlantedTree.objects.create(
+            user=self.user,
+            account=self.account,
+            tree=self.tree,
+            latitude=Decimal('1.5'),
+            longitude=Decimal('2.5'),
+        )
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.data) == 2  # noqa: PLR2004
+        stat = UserMonthlyStat.objects.get(user=self.user)
+        assert stat.count == 2  # noqa: PLR2004
+        cells = PlantingClusterCell.objects.filter(zoom=clusters.ZOOMS[0])
+        assert cells.aggregate(total=Sum('count'))['total'] == 2  # noqa: PLR2004
+
+    def test_nested_data_changes_invalidate_planted_tree_lists(self) -> None:
+        """Renaming a tree or a user changes the planted-tree payload."""
+        url = reverse('trees:planted-tree-list-by-accounts')
+        etag = self.client.get(url)['ETag']
+
+        self.tree.name = 'Ipê Roxo'
+        self.tree.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+
+        self.user.first_name = 'Fulano'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_unrelated_directory_changes_keep_the_etags(self) -> None:
+        """Users and accounts the lists do not show leave them valid."""
+        urls = [
+            reverse('trees:planted-tree-list-by-user'),
+            reverse('trees:planted-tree-list-by-accounts'),
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+
+        other = User.objects.create_user(username='beltrano', password='!')
+        elsewhere = Account.objects.create(name='Protected Zone')
+        other.accounts.add(elsewhere)
+        other.first_name = 'Beltrano'
+        other.save()
+        elsewhere.name = 'Atlantic Forest'
+        elsewhere.save()
+
+        for url, etag in zip(urls, etags, strict=True):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_etag_depends_on_query_and_media_type(self) -> None:
+        """Other pages and formats never share a validator."""
+        url = reverse('trees:planted-tree-list-by-user')
+        etag = self.client.get(url)['ETag']
+
+        assert self.client.get(url, {'page_size': 1})['ETag'] != etag
+        assert self.client.get(url, {'format': 'api'})['ETag'] != etag
+
+    def test_if_modified_since_is_honoured(self) -> None:
+        """Last-Modified comes from the newest scope version."""
+        url = reverse('trees:tree-list-create')
+        last_modified = self.client.get(url)['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees.models import PlantedTree, Tree
+from apps.trees.serializers import PlantedTreeSerializer
+from apps.trees.services import plant_tree
+from apps.users.models import Account, User
+
+
+class PlantedTreeExportViewsTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.other_account = Account.objects.create(name='Protected Zone')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.other_user = User.objects.create_user(
+            username='ciclano', email='ciclano@email.com', password='abc123'
+        )
+        self.other_user.accounts.add(self.account, self.other_account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        self.mine = plant_tree(
+            user=self.user,
+            account=self.account,
+            tree=self.tree,
+            latitude=Decimal('12.345678'),
+            longitude=Decimal('-12.3'),
+        )
+        self.shared = plant_tree(
+            user=self.other_user,
+            account=self.account,
+            tree=self.tree,
+            latitude=Decimal('1.5'),
+            longitude=Decimal('2.25'),
+        )
+        self.hidden = plant_tree(
+            user=self.other_user,
+            account=self.other_account,
+            tree=self.tree,
+            latitude=Decimal('3.000001'),
+            longitude=Decimal('4.000001'),
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    @staticmethod
+    def _ndjson(response: object) -> list[dict]:
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_ndjson_matches_serializer_encoding(self) -> None:
+        """Exported scalars are byte-for-byte the serializer's output."""
+        url = reverse('trees:planted-tree-export-by-user')
+        response = self.client.get(url)
+
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        (row,) = self._ndjson(response)
+        expected = PlantedTreeSerializer(
+            PlantedTree.objects.get(pk=self.mine.pk)
+        ).data
+        for field in ('id', 'planted_at', 'latitude', 'longitude', 'age'):
+            assert row[field] == expected[field]
+        assert row['tree_id'] == str(self.tree.id)
+
+    def test_accounts_export_as_csv_with_selected_columns(self) -> None:
+        """CSV export honours column selection and account visibility."""
+        url = reverse('trees:planted-tree-export-by-accounts')
+        response = self.client.get(
+            url, {'format': 'csv', 'columns': 'id,username,latitude'}
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[0] == ['id', 'username', 'latitude']
+        assert sorted(rows[1:]) == sorted([
+            [str(self.mine.id), 'fulano', '12.345678'],
+            [str(self.shared.id), 'ciclano', '1.500000'],
+        ])
+
+    def test_unknown_column_is_rejected(self) -> None:
+        """Asking for a column that does not exist is a client error."""
+        url = reverse('trees:planted-tree-export-by-user')
+        response = self.client.get(url, {'columns': 'id,password'})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
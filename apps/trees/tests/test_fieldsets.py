@@ -0,0 +1,118 @@
+import json
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.trees.models import PlantedTree, Tree
+from apps.trees.serializers import PlantedTreeSerializer
+from apps.trees.services import plant_tree
+from apps.users.models import Account, User
+
+
+class SparseFieldsetTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        for latitude in ('12.345678', '-1.000001', '0.500000'):
+            plant_tree(
+                user=self.user,
+                account=self.account,
+                tree=self.tree,
+                latitude=Decimal(latitude),
+                longitude=Decimal('-12.345678'),
+            )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('trees:planted-tree-list-by-user')
+
+    def _serialized(self, params: dict[str, str]) -> list[dict]:
+        """Render the plantings with the regular ``PlantedTreeSerializer``."""
+        request = Request(APIRequestFactory().get(self.url, params))
+        serializer = PlantedTreeSerializer(
+            PlantedTree.objects.for_user(self.user).with_details(),
+            many=True,
+            context={'request': request},
+        )
+        return json.loads(JSONRenderer().render(serializer.data))
+
+    def test_without_parameters_the_shape_is_unchanged(self) -> None:
+        """Nested objects are still embedded by default."""
+        response = self.client.get(self.url)
+
+        assert response.status_code == HTTPStatus.OK
+        item = response.json()[0]
+        assert item['user']['accounts'] == [str(self.account.pk)]
+        assert item['tree']['name'] == self.tree.name
+        assert item['account']['name'] == self.account.name
+
+    def test_fields_and_expand(self) -> None:
+        """Nested objects become ids unless expanded."""
+        # Version lookup and a single values() query, no prefetching.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {'fields': 'id,latitude,longitude,tree'}
+            )
+        item = response.json()[0]
+        assert list(item) == ['id', 'latitude', 'longitude', 'tree']
+        assert item['tree'] == str(self.tree.pk)
+
+        response = self.client.get(self.url, {'expand': 'tree'})
+        item = response.json()[0]
+        assert item['tree'] == {
+            'id': str(self.tree.pk),
+            'name': self.tree.name,
+            'scientific_name': self.tree.scientific_name,
+        }
+        assert item['user'] == str(self.user.pk)
+        assert item['account'] == str(self.account.pk)
+
+    def test_rows_match_the_serializer(self) -> None:
+        """The ``values()`` path renders exactly what the serializer does."""
+        for params in (
+            {'fields': 'id,latitude,longitude,tree'},
+            {'fields': 'planted_at,age,user,account'},
+            {'expand': 'tree,account'},
+            {'expand': 'user'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                assert response.json() == self._serialized(params)
+
+    def test_rows_are_paginated(self) -> None:
+        """Sparse responses page like the regular ones."""
+        url = f'{self.url}?fields=id&page_size=2'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            ids.extend(item['id'] for item in response.json()['results'])
+            url = response.json()['next']
+
+        assert ids == [
+            str(pk)
+            for pk in PlantedTree.objects
+            .for_user(self.user)
+            .order_by('-planted_at', '-id')
+            .values_list('id', flat=True)
+        ]
+
+    def test_unknown_names_are_rejected(self) -> None:
+        """Typos get a 400 listing the valid names."""
+        response = self.client.get(self.url, {'fields': 'id,color'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'color' in response.json()['fields'][0]
+
+        response = self.client.get(self.url, {'expand': 'planted_at'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'expand' in response.json()
@@ -0,0 +1,118 @@
+import csv
+import json
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees.models import PlantedTree, Tree
+from apps.users.models import Account, User
+
+
+class PlantedTreeIngestViewTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = (
+            f'{reverse("trees:planted-tree-ingest")}'
+            f'?account_id={self.account.id}&batch_size=2'
+        )
+
+    def test_ndjson_upload_reports_accepted_and_rejected_rows(self) -> None:
+        """Valid rows are planted across batches, bad rows are reported."""
+        tree_id = str(self.tree.id)
+        rows = [
+            {'tree_id': tree_id, 'latitude': '1.5', 'longitude': '2'},
+            {'tree_id': tree_id, 'latitude': '91', 'longitude': '2'},
+            {'tree_id': tree_id, 'latitude': '-3', 'longitude': '4'},
+            {'tree_id': str(self.account.id), 'latitude': 0, 'longitude': 0},
+            {'tree_id': tree_id, 'latitude': '5', 'longitude': '6'},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n{oops\n'
+
+        response = self.client.generic(
+            'POST', self.url, body, content_type='application/x-ndjson'
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.data['accepted'] == 3  # noqa: PLR2004
+        assert response.data['rejected'] == 3  # noqa: PLR2004
+        assert [error['row'] for error in response.data['errors']] == [
+            2,
+            4,
+            6,
+        ]
+        assert 'latitude' in response.data['errors'][0]['errors']
+        assert set(PlantedTree.objects.values_list('latitude', flat=True)) == {
+            Decimal('1.5'),
+            Decimal('-3'),
+            Decimal('5'),
+        }
+
+    def test_csv_upload_plants_trees(self) -> None:
+        """CSV bodies with a header row are accepted too."""
+        body = (
+            'tree_id,latitude,longitude\n'
+            f'{self.tree.id},10.000001,20.000002\n'
+            f'{self.tree.id},-10,-20\n'
+        )
+
+        response = self.client.generic(
+            'POST', self.url, body, content_type='text/csv'
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.data['accepted'] == 2  # noqa: PLR2004
+        assert PlantedTree.objects.filter(user=self.user).count() == 2  # noqa: PLR2004
+
+    def test_malformed_csv_records_are_rejected_one_by_one(self) -> None:
+        """A record the CSV reader refuses only fails its own row."""
+        body = (
+            'tree_id,latitude,longitude\n'
+            f'{self.tree.id},10,20\n'
+            f'{self.tree.id},{"1" * (csv.field_size_limit() + 1)},20\n'
+            f'{self.tree.id},-10,-20\n'
+        )
+
+        response = self.client.generic(
+            'POST', self.url, body, content_type='text/csv'
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.data['accepted'] == 2  # noqa: PLR2004
+        assert response.data['rejected'] == 1
+        (error,) = response.data['errors']
+        assert error['row'] == 2  # noqa: PLR2004
+        assert 'Invalid CSV' in error['errors']['non_field_errors'][0]
+
+    def test_unsupported_media_type(self) -> None:
+        """JSON bodies belong to the regular bulk endpoint."""
+        response = self.client.generic(
+            'POST', self.url, '[]', content_type='application/json'
+        )
+
+        assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    def test_uploads_without_a_length_are_refused(self) -> None:
+        """A chunked body Django cannot read is not reported as empty."""
+        response = self.client.generic(
+            'POST',
+            self.url,
+            '',
+            content_type='application/x-ndjson',
+            HTTP_TRANSFER_ENCODING='chunked',
+        )
+
+        assert response.status_code == HTTPStatus.LENGTH_REQUIRED
+        assert not PlantedTree.objects.exists()
@@ -0,0 +1,191 @@
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.trees import jobs, services
+from apps.trees.models import PlantedTree, PlantingJob, Tree
+from apps.users.models import Account, User
+
+
+class PlantingJobTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.other_account = Account.objects.create(name='Other')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account, self.other_account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('trees:planted-tree-job-create')
+
+    def _plants(self, size: int, longitude: str = '-46.6') -> list[dict]:
+        return [
+            {
+                'tree_id': str(self.tree.id),
+                'latitude': f'-23.{index:06d}',
+                'longitude': longitude,
+            }
+            for index in range(size)
+        ]
+
+    def _work(self) -> str:  # noqa: PLR6301
+        out = StringIO()
+        call_command('run_planting_jobs', processes=0, once=True, stdout=out)
+        return out.getvalue()
+
+    @override_settings(TREES_JOB_CHUNK_SIZE=2)
+    def test_job_is_queued_and_planted_by_the_worker(self) -> None:
+        """The request only queues; the worker plants and reports."""
+        response = self.client.post(
+            self.url,
+            {'account_id': str(self.account.id), 'plants': self._plants(5)},
+            format='json',
+        )
+
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert response.json()['status'] == 'pending'
+        assert response.json()['total'] == 5  # noqa: PLR2004
+        assert not PlantedTree.objects.exists()
+
+        self._work()
+        status = self.client.get(response['Location']).json()
+        assert status['status'] == 'succeeded'
+        assert status['planted'] == 5  # noqa: PLR2004
+        assert status['finished_at'] is not None
+        assert PlantedTree.objects.count() == 5  # noqa: PLR2004
+        assert PlantingJob.objects.get().plants == []
+
+    def test_invalid_items_fail_the_whole_job(self) -> None:
+        """Items are checked like the bulk endpoint; nothing is planted."""
+        plants = self._plants(3)
+        plants[0]['latitude'] = '95'
+        plants[1]['tree_id'] = str(self.account.id)
+        repeated = self._plants(3)
+        repeated.append(dict(repeated[2]))
+        locations = [
+            self.client.post(
+                self.url,
+                {'account_id': str(self.account.id), 'plants': items},
+                format='json',
+            )['Location']
+            for items in (plants, repeated)
+        ]
+        self._work()
+
+        status = self.client.get(locations[0]).json()
+        assert status['status'] == 'failed'
+        assert status['invalid'] == 2  # noqa: PLR2004
+        assert [error['item'] for error in status['errors']] == [0, 1]
+        assert list(status['errors'][1]['errors']) == ['tree_id']
+        status = self.client.get(locations[1]).json()
+        assert status['errors'] == [
+            {
+                'item': 3,
+                'errors': {'non_field_errors': ['Duplicate of item 2.']},
+            }
+        ]
+        assert not PlantedTree.objects.exists()
+
+    def test_bad_requests_are_rejected_upfront(self) -> None:
+        """Only the envelope is validated before queueing."""
+        outsider = Account.objects.create(name='Outside')
+        for payload in (
+            {'account_id': str(outsider.id), 'plants': self._plants(1)},
+            {'account_id': str(self.account.id), 'plants': []},
+            {'account_id': str(self.account.id)},
+        ):
+            with self.subTest(payload=payload):
+                response = self.client.post(self.url, payload, format='json')
+                assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not PlantingJob.objects.exists()
+
+    def test_jobs_belong_to_their_user(self) -> None:
+        """Another user cannot read someone else's job."""
+        job = jobs.enqueue(self.user, self.account, self._plants(1))
+        other = User.objects.create_user(username='beltrano', password='x')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.get(
+            reverse('trees:planted-tree-job-detail', kwargs={'pk': job.pk})
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_claim_bounds_jobs_per_account(self) -> None:
+        """Accounts run side by side, each up to its own limit."""
+        first, second, third = (
+            jobs.enqueue(self.user, self.account, self._plants(1, longitude))
+            for longitude in ('1', '2', '3')
+        )
+        other = jobs.enqueue(self.user, self.other_account, self._plants(1))
+
+        assert jobs.claim(4, per_account=1) == [first.pk, other.pk]
+        assert jobs.claim(4, per_account=1) == []
+        assert jobs.claim(4, per_account=2) == [second.pk]
+
+        assert jobs.run(first.pk) == PlantingJob.Status.SUCCEEDED
+        assert jobs.claim(4, per_account=2) == [third.pk]
+
+    @override_settings(TREES_JOB_CHUNK_SIZE=2)
+    def test_stale_jobs_resume_after_the_last_chunk(self) -> None:
+        """A job whose worker died is picked up again where it stopped."""
+        plants = self._plants(4)
+        job = jobs.enqueue(self.user, self.account, plants)
+        jobs.claim(1, per_account=1)
+        # The dead worker committed the first chunk, then went silent.
+        services.plant_trees(
+            user=self.user,
+            account=self.account,
+            plants=[
+                (self.tree, (Decimal(item['latitude']), Decimal('-46.6')))
+                for item in plants[:2]
+            ],
+        )
+        PlantingJob.objects.filter(pk=job.pk).update(
+            planted=2, heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert 'succeeded' in self._work()
+        job.refresh_from_db()
+        assert job.status == PlantingJob.Status.SUCCEEDED
+        assert job.planted == 4  # noqa: PLR2004
+        assert PlantedTree.objects.count() == 4  # noqa: PLR2004
+
+    @override_settings(TREES_JOB_MAX_ATTEMPTS=2)
+    def test_database_errors_are_retried(self) -> None:
+        """A job hitting a database error is queued again, then fails."""
+        job = jobs.enqueue(self.user, self.account, self._plants(2))
+        with (
+            mock.patch.object(
+                services, 'plant_trees', side_effect=OperationalError('locked')
+            ),
+            self.assertLogs('apps.trees.jobs', 'WARNING') as logs,
+        ):
+            for status in (
+                PlantingJob.Status.PENDING,
+                PlantingJob.Status.FAILED,
+            ):
+                assert jobs.claim(1, per_account=1) == [job.pk]
+                assert jobs.run(job.pk) == status
+
+        assert [record.levelname for record in logs.records] == [
+            'WARNING',
+            'ERROR',
+        ]
+        job.refresh_from_db()
+        assert job.attempts == 2  # noqa: PLR2004
+        assert job.detail == 'Database error.'
+        assert not PlantedTree.objects.exists()
@@ -0,0 +1,298 @@
+import random
+import threading
+from decimal import Decimal
+from http import HTTPStatus
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.trees import geo, nearby, services
+from apps.trees.models import PlantedTree, Tree
+from apps.users.models import Account, User
+
+
+class NearestPlantedTreesTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        nearby.reset()
+        self.account = Account.objects.create(name='Reforestation')
+        self.other_account = Account.objects.create(name='Other')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account, self.other_account)
+        self.outsider = User.objects.create_user(
+            username='beltrano', email='beltrano@email.com', password='x'
+        )
+        self.outside_account = Account.objects.create(name='Outside')
+        self.outsider.accounts.add(self.outside_account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        # Clustered around São Paulo, scattered over the globe, and a few
+        # next to the antimeridian and the poles.
+        generator = random.Random(17)
+        points = [
+            (
+                -23.55 + generator.uniform(-0.3, 0.3),
+                -46.63 + generator.uniform(-0.3, 0.3),
+            )
+            for _ in range(40)
+        ]
+        points += [
+            (generator.uniform(-89, 89), generator.uniform(-180, 180))
+            for _ in range(40)
+        ]
+        points += [(-16.5, 179.95), (-16.5, -179.95), (89.9, 10), (-89.9, 0)]
+        for index, (latitude, longitude) in enumerate(points):
+            account = (self.account, self.other_account)[index % 2]
+            services.plant_tree(
+                self.user,
+                account,
+                self.tree,
+                Decimal(f'{latitude:.6f}'),
+                Decimal(f'{longitude:.6f}'),
+            )
+        services.plant_tree(
+            self.outsider,
+            self.outside_account,
+            self.tree,
+            Decimal('-23.550000'),
+            Decimal('-46.630000'),
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('trees:planted-tree-nearest')
+
+    def tearDown(self) -> None:  # noqa: D401, N802, PLR6301
+        nearby.reset()
+
+    def _expected(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius: float = geo.MAX_DISTANCE_METERS,
+    ) -> list[tuple[object, float]]:
+        """Brute-force the answer over every visible planting."""
+        rows = [
+            (
+                geo.haversine(
+                    latitude,
+                    longitude,
+                    float(planted.latitude),
+                    float(planted.longitude),
+                ),
+                planted.pk,
+            )
+            for planted in PlantedTree.objects.for_accounts([
+                self.account.pk,
+                self.other_account.pk,
+            ])
+        ]
+        return sorted(row for row in rows if row[0] <= radius)[:k]
+
+    def _nearest(self, *args: float, **kwargs: float) -> list[tuple]:
+        return [
+            (planted.distance, planted.pk)
+            for planted in nearby.nearest(
+                [self.account.pk, self.other_account.pk], *args, **kwargs
+            )
+        ]
+
+    def _assert_matches(  # noqa: PLR6301
+        self, found: list[tuple], expected: list[tuple]
+    ) -> None:
+        assert [pk for _, pk in found] == [pk for _, pk in expected]
+        for (distance, _), (expected_distance, _) in zip(
+            found, expected, strict=True
+        ):
+            assert abs(distance - expected_distance) < 1e-3 * max(  # noqa: PLR2004
+                1.0, expected_distance
+            )
+
+    def test_index_and_database_agree_with_brute_force(self) -> None:
+        """Both paths return the exact k nearest, nearest first."""
+        queries = [
+            (-23.55, -46.63, 5, geo.MAX_DISTANCE_METERS),
+            (-23.55, -46.63, 60, geo.MAX_DISTANCE_METERS),
+            (-23.55, -46.63, 100, 20_000),
+            (-16.5, 179.99, 3, geo.MAX_DISTANCE_METERS),
+            (90.0, 0.0, 4, geo.MAX_DISTANCE_METERS),
+            (0.0, 0.0, 10, 10.0),
+        ]
+        for latitude, longitude, k, radius in queries:
+            expected = self._expected(latitude, longitude, k, radius)
+            with self.subTest(latitude=latitude, longitude=longitude, k=k):
+                nearby.reset()
+                self._assert_matches(
+                    self._nearest(latitude, longitude, k, radius), expected
+                )
+                nearby.warm()
+                assert nearby.is_warm()
+                self._assert_matches(
+                    self._nearest(latitude, longitude, k, radius), expected
+                )
+
+    def test_index_is_updated_when_plantings_commit(self) -> None:
+        """New, moved and deleted plantings reach the index."""
+        nearby.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            planted = services.plant_tree(
+                self.user,
+                self.account,
+                self.tree,
+                Decimal('10.000000'),
+                Decimal('10.000000'),
+            )
+        assert self._nearest(10.0, 10.0, 1)[0][1] == planted.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            planted.latitude = Decimal('-10.000000')
+            planted.save()
+        assert self._nearest(-10.0, 10.0, 1) == [(0.0, planted.pk)]
+        assert self._nearest(10.0, 10.0, 1)[0][1] != planted.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            planted.delete()
+        assert self._nearest(-10.0, 10.0, 1)[0][1] != planted.pk
+
+    def test_rows_deleted_elsewhere_are_dropped(self) -> None:
+        """Ids the database no longer has are skipped and forgotten."""
+        nearby.warm()
+        nearest = self._nearest(-23.55, -46.63, 3)
+        PlantedTree.objects.filter(pk=nearest[0][1])._raw_delete('default')
+
+        found = self._nearest(-23.55, -46.63, 3)
+        assert nearest[0][1] not in [pk for _, pk in found]
+        self._assert_matches(found, self._expected(-23.55, -46.63, 3))
+
+    @override_settings(TREES_NEARBY_REFRESH_INTERVAL=0)
+    def test_plantings_from_other_processes_are_pulled(self) -> None:
+        """A refresh picks up rows this process never saw committed."""
+        nearby.warm()
+        planted = services.plant_tree(
+            self.user,
+            self.account,
+            self.tree,
+            Decimal('40.000000'),
+            Decimal('40.000000'),
+        )
+        assert self._nearest(40.0, 40.0, 1)[0][1] == planted.pk
+
+    @staticmethod
+    def _move_elsewhere(pk: object, latitude: int, longitude: int) -> None:
+        # As another process would: this one's index is not told.
+        PlantedTree.objects.filter(pk=pk).update(
+            latitude=latitude,
+            longitude=longitude,
+            grid_cell=geo.grid_cell(latitude, longitude),
+            modified_at=timezone.now(),
+        )
+
+    @override_settings(TREES_NEARBY_REFRESH_INTERVAL=0)
+    def test_edits_from_other_processes_are_pulled(self) -> None:
+        """A refresh moves plantings edited elsewhere in the index."""
+        nearby.warm()
+        (_, pk), *_ = self._nearest(-23.55, -46.63, 1)
+        self._move_elsewhere(pk, 40, 40)
+
+        assert pk not in [
+            found for _, found in self._nearest(-23.55, -46.63, 3)
+        ]
+        self._assert_matches(
+            self._nearest(40.0, 40.0, 1), self._expected(40.0, 40.0, 1)
+        )
+
+    @override_settings(TREES_NEARBY_REFRESH_INTERVAL=3600)
+    def test_distances_come_from_the_rows_read(self) -> None:
+        """Before a refresh, a moved planting is measured where it is now."""
+        nearby.warm()
+        nearby.nearest([], 0, 0, 1)  # the first query after warming refreshes
+        nearest = self._nearest(-23.55, -46.63, 3)
+        self._move_elsewhere(nearest[0][1], 40, 40)
+
+        found = self._nearest(-23.55, -46.63, 3)
+        assert [distance for distance, _ in found] == sorted(
+            distance for distance, _ in found
+        )
+        assert found[-1][1] == nearest[0][1]
+        assert found[-1][0] > 1_000_000  # noqa: PLR2004
+        within = self._nearest(-23.55, -46.63, 3, radius=100_000)
+        assert nearest[0][1] not in [pk for _, pk in within]
+
+    @override_settings(TREES_NEARBY_REFRESH_INTERVAL=30)
+    def test_requests_during_a_refresh_do_not_wait_or_refresh(self) -> None:  # noqa: PLR6301
+        """Only one request refreshes; the others use the index as it is."""
+        nearby.warm()
+        nearby._index.checked_at = 0.0
+        fetch = nearby._rows_since
+        others = []
+
+        def rows_since(timestamp: float) -> list[tuple]:
+            other = threading.Thread(target=nearby._current)
+            other.start()
+            other.join(5)
+            others.append(other.is_alive())
+            return fetch(timestamp)
+
+        with mock.patch.object(
+            nearby, '_rows_since', side_effect=rows_since
+        ) as refresh:
+            nearby._current()
+
+        assert refresh.call_count == 1
+        assert others == [False]
+
+    @override_settings(TREES_NEARBY_INDEX=False)
+    def test_the_index_can_be_turned_off(self) -> None:
+        """Queries go to the database and nothing warms up."""
+        assert nearby.warm_in_background() is None
+        nearby.warm()
+        with CaptureQueriesContext(connection) as queries:
+            found = self._nearest(-23.55, -46.63, 3)
+
+        self._assert_matches(found, self._expected(-23.55, -46.63, 3))
+        assert 'distance' in queries[0]['sql']
+
+    def test_endpoint_respects_account_visibility(self) -> None:
+        """Only plantings of the user's accounts are returned."""
+        nearby.warm()
+        nearby.nearest([], 0, 0, 1)  # the first query after warming refreshes
+        # The rows by id and the users' accounts, nothing per planting.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {'latitude': -23.55, 'longitude': -46.63, 'k': 50}
+            )
+
+        assert response.status_code == HTTPStatus.OK
+        ids = [item['id'] for item in response.json()]
+        expected = self._expected(-23.55, -46.63, 50)
+        assert ids == [str(pk) for _, pk in expected]
+        assert response.json()[0]['distance'] == expected[0][0]
+
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(
+            self.url, {'latitude': 0, 'longitude': 0, 'k': 5}
+        )
+        assert len(response.json()) == 1
+        assert response.json()[0]['account']['name'] == 'Outside'
+
+    def test_invalid_parameters(self) -> None:
+        """Out of range coordinates and k are rejected."""
+        for params in (
+            {'latitude': 91, 'longitude': 0},
+            {'latitude': 0, 'longitude': 0, 'k': 0},
+            {'latitude': 0, 'longitude': 0, 'k': 101},
+            {'latitude': 0, 'longitude': 0, 'radius': -1},
+            {'longitude': 0},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,113 @@
+from datetime import date
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import packed
+from apps.trees.models import PlantedTree, Tree
+from apps.trees.services import plant_tree
+from apps.users.models import Account, User
+
+
+class PackedCoordinatesTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.other = User.objects.create_user(
+            username='ciclano', email='ciclano@email.com', password='test1234'
+        )
+        self.other.accounts.add(self.account)
+        self.ipe = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.pau_brasil = Tree.objects.create(
+            name='Pau-Brasil', scientific_name='Paubrasilia echinata'
+        )
+        for user, tree, latitude, longitude in (
+            (self.user, self.ipe, '-23.550520', '-46.633308'),
+            (self.user, self.pau_brasil, '89.999999', '-179.999999'),
+            (self.other, self.ipe, '-0.000001', '0.000001'),
+        ):
+            plant_tree(
+                user=user,
+                account=self.account,
+                tree=tree,
+                latitude=Decimal(latitude),
+                longitude=Decimal(longitude),
+            )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, name: str, params: dict | None = None) -> tuple[list, set]:
+        response = self.client.get(reverse(name), params)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == packed.MEDIA_TYPE
+        species, records = packed.decode(b''.join(response.streaming_content))
+        return species, {
+            (latitude, longitude, species[index], day)
+            for latitude, longitude, index, day in records
+        }
+
+    @staticmethod
+    def _expected(queryset: PlantedTree) -> set:
+        epoch = date(1970, 1, 1)
+        return {
+            (
+                int(planted_tree.latitude * 1_000_000),
+                int(planted_tree.longitude * 1_000_000),
+                planted_tree.tree_id,
+                (planted_tree.planted_at.date() - epoch).days,
+            )
+            for planted_tree in queryset
+        }
+
+    def test_payload_round_trips(self) -> None:
+        """Coordinates are exact microdegrees, species are tree ids."""
+        species, records = self._get('trees:planted-tree-coordinates-by-user')
+
+        assert sorted(species) == sorted([self.ipe.pk, self.pau_brasil.pk])
+        assert records == self._expected(
+            PlantedTree.objects.for_user(self.user)
+        )
+
+        _, records = self._get('trees:planted-tree-coordinates-by-accounts')
+        assert records == self._expected(
+            PlantedTree.objects.for_accounts([self.account])
+        )
+
+    def test_viewport(self) -> None:
+        """A bounding box limits the payload to the viewport."""
+        species, records = self._get(
+            'trees:planted-tree-coordinates-by-accounts',
+            {'south': -30, 'west': -50, 'north': 0, 'east': 1},
+        )
+
+        assert species == [self.ipe.pk]
+        assert {record[:2] for record in records} == {
+            (-23550520, -46633308),
+            (-1, 1),
+        }
+
+        response = self.client.get(
+            reverse('trees:planted-tree-coordinates-by-accounts'),
+            {'south': 10, 'west': -50, 'north': 0, 'east': 1},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_empty_scope_and_conditional_get(self) -> None:
+        """An empty scope is a valid payload and unchanged data is a 304."""
+        PlantedTree.objects.filter(user=self.user).delete()
+        url = reverse('trees:planted-tree-coordinates-by-user')
+
+        response = self.client.get(url)
+        assert packed.decode(b''.join(response.streaming_content)) == ([], [])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
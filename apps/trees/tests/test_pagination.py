@@ -0,0 +1,101 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.trees.models import PlantedTree, Tree
+from apps.trees.services import plant_tree
+from apps.users.models import Account, User
+
+
+class PlantedTreeCursorPaginationTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('trees:planted-tree-list-by-user')
+
+        for _ in range(5):
+            self._plant()
+
+    def _plant(self) -> PlantedTree:
+        return plant_tree(
+            user=self.user,
+            account=self.account,
+            tree=self.tree,
+            latitude=Decimal('12.345678'),
+            longitude=Decimal('-12.345678'),
+        )
+
+    def _walk(self, url: str) -> list[str]:
+        ids = []
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_follow_planted_at_then_id_ordering(self) -> None:
+        """Walking every page yields each row once, newest first."""
+        expected = [
+            str(pk)
+            for pk in PlantedTree.objects
+            .for_user(self.user)
+            .order_by('-planted_at', '-id')
+            .values_list('id', flat=True)
+        ]
+
+        assert self._walk(f'{self.url}?page_size=2') == expected
+
+    def test_rows_sharing_planted_at_are_not_skipped(self) -> None:
+        """The UUIDv7 id breaks ties between identical timestamps."""
+        PlantedTree.objects.update(planted_at=timezone.now())
+        expected = {
+            str(pk) for pk in PlantedTree.objects.values_list('id', flat=True)
+        }
+
+        ids = self._walk(f'{self.url}?page_size=2')
+
+        assert len(ids) == len(expected)
+        assert set(ids) == expected
+
+    def test_concurrent_insert_does_not_shift_next_page(self) -> None:
+        """A row planted mid-walk does not leak into later pages."""
+        first_page = self.client.get(f'{self.url}?page_size=2')
+        newest = self._plant()
+
+        second_page = self.client.get(first_page.data['next'])
+        returned = {item['id'] for item in second_page.data['results']}
+
+        assert str(newest.id) not in returned
+        assert returned.isdisjoint(
+            item['id'] for item in first_page.data['results']
+        )
+
+    def test_previous_link_returns_to_first_page(self) -> None:
+        """Following ``previous`` from page two gives back page one."""
+        first_page = self.client.get(f'{self.url}?page_size=2')
+        second_page = self.client.get(first_page.data['next'])
+
+        previous_page = self.client.get(second_page.data['previous'])
+
+        assert previous_page.data['results'] == first_page.data['results']
+        assert previous_page.data['previous'] is None
+
+    def test_invalid_cursor_returns_404(self) -> None:
+        """A tampered cursor is rejected instead of raising."""
+        response = self.client.get(f'{self.url}?cursor=not-a-cursor')
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
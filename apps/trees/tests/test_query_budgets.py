@@ -0,0 +1,211 @@
+import json
+from decimal import Decimal
+
+from django.http import HttpResponseBase
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.testing import QueryBudgetMixin
+from apps.trees import jobs, services, uploads
+from apps.trees.models import PlantedTree, Tree
+from apps.users.models import Account, User, UserAccount
+
+
+class TreesQueryBudgetTestCase(QueryBudgetMixin, TestCase):
+    urlconf = 'apps.trees.urls'
+    budgets = {
+        'trees:tree-list-create': 2,
+        'trees:tree-detail': 1,
+        'trees:planted-tree-create': 11,
+        'trees:planted-tree-list-by-user': 3,
+        'trees:planted-tree-list-by-accounts': 3,
+        'trees:planted-tree-export-by-user': 1,
+        'trees:planted-tree-export-by-accounts': 1,
+        'trees:planted-tree-coordinates-by-user': 2,
+        'trees:planted-tree-coordinates-by-accounts': 2,
+        'trees:planted-tree-list-by-bbox': 2,
+        'trees:planted-tree-list-by-radius': 2,
+        'trees:planted-tree-clusters': 2,
+        'trees:planted-tree-nearest': 3,
+        'trees:planted-tree-bulk-create': 11,
+        'trees:planted-tree-ingest': 10,
+        'trees:planted-tree-job-create': 3,
+        'trees:planted-tree-job-detail': 1,
+        'trees:planted-tree-upload-create': 4,
+        'trees:planted-tree-upload-detail': 2,
+        # The bulk insert plus locking the session and recording the chunk.
+        'trees:planted-tree-upload-chunk': 17,
+        'trees:planted-tree-upload-commit': 7,
+        'trees:stats-accounts': 1,
+        'trees:stats-my': 1,
+        'trees:planted-tree-detail': 2,
+    }
+
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.planted_tree = services.plant_tree(
+            user=self.user,
+            account=self.account,
+            tree=self.tree,
+            latitude=Decimal('-23.5'),
+            longitude=Decimal('-46.6'),
+        )
+        self.seeded = 0
+        self.bulk_posts = 0
+        self.upload = uploads.start(self.user, self.account)
+        self.chunks = 0
+        self.job = jobs.enqueue(self.user, self.account, [{}])
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def seed(self, n: int) -> None:
+        """Add ``n`` species, ``n`` account members and their plantings."""
+        start, self.seeded = self.seeded, self.seeded + n
+        trees = Tree.objects.bulk_create(
+            Tree(name=f'Tree {index}', scientific_name=f'Species {index}')
+            for index in range(start, self.seeded)
+        )
+        users = User.objects.bulk_create(
+            User(username=f'member-{index}', password='!')
+            for index in range(start, self.seeded)
+        )
+        UserAccount.objects.bulk_create(
+            UserAccount(user=user, account=self.account) for user in users
+        )
+        for index, (user, tree) in enumerate(zip(users, trees, strict=True)):
+            latitude = Decimal(f'-23.{start + index:04d}')
+            for planter in (user, self.user):
+                services.plant_trees(
+                    user=planter,
+                    account=self.account,
+                    plants=[(tree, (latitude, Decimal('-46.6')))],
+                )
+
+    def request_upload(self, name: str) -> HttpResponseBase:
+        """Open a session, send its next chunk or commit a fresh one."""
+        if name == 'trees:planted-tree-upload-create':
+            return self.client.post(
+                reverse(name),
+                {'account_id': str(self.account.id)},
+                format='json',
+            )
+        if name == 'trees:planted-tree-upload-commit':
+            session = uploads.start(self.user, self.account)
+            url = reverse(name, kwargs={'pk': session.pk})
+            return self.client.post(url, {}, format='json')
+        self.chunks += 1
+        url = reverse(
+            name, kwargs={'pk': self.upload.pk, 'number': self.chunks}
+        )
+        plants = [
+            {
+                'tree_id': str(self.tree.id),
+                'latitude': f'-22.5000{self.chunks:02d}',
+                'longitude': longitude,
+            }
+            for longitude in ('-46.6', '-46.7')
+        ]
+        return self.client.put(url, {'plants': plants}, format='json')
+
+    def request_endpoint(self, name: str) -> HttpResponseBase:
+        detail_kwargs = {
+            'trees:tree-detail': {'pk': self.tree.pk},
+            'trees:planted-tree-detail': {'pk': self.planted_tree.pk},
+            'trees:planted-tree-upload-detail': {'pk': self.upload.pk},
+            'trees:planted-tree-job-detail': {'pk': self.job.pk},
+        }
+        if name in detail_kwargs:
+            return self.client.get(reverse(name, kwargs=detail_kwargs[name]))
+        if name in {
+            'trees:planted-tree-upload-create',
+            'trees:planted-tree-upload-chunk',
+            'trees:planted-tree-upload-commit',
+        }:
+            return self.request_upload(name)
+
+        url = reverse(name)
+        account_id = str(self.account.id)
+        tree_id = str(self.tree.id)
+        match name:
+            case 'trees:planted-tree-create':
+                return self.client.post(
+                    url,
+                    {
+                        'tree_id': tree_id,
+                        'account_id': account_id,
+                        'latitude': '-23.5',
+                        'longitude': '-46.6',
+                    },
+                    format='json',
+                )
+            case (
+                'trees:planted-tree-bulk-create'
+                | 'trees:planted-tree-job-create'
+            ):
+                # Repeated plantings are rejected: every call moves a bit.
+                self.bulk_posts += 1
+                plants = [
+                    {
+                        'tree_id': tree_id,
+                        'latitude': f'-23.5000{self.bulk_posts:02d}',
+                        'longitude': longitude,
+                    }
+                    for longitude in ('-46.6', '-46.7')
+                ]
+                return self.client.post(
+                    url,
+                    {'account_id': account_id, 'plants': plants},
+                    format='json',
+                )
+            case 'trees:planted-tree-ingest':
+                row = json.dumps({
+                    'tree_id': tree_id,
+                    'latitude': '-23.5',
+                    'longitude': '-46.6',
+                })
+                return self.client.generic(
+                    'POST',
+                    f'{url}?account_id={account_id}',
+                    f'{row}\n{row}\n',
+                    content_type='application/x-ndjson',
+                )
+        query = {
+            'trees:planted-tree-list-by-bbox': {
+                'south': -24,
+                'west': -47,
+                'north': -23,
+                'east': -46,
+            },
+            'trees:planted-tree-clusters': {
+                'south': -24,
+                'west': -47,
+                'north': -23,
+                'east': -46,
+                'zoom': 8,
+            },
+            'trees:planted-tree-list-by-radius': {
+                'latitude': -23.5,
+                'longitude': -46.6,
+                'radius': 100000,
+            },
+            'trees:planted-tree-nearest': {
+                'latitude': -23.5,
+                'longitude': -46.6,
+                'k': 5,
+            },
+        }
+        return self.client.get(url, query.get(name))
+
+    def test_planted_tree_count_grows_between_measurements(self) -> None:
+        """The seeding really multiplies the listed rows."""
+        self.seed(2)
+        assert PlantedTree.objects.count() == 5  # noqa: PLR2004
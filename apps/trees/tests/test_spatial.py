@@ -0,0 +1,119 @@
+from decimal import Decimal
+from http import HTTPStatus
+from uuid import UUID
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import geo
+from apps.trees.models import Tree
+from apps.trees.services import plant_tree, plant_trees
+from apps.users.models import Account, User
+
+
+class GridTestCase(SimpleTestCase):
+    def test_grid_cell_is_stable_at_the_edges(self) -> None:  # noqa: PLR6301
+        """Poles and the antimeridian map to valid, distinct cells."""
+        north_east = geo.grid_cell(Decimal(90), Decimal(180))
+        south_west = geo.grid_cell(Decimal(-90), Decimal(-180))
+
+        assert south_west == 0
+        assert north_east == geo.GRID_ROWS * geo.GRID_COLUMNS - 1
+
+    def test_bbox_across_antimeridian_covers_both_sides(self) -> None:  # noqa: PLR6301
+        """A box with west > east prunes on both sides of 180°."""
+        bbox = geo.BoundingBox(south=-1, west=179.5, north=1, east=-179.5)
+        covered = [
+            cell
+            for first, last in geo.cell_ranges(bbox)
+            for cell in range(first, last + 1)
+        ]
+
+        assert geo.grid_cell(0, 179.9) in covered
+        assert geo.grid_cell(0, -179.9) in covered
+        assert geo.grid_cell(0, 0) not in covered
+
+    def test_radius_bbox_encloses_the_circle(self) -> None:  # noqa: PLR6301
+        """Every point on the circle lies inside the computed box."""
+        radius = 5_000
+        bbox = geo.radius_bbox(-23.5, -46.6, radius)
+
+        assert geo.haversine(-23.5, -46.6, bbox.north, -46.6) >= radius - 1
+        assert geo.haversine(-23.5, -46.6, -23.5, bbox.east) >= radius - 1
+
+
+class PlantedTreeSpatialViewsTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.other_account = Account.objects.create(name='Protected Zone')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.other_user = User.objects.create_user(
+            username='ciclano', email='ciclano@email.com', password='abc123'
+        )
+        self.other_user.accounts.add(self.other_account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        self.near, self.far = plant_trees(
+            user=self.user,
+            account=self.account,
+            plants=[
+                (self.tree, (Decimal('-23.550520'), Decimal('-46.633308'))),
+                (self.tree, (Decimal('-22.906847'), Decimal('-43.172897'))),
+            ],
+        )
+        self.hidden = plant_tree(
+            user=self.other_user,
+            account=self.other_account,
+            tree=self.tree,
+            latitude=Decimal('-23.550000'),
+            longitude=Decimal('-46.633000'),
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_services_fill_grid_cell(self) -> None:
+        """Both planting services store the spatial key."""
+        for planted in (self.near, self.far, self.hidden):
+            planted.refresh_from_db()
+            assert planted.grid_cell == geo.grid_cell(
+                planted.latitude, planted.longitude
+            )
+
+    def test_bbox_returns_only_visible_trees_inside(self) -> None:
+        """The viewport query filters exactly and respects accounts."""
+        url = reverse('trees:planted-tree-list-by-bbox')
+        response = self.client.get(
+            url, {'south': -24, 'west': -47, 'north': -23, 'east': -46}
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert {UUID(item['id']) for item in response.data} == {self.near.id}
+
+    def test_bbox_rejects_inverted_latitudes(self) -> None:
+        """South above north is a client error."""
+        url = reverse('trees:planted-tree-list-by-bbox')
+        response = self.client.get(
+            url, {'south': 10, 'west': -47, 'north': -10, 'east': -46}
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_radius_returns_nearest_first_with_distance(self) -> None:
+        """Radius results carry great-circle distances in meters."""
+        url = reverse('trees:planted-tree-list-by-radius')
+        response = self.client.get(
+            url,
+            {'latitude': -23.55, 'longitude': -46.63, 'radius': 100_000},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert [UUID(item['id']) for item in response.data] == [self.near.id]
+        expected = geo.haversine(-23.55, -46.63, -23.550520, -46.633308)
+        assert abs(response.data[0]['distance'] - expected) < 1
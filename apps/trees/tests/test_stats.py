@@ -0,0 +1,140 @@
+from datetime import date
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import services, stats
+from apps.trees.models import (
+    AccountTreeMonthlyStat,
+    PlantedTree,
+    Tree,
+    UserMonthlyStat,
+)
+from apps.users.models import Account, User
+
+
+class PlantingStatsTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.other_account = Account.objects.create(name='Other')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+        self.plants = [
+            (self.tree, (Decimal('-23.5'), Decimal('-46.6'))),
+        ] * 3
+
+    def _snapshot(self) -> tuple[set, set]:  # noqa: PLR6301
+        return (
+            set(
+                AccountTreeMonthlyStat.objects.filter(count__gt=0).values_list(
+                    'account_id', 'tree_id', 'month', 'count'
+                )
+            ),
+            set(
+                UserMonthlyStat.objects.filter(count__gt=0).values_list(
+                    'user_id', 'month', 'count'
+                )
+            ),
+        )
+
+    def test_plantings_increment_rollups(self) -> None:
+        """Single and bulk plantings are both counted."""
+        services.plant_trees(
+            user=self.user, account=self.account, plants=self.plants
+        )
+        planted = services.plant_tree(
+            self.user,
+            self.account,
+            self.tree,
+            Decimal('1.0'),
+            Decimal('2.0'),
+        )
+
+        month = stats.month_of(planted.planted_at)
+        account_stat = AccountTreeMonthlyStat.objects.get()
+        assert (account_stat.account, account_stat.tree) == (
+            self.account,
+            self.tree,
+        )
+        assert account_stat.month == month
+        assert account_stat.count == 4  # noqa: PLR2004
+        assert UserMonthlyStat.objects.get(user=self.user).count == 4  # noqa: PLR2004
+
+    def test_delete_decrements_rollups(self) -> None:
+        """Deleting a planting removes it from the rollups."""
+        services.plant_trees(
+            user=self.user, account=self.account, plants=self.plants
+        )
+        PlantedTree.objects.first().delete()
+
+        assert AccountTreeMonthlyStat.objects.get().count == 2  # noqa: PLR2004
+        assert UserMonthlyStat.objects.get().count == 2  # noqa: PLR2004
+
+    def test_moving_a_planting_moves_its_rollups(self) -> None:
+        """Saving a planting under another account moves its counts."""
+        services.plant_trees(
+            user=self.user, account=self.account, plants=self.plants
+        )
+        planted_tree = PlantedTree.objects.first()
+        planted_tree.account = self.other_account
+        planted_tree.save()
+
+        counts = dict(
+            AccountTreeMonthlyStat.objects.values_list('account_id', 'count')
+        )
+        assert counts == {self.account.pk: 2, self.other_account.pk: 1}
+        incremental = self._snapshot()
+        call_command('rebuild_planting_stats', stdout=StringIO())
+        assert self._snapshot() == incremental
+
+    def test_rebuild_reproduces_incremental_rollups(self) -> None:
+        """The rebuild command yields the same rows as incremental upkeep."""
+        services.plant_trees(
+            user=self.user, account=self.account, plants=self.plants
+        )
+        expected = self._snapshot()
+        AccountTreeMonthlyStat.objects.update(count=0)
+        UserMonthlyStat.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_planting_stats', stdout=out)
+
+        assert self._snapshot() == expected
+        assert 'Rebuilt 1 account/tree and 1 user' in out.getvalue()
+
+    def test_stats_endpoints_are_scoped_to_the_user(self) -> None:
+        """Only rollups of the user's accounts and of the user are listed."""
+        services.plant_trees(
+            user=self.user, account=self.account, plants=self.plants
+        )
+        AccountTreeMonthlyStat.objects.create(
+            account=self.other_account,
+            tree=self.tree,
+            month=date(2020, 1, 1),
+            count=7,
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get(reverse('trees:stats-accounts'))
+        assert response.status_code == HTTPStatus.OK
+        assert [row['account_id'] for row in response.data] == [
+            str(self.account.id)
+        ]
+        assert response.data[0]['count'] == 3  # noqa: PLR2004
+
+        response = client.get(
+            reverse('trees:stats-my'), {'until': '2020-12-31'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.data == []
@@ -0,0 +1,147 @@
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.trees import uploads
+from apps.trees.models import PlantedTree, Tree, UploadChunk
+from apps.users.models import Account, User
+
+
+class UploadSessionTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.tree = Tree.objects.create(
+            name='Ipê Amarelo', scientific_name='Handroanthus albus'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse('trees:planted-tree-upload-create'),
+            {'account_id': str(self.account.id)},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        self.session_id = response.json()['id']
+
+    def _plants(self, number: int, size: int = 3) -> dict:
+        return {
+            'plants': [
+                {
+                    'tree_id': str(self.tree.id),
+                    'latitude': f'{number}.{index:06d}',
+                    'longitude': '-46.6',
+                }
+                for index in range(size)
+            ]
+        }
+
+    def _put(self, number: int, payload: dict | None = None) -> object:
+        url = reverse(
+            'trees:planted-tree-upload-chunk',
+            kwargs={'pk': self.session_id, 'number': number},
+        )
+        return self.client.put(
+            url, payload or self._plants(number), format='json'
+        )
+
+    def _commit(self, payload: dict | None = None) -> object:
+        url = reverse(
+            'trees:planted-tree-upload-commit', kwargs={'pk': self.session_id}
+        )
+        return self.client.post(url, payload or {}, format='json')
+
+    def test_chunks_are_planted_once(self) -> None:
+        """Re-sending a processed chunk answers 200 and plants nothing."""
+        first = self._put(1)
+        retry = self._put(1)
+
+        assert first.status_code == HTTPStatus.CREATED
+        assert retry.status_code == HTTPStatus.OK
+        assert retry.json() == first.json()
+        assert first.json()['planted'] == 3  # noqa: PLR2004
+        assert PlantedTree.objects.count() == 3  # noqa: PLR2004
+
+    def test_upload_can_be_resumed_and_committed(self) -> None:
+        """The session lists the processed chunks; commit checks them."""
+        self._put(1)
+        self._put(3)
+        response = self.client.get(
+            reverse(
+                'trees:planted-tree-upload-detail',
+                kwargs={'pk': self.session_id},
+            )
+        )
+        assert [chunk['number'] for chunk in response.json()['chunks']] == [
+            1,
+            3,
+        ]
+        assert response.json()['committed_at'] is None
+
+        response = self._commit({'chunks': 3})
+        assert response.status_code == HTTPStatus.CONFLICT
+        assert response.json()['missing'] == [2]
+
+        self._put(2)
+        response = self._commit({'chunks': 3})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['planted'] == 9  # noqa: PLR2004
+        assert response.json()['committed_at'] is not None
+        assert self._commit().json() == response.json()
+
+        # A committed session still replays its chunks, but takes no more.
+        assert self._put(2).status_code == HTTPStatus.OK
+        assert self._put(4).status_code == HTTPStatus.CONFLICT
+        assert PlantedTree.objects.count() == 9  # noqa: PLR2004
+
+    def test_invalid_chunks_are_not_recorded(self) -> None:
+        """A rejected chunk plants nothing and can be sent again."""
+        payload = self._plants(1)
+        payload['plants'].append(dict(payload['plants'][0]))
+        response = self._put(1, payload)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['plants'][3] == {
+            'non_field_errors': ['Duplicate of item 0.']
+        }
+        assert not UploadChunk.objects.exists()
+        assert not PlantedTree.objects.exists()
+        assert self._put(1).status_code == HTTPStatus.CREATED
+        assert self._put(0).status_code == HTTPStatus.NOT_FOUND
+
+    def test_sessions_belong_to_their_user(self) -> None:
+        """Other users cannot see nor feed someone else's session."""
+        other = User.objects.create_user(username='beltrano', password='x')
+        other.accounts.add(self.account)
+        self.client.force_authenticate(user=other)
+
+        assert self._put(1).status_code == HTTPStatus.NOT_FOUND
+        assert self._commit().status_code == HTTPStatus.NOT_FOUND
+
+        outsider = Account.objects.create(name='Outside')
+        response = self.client.post(
+            reverse('trees:planted-tree-upload-create'),
+            {'account_id': str(outsider.id)},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_service_skips_processed_chunks(self) -> None:
+        """``upload_chunk`` reports whether it processed the chunk."""
+        session = uploads.start(self.user, self.account)
+        plants = [(self.tree, (Decimal('1.5'), Decimal('2.5')))]
+
+        chunk, created = uploads.upload_chunk(session, 1, plants)
+        again, created_again = uploads.upload_chunk(session, 1, plants)
+
+        assert created
+        assert not created_again
+        assert again == chunk
+        assert PlantedTree.objects.filter(latitude=Decimal('1.5')).count() == 1
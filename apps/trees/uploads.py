@@ -0,0 +1,132 @@
+"""
+Resumable bulk plantings: upload sessions sent in numbered chunks.
+
+A client opens an ``UploadSession`` for an account, sends the plantings in
+chunks numbered from 1 and commits the session once every chunk went
+through. Each chunk is planted with ``services.plant_trees`` in its own
+transaction, together with the ``UploadChunk`` row recording it, so:
+
+* re-sending a chunk that was processed is a no-op returning the same
+  result, whatever happened to the earlier response;
+* after a crash the client asks for the session and sends only the chunks
+  it does not list;
+* a committed session takes no new chunks.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.users.models import Account, User
+
+from . import services
+from .batch import Plant
+from .models import UploadChunk, UploadSession
+
+__all__ = [
+    'MissingChunks',
+    'SessionCommitted',
+    'commit',
+    'start',
+    'upload_chunk',
+]
+
+
+class SessionCommitted(ValueError):  # noqa: N818
+    """The session was committed and takes no new chunks."""
+
+    def __init__(self) -> None:
+        super().__init__('This upload session is already committed.')
+
+
+class MissingChunks(ValueError):  # noqa: N818
+    """Some chunks announced at commit time were never processed."""
+
+    def __init__(self, numbers: list[int]) -> None:
+        super().__init__(
+            f'Chunks {", ".join(map(str, numbers))} were not uploaded.'
+        )
+        self.numbers = numbers
+
+
+def start(user: User, account: Account) -> UploadSession:
+    """
+    Open an upload session of *user* for *account*.
+
+    Raises:
+        PermissionDenied: If the user does not belong to the account.
+    """
+    services.ensure_account_member(user, account)
+    return UploadSession.objects.create(user=user, account=account)
+
+
+def _lock(session: UploadSession) -> UploadSession:
+    """Serialize the chunks and the commit of a session."""
+    return (
+        UploadSession.objects
+        .select_for_update(of=('self',))
+        .select_related('user', 'account')
+        .get(pk=session.pk)
+    )
+
+
+@transaction.atomic
+def upload_chunk(
+    session: UploadSession, number: int, plants: Sequence[Plant]
+) -> tuple[UploadChunk, bool]:
+    """
+    Plant chunk *number* of *session*, unless it was already processed.
+
+    Returns the chunk and whether it was processed by this call.
+
+    Raises:
+        SessionCommitted: If the session is committed and lacks the chunk.
+        InvalidPlantings: If a plant is invalid or repeated; nothing is
+        planted and the chunk can be sent again.
+    """
+    session = _lock(session)
+    chunk = session.chunks.filter(number=number).first()
+    if chunk is not None:
+        return chunk, False
+    if session.committed_at is not None:
+        raise SessionCommitted
+
+    planted = services.plant_trees(
+        user=session.user,
+        account=session.account,
+        plants=plants,
+        reject_duplicates=True,
+    )
+    chunk = UploadChunk.objects.create(
+        session=session, number=number, planted=len(planted)
+    )
+    return chunk, True
+
+
+@transaction.atomic
+def commit(session: UploadSession, chunks: int | None = None) -> UploadSession:
+    """
+    Close *session*; committing twice is a no-op.
+
+    With *chunks*, every chunk from 1 to *chunks* must have been processed.
+
+    Raises:
+        MissingChunks: If some of those chunks are missing.
+    """
+    session = _lock(session)
+    if session.committed_at is None:
+        if chunks is not None:
+            received = set(session.chunks.values_list('number', flat=True))
+            missing = [
+                number
+                for number in range(1, chunks + 1)
+                if number not in received
+            ]
+            if missing:
+                raise MissingChunks(missing)
+        session.committed_at = timezone.now()
+        session.save(update_fields=['committed_at'])
+    return session
@@ -30,11 +30,96 @@ urlpatterns = [
         views.PlantedTreeListByAccountsAPIView.as_view(),
         name='planted-tree-list-by-accounts',
     ),
+    path(
+        'trees-planted/my/export/',
+        views.PlantedTreeExportByUserAPIView.as_view(),
+        name='planted-tree-export-by-user',
+    ),
+    path(
+        'trees-planted/accounts/export/',
+        views.PlantedTreeExportByAccountsAPIView.as_view(),
+        name='planted-tree-export-by-accounts',
+    ),
+    path(
+        'trees-planted/my/coordinates/',
+        views.PlantedTreeCoordinatesByUserAPIView.as_view(),
+        name='planted-tree-coordinates-by-user',
+    ),
+    path(
+        'trees-planted/accounts/coordinates/',
+        views.PlantedTreeCoordinatesByAccountsAPIView.as_view(),
+        name='planted-tree-coordinates-by-accounts',
+    ),
+    path(
+        'trees-planted/bbox/',
+        views.PlantedTreeListByBoundingBoxAPIView.as_view(),
+        name='planted-tree-list-by-bbox',
+    ),
+    path(
+        'trees-planted/clusters/',
+        views.PlantingClusterListAPIView.as_view(),
+        name='planted-tree-clusters',
+    ),
+    path(
+        'trees-planted/radius/',
+        views.PlantedTreeListByRadiusAPIView.as_view(),
+        name='planted-tree-list-by-radius',
+    ),
+    path(
+        'trees-planted/nearest/',
+        views.PlantedTreeNearestAPIView.as_view(),
+        name='planted-tree-nearest',
+    ),
     path(
         'trees-planted/bulk/',
         views.PlantedTreeBulkCreateAPIView.as_view(),
         name='planted-tree-bulk-create',
     ),
+    path(
+        'trees-planted/bulk/jobs/',
+        views.PlantingJobCreateAPIView.as_view(),
+        name='planted-tree-job-create',
+    ),
+    path(
+        'trees-planted/bulk/jobs/<uuid:pk>/',
+        views.PlantingJobDetailAPIView.as_view(),
+        name='planted-tree-job-detail',
+    ),
+    path(
+        'trees-planted/uploads/',
+        views.UploadSessionCreateAPIView.as_view(),
+        name='planted-tree-upload-create',
+    ),
+    path(
+        'trees-planted/uploads/<uuid:pk>/',
+        views.UploadSessionDetailAPIView.as_view(),
+        name='planted-tree-upload-detail',
+    ),
+    path(
+        'trees-planted/uploads/<uuid:pk>/chunks/<int:number>/',
+        views.UploadChunkAPIView.as_view(),
+        name='planted-tree-upload-chunk',
+    ),
+    path(
+        'trees-planted/uploads/<uuid:pk>/commit/',
+        views.UploadCommitAPIView.as_view(),
+        name='planted-tree-upload-commit',
+    ),
+    path(
+        'trees-planted/bulk/stream/',
+        views.PlantedTreeIngestAPIView.as_view(),
+        name='planted-tree-ingest',
+    ),
+    path(
+        'stats/accounts/',
+        views.AccountTreeMonthlyStatListAPIView.as_view(),
+        name='stats-accounts',
+    ),
+    path(
+        'stats/my/',
+        views.UserMonthlyStatListAPIView.as_view(),
+        name='stats-my',
+    ),
     path(
         'trees-planted/<uuid:pk>/',
         views.PlantedTreeAPIView.as_view(),
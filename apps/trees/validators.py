@@ -3,10 +3,24 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 
 __all__ = [
+    'MAX_LATITUDE',
+    'MAX_LONGITUDE',
+    'MIN_LATITUDE',
+    'MIN_LONGITUDE',
+    'range_message',
     'validate_latitude',
     'validate_longitude',
 ]
 
+MIN_LATITUDE, MAX_LATITUDE = Decimal(-90), Decimal(90)
+MIN_LONGITUDE, MAX_LONGITUDE = Decimal(-180), Decimal(180)
+
+
+def range_message(
+    value: Decimal, min_value: Decimal, max_value: Decimal
+) -> str:
+    return f'Value {value} must be between {min_value} and {max_value}.'
+
 
 def _in_range(
     value: Decimal, *, min_value: Decimal, max_value: Decimal
@@ -14,26 +28,16 @@ def _in_range(
     """Enforce that *value* lies between *min_value* and *max_value*."""
     if value < min_value or value > max_value:
         raise ValidationError(
-            f'Value {value} must be between {min_value} and {max_value}.',
+            range_message(value, min_value, max_value),
             params={'value': value},
         )
 
 
 def validate_latitude(value: Decimal) -> None:
     """Validate that *value* is a geographic latitude (-90 to 90)."""
-    MAX_LATITUDE_DEGREE = 90
-    _in_range(
-        value,
-        min_value=Decimal(-MAX_LATITUDE_DEGREE),
-        max_value=Decimal(MAX_LATITUDE_DEGREE),
-    )
+    _in_range(value, min_value=MIN_LATITUDE, max_value=MAX_LATITUDE)
 
 
 def validate_longitude(value: Decimal) -> None:
     """Validate that *value* is a geographic longitude (-180 to 180)."""
-    MAX_LONGITUDE_DEGREE = 180
-    _in_range(
-        value,
-        min_value=Decimal(-MAX_LONGITUDE_DEGREE),
-        max_value=Decimal(MAX_LONGITUDE_DEGREE),
-    )
+    _in_range(value, min_value=MIN_LONGITUDE, max_value=MAX_LONGITUDE)
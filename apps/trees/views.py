@@ -1,63 +1,572 @@
 from __future__ import annotations
 
-from django.db.models import QuerySet
-from rest_framework import generics, permissions
+from django.db.models import QuerySet, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import (
+    NotFound,
+    UnsupportedMediaType,
+    ValidationError,
+)
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.views import APIView
 
+from apps.core.mixins import (
+    ConditionalListMixin,
+    IdempotentCreateMixin,
+    RowListMixin,
+    TimedViewMixin,
+)
 from apps.core.permissions import IsOwner
+from apps.core.renderers import CSVRenderer, NDJSONRenderer
+from apps.users import membership
 
-from .models import PlantedTree, Tree
+from . import (
+    batch,
+    catalog,
+    clusters,
+    exports,
+    ingest,
+    nearby,
+    packed,
+    services,
+    uploads,
+)
+from .geo import BoundingBox
+from .models import (
+    AccountTreeMonthlyStat,
+    PlantedTree,
+    PlantingJob,
+    Tree,
+    UploadSession,
+    UserMonthlyStat,
+)
+from .pagination import PlantedTreeCursorPagination
 from .serializers import (
+    AccountTreeMonthlyStatSerializer,
+    BoundingBoxQuerySerializer,
+    ClusterQuerySerializer,
+    ExportQuerySerializer,
+    IngestQuerySerializer,
+    NearestQuerySerializer,
+    PlantedTreeDistanceSerializer,
     PlantedTreeListSerializer,
+    PlantedTreeRowSerializer,
     PlantedTreeSerializer,
+    PlantingClusterSerializer,
+    PlantingJobSerializer,
+    RadiusQuerySerializer,
+    StatsQuerySerializer,
     TreeSerializer,
+    UploadChunkPlantsSerializer,
+    UploadChunkSerializer,
+    UploadCommitSerializer,
+    UploadSessionSerializer,
+    UserMonthlyStatSerializer,
 )
 
 
-class PlantedTreeListByUserAPIView(generics.ListAPIView):
+class PlantedTreeListByUserAPIView(
+    TimedViewMixin, ConditionalListMixin, RowListMixin, generics.ListAPIView
+):
     serializer_class = PlantedTreeSerializer
+    row_serializer_class = PlantedTreeRowSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PlantedTreeCursorPagination
+
+    def get_version_scopes(self) -> list[str]:
+        return [
+            catalog.CATALOG_SCOPE,
+            services.user_scope(self.request.user.pk),
+            membership.user_scope(self.request.user.pk),
+            *map(
+                membership.account_scope,
+                membership.get_account_ids(self.request.user),
+            ),
+        ]
 
     def get_queryset(self) -> QuerySet[PlantedTree]:
-        return PlantedTree.objects.for_user(self.request.user).select_related(
-            'user', 'tree', 'account'
-        )
+        return PlantedTree.objects.for_user(self.request.user).with_details()
 
 
-class PlantedTreeAPIView(generics.RetrieveAPIView):
+class PlantedTreeAPIView(TimedViewMixin, generics.RetrieveAPIView):
     serializer_class = PlantedTreeSerializer
-    queryset = PlantedTree.objects.all()
+    queryset = PlantedTree.objects.with_details()
     permission_classes = [permissions.IsAuthenticated, IsOwner]
 
 
-class PlantedTreeCreateAPIView(generics.CreateAPIView):
+class PlantedTreeCreateAPIView(TimedViewMixin, generics.CreateAPIView):
     serializer_class = PlantedTreeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class PlantedTreeBulkCreateAPIView(generics.CreateAPIView):
+class PlantedTreeBulkCreateAPIView(
+    TimedViewMixin, IdempotentCreateMixin, generics.CreateAPIView
+):
+    """
+    Plant a batch of trees in one transaction.
+
+    Send an ``Idempotency-Key`` header to make retries safe: a repeated key
+    replays the first response instead of planting again.
+    """
+
     serializer_class = PlantedTreeListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class PlantedTreeListByAccountsAPIView(generics.ListAPIView):
+class PlantingJobCreateAPIView(TimedViewMixin, generics.CreateAPIView):
+    """
+    Queue a bulk planting and answer 202 at once.
+
+    Takes the body of the bulk endpoint. ``run_planting_jobs`` plants it in
+    the background; poll the job's ``Location`` for its progress.
+    """
+
+    serializer_class = PlantingJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(
+        self, request: Request, *args: tuple, **kwargs: dict
+    ) -> Response:
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response['Location'] = reverse(
+            'trees:planted-tree-job-detail',
+            kwargs={'pk': response.data['id']},
+            request=request,
+        )
+        return response
+
+
+class PlantingJobDetailAPIView(TimedViewMixin, generics.RetrieveAPIView):
+    """Status, counts and errors of a background bulk planting."""
+
+    serializer_class = PlantingJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet[PlantingJob]:
+        return PlantingJob.objects.filter(user=self.request.user).defer(
+            'plants'
+        )
+
+
+class UploadSessionCreateAPIView(TimedViewMixin, generics.CreateAPIView):
+    """Open a resumable, chunked bulk upload (see ``apps.trees.uploads``)."""
+
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class UploadSessionDetailAPIView(TimedViewMixin, generics.RetrieveAPIView):
+    """An upload session and its processed chunks, to resume an upload."""
+
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet[UploadSession]:
+        return UploadSession.objects.filter(
+            user=self.request.user
+        ).prefetch_related('chunks')
+
+
+class UploadChunkAPIView(TimedViewMixin, APIView):
+    """
+    Plant chunk ``number`` (from 1) of an upload session.
+
+    Takes ``{"plants": [...]}`` like the bulk endpoint. The first upload
+    of a chunk answers 201; sending it again answers 200 with the same
+    result and plants nothing.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request: Request, pk: str, number: int) -> Response:  # noqa: PLR6301
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        if number < 1:
+            raise NotFound
+        chunk = session.chunks.filter(number=number).first()
+        created = False
+        if chunk is None:
+            serializer = UploadChunkPlantsSerializer(
+                data=request.data, context={'request': request}
+            )
+            serializer.is_valid(raise_exception=True)
+            try:
+                chunk, created = uploads.upload_chunk(
+                    session,
+                    number,
+                    serializer.to_plants(serializer.validated_data['plants']),
+                )
+            except batch.InvalidPlantings as exc:
+                raise ValidationError({'plants': exc.errors}) from exc
+            except uploads.SessionCommitted as exc:
+                return Response(
+                    {'detail': str(exc)}, status=status.HTTP_409_CONFLICT
+                )
+        return Response(
+            UploadChunkSerializer(chunk).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class UploadCommitAPIView(TimedViewMixin, APIView):
+    """
+    Close an upload session.
+
+    With ``{"chunks": n}``, answers 409 listing the ``missing`` chunks
+    unless chunks 1 to n were all processed. Committing again is a no-op.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request, pk: str) -> Response:  # noqa: PLR6301
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        params = UploadCommitSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            session = uploads.commit(
+                session, params.validated_data.get('chunks')
+            )
+        except uploads.MissingChunks as exc:
+            return Response(
+                {'detail': str(exc), 'missing': exc.numbers},
+                status=status.HTTP_409_CONFLICT,
+            )
+        prefetch_related_objects([session], 'chunks')
+        return Response(UploadSessionSerializer(session).data)
+
+
+class PlantedTreeIngestAPIView(TimedViewMixin, APIView):
+    """
+    Plant trees from an NDJSON or CSV upload of any size.
+
+    The body is read incrementally (``application/x-ndjson`` or
+    ``text/csv``, one ``tree_id``/``latitude``/``longitude`` record per
+    line) and written batch by batch. The response reports accepted and
+    rejected rows with per-row errors.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parsers = {
+        NDJSONRenderer.media_type: ingest.parse_ndjson,
+        CSVRenderer.media_type: ingest.parse_csv,
+    }
+
+    def post(self, request: Request) -> Response:
+        params = IngestQuerySerializer(
+            data=request.query_params, context={'request': request}
+        )
+        params.is_valid(raise_exception=True)
+
+        media_type = request.content_type.split(';')[0].strip()
+        parse = self.parsers.get(media_type)
+        if parse is None:
+            raise UnsupportedMediaType(media_type)
+        # No stream means no Content-Length: a chunked body cannot be read.
+        if request.stream is None:
+            return Response(
+                {'detail': 'A Content-Length header is required.'},
+                status=status.HTTP_411_LENGTH_REQUIRED,
+            )
+
+        report = services.ingest_plantings(
+            user=request.user,
+            account=params.validated_data['account_id'],
+            records=parse(request.stream),
+            batch_size=params.validated_data.get('batch_size'),
+        )
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+class PlantedTreeListByAccountsAPIView(
+    TimedViewMixin, ConditionalListMixin, RowListMixin, generics.ListAPIView
+):
+    serializer_class = PlantedTreeSerializer
+    row_serializer_class = PlantedTreeRowSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PlantedTreeCursorPagination
+
+    def get_version_scopes(self) -> list[str]:
+        account_ids = membership.get_account_ids(self.request.user)
+        return [
+            catalog.CATALOG_SCOPE,
+            membership.user_scope(self.request.user.pk),
+            *map(services.account_scope, account_ids),
+            *map(membership.account_scope, account_ids),
+        ]
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        account_ids = membership.get_account_ids(self.request.user)
+        return PlantedTree.objects.for_accounts(account_ids).with_details()
+
+
+class PlantedTreeListByBoundingBoxAPIView(
+    TimedViewMixin, RowListMixin, generics.ListAPIView
+):
+    """Plantings of the user's accounts inside a map viewport."""
+
     serializer_class = PlantedTreeSerializer
+    row_serializer_class = PlantedTreeRowSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PlantedTreeCursorPagination
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        params = BoundingBoxQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return (
+            PlantedTree.objects
+            .for_accounts(membership.get_account_ids(self.request.user))
+            .within_bbox(params.validated_data)
+            .with_details()
+        )
+
+
+class PlantedTreeListByRadiusAPIView(TimedViewMixin, generics.ListAPIView):
+    """Plantings of the user's accounts around a point, nearest first."""
+
+    serializer_class = PlantedTreeDistanceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self) -> QuerySet[PlantedTree]:
-        user = self.request.user
-        user_accounts = user.accounts.all()
-        return PlantedTree.objects.for_accounts(user_accounts).select_related(
-            'user', 'tree', 'account'
+        params = RadiusQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        return (
+            PlantedTree.objects
+            .for_accounts(membership.get_account_ids(self.request.user))
+            .within_radius(data['latitude'], data['longitude'], data['radius'])
+            .with_details()
+            .order_by('distance', '-planted_at')[: data['limit']]
         )
 
 
-class TreeListCreateAPIView(generics.ListCreateAPIView):
+class PlantedTreeNearestAPIView(TimedViewMixin, generics.ListAPIView):
+    """
+    The ``k`` plantings of the user's accounts nearest to a point.
+
+    Takes ``latitude``/``longitude``, ``k`` (default 10) and an optional
+    ``radius`` cap in meters. Served from ``apps.trees.nearby``.
+    """
+
+    serializer_class = PlantedTreeDistanceSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self) -> list[PlantedTree]:
+        params = NearestQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return nearby.nearest(
+            membership.get_account_ids(self.request.user),
+            **params.validated_data,
+        )
+
+
+class PlantingClusterListAPIView(
+    TimedViewMixin, ConditionalListMixin, generics.ListAPIView
+):
+    """
+    Clustered plantings of the user's accounts inside a map viewport.
+
+    Takes the ``south``/``west``/``north``/``east`` box and the map
+    ``zoom``; every cluster has its centroid, planting count and a count
+    per tree id. Served from ``apps.trees.clusters`` aggregates.
+    """
+
+    serializer_class = PlantingClusterSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_version_scopes(self) -> list[str]:
+        return list(
+            map(
+                services.account_scope,
+                membership.get_account_ids(self.request.user),
+            )
+        )
+
+    def get_queryset(self) -> list[clusters.Cluster]:
+        params = ClusterQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return clusters.within(
+            membership.get_account_ids(self.request.user),
+            **params.validated_data,
+        )
+
+
+class PlantedTreeExportAPIView(TimedViewMixin, APIView):
+    """
+    Stream plantings as NDJSON (default) or CSV (``?format=csv``).
+
+    Pick columns with ``?columns=id,latitude,longitude``. Rows are fetched
+    in chunks straight from the database, so the export never holds the
+    whole result in memory.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    filename = 'planted-trees'
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        raise NotImplementedError
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        columns = params.validated_data.get('columns', exports.DEFAULT_COLUMNS)
+
+        renderer = request.accepted_renderer
+        encode = (
+            exports.iter_csv
+            if renderer.format == CSVRenderer.format
+            else exports.iter_ndjson
+        )
+        response = StreamingHttpResponse(
+            encode(self.get_queryset(), columns),
+            content_type=renderer.media_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.filename}.{renderer.format}"'
+        )
+        return response
+
+
+class PlantedTreeExportByUserAPIView(PlantedTreeExportAPIView):
+    filename = 'my-planted-trees'
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        return PlantedTree.objects.for_user(self.request.user)
+
+
+class PlantedTreeExportByAccountsAPIView(PlantedTreeExportAPIView):
+    filename = 'account-planted-trees'
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        return PlantedTree.objects.for_accounts(
+            membership.get_account_ids(self.request.user)
+        )
+
+
+class PackedCoordinatesMixin:
+    """Stream ``get_queryset()`` in the ``apps.trees.packed`` format."""
+
+    def list(self, request: Request) -> StreamingHttpResponse:
+        queryset = self.get_queryset()
+        if any(name in request.query_params for name in BoundingBox._fields):
+            params = BoundingBoxQuerySerializer(data=request.query_params)
+            params.is_valid(raise_exception=True)
+            queryset = queryset.within_bbox(params.validated_data)
+        return StreamingHttpResponse(
+            packed.iter_packed(queryset),
+            content_type=packed.MEDIA_TYPE,
+        )
+
+
+class PlantedTreeCoordinatesAPIView(
+    TimedViewMixin, ConditionalListMixin, PackedCoordinatesMixin, APIView
+):
+    """
+    Coordinates, species and planting day of plantings as packed binary.
+
+    See ``apps.trees.packed`` for the layout. ``south``/``west``/
+    ``north``/``east`` optionally limit the payload to a map viewport.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        raise NotImplementedError
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        return self.list(request)
+
+
+class PlantedTreeCoordinatesByUserAPIView(PlantedTreeCoordinatesAPIView):
+    def get_version_scopes(self) -> list[str]:
+        return [services.user_scope(self.request.user.pk)]
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        return PlantedTree.objects.for_user(self.request.user)
+
+
+class PlantedTreeCoordinatesByAccountsAPIView(PlantedTreeCoordinatesAPIView):
+    def get_version_scopes(self) -> list[str]:
+        return list(
+            map(
+                services.account_scope,
+                membership.get_account_ids(self.request.user),
+            )
+        )
+
+    def get_queryset(self) -> QuerySet[PlantedTree]:
+        return PlantedTree.objects.for_accounts(
+            membership.get_account_ids(self.request.user)
+        )
+
+
+class TreeListCreateAPIView(
+    TimedViewMixin, ConditionalListMixin, generics.ListCreateAPIView
+):
     serializer_class = TreeSerializer
     queryset = Tree.objects.all()
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_version_scopes(self) -> list[str]:  # noqa: PLR6301
+        return [catalog.CATALOG_SCOPE]
+
 
-class TreeRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TreeRetrieveUpdateDestroyAPIView(
+    TimedViewMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = TreeSerializer
     queryset = Tree.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+
+
+class StatsFilterMixin:
+    """Apply ``?since=``/``?until=`` (and other equality) filters."""
+
+    equality_filters: tuple[str, ...] = ()
+
+    def filter_stats(self, queryset: QuerySet) -> QuerySet:
+        params = StatsQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        if 'since' in data:
+            queryset = queryset.filter(month__gte=data['since'].replace(day=1))
+        if 'until' in data:
+            queryset = queryset.filter(month__lte=data['until'])
+        for name in self.equality_filters:
+            if name in data:
+                queryset = queryset.filter(**{name: data[name]})
+        return queryset.filter(count__gt=0)
+
+
+class AccountTreeMonthlyStatListAPIView(
+    TimedViewMixin, StatsFilterMixin, generics.ListAPIView
+):
+    """Monthly planting counts per tree for the user's accounts."""
+
+    serializer_class = AccountTreeMonthlyStatSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    equality_filters = ('account_id', 'tree_id')
+
+    def get_queryset(self) -> QuerySet[AccountTreeMonthlyStat]:
+        account_ids = membership.get_account_ids(self.request.user)
+        return self.filter_stats(
+            AccountTreeMonthlyStat.objects.filter(account__in=account_ids)
+        ).order_by('-month', 'account_id', 'tree_id')
+
+
+class UserMonthlyStatListAPIView(
+    TimedViewMixin, StatsFilterMixin, generics.ListAPIView
+):
+    """Monthly planting counts of the current user."""
+
+    serializer_class = UserMonthlyStatSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self) -> QuerySet[UserMonthlyStat]:
+        return self.filter_stats(
+            UserMonthlyStat.objects.filter(user=self.request.user)
+        )
@@ -0,0 +1,29 @@
+"""
+Entry points of the ``run_planting_jobs`` worker processes.
+
+Workers are spawned, so they unpickle these functions before Django is set
+up: this module must not import models at import time.
+"""
+
+from __future__ import annotations
+
+from uuid import UUID
+
+import django
+
+__all__ = ['run', 'setup']
+
+
+def setup() -> None:
+    """Set Django up in a freshly spawned worker process."""
+    django.setup()
+
+
+def run(job_id: UUID) -> str | None:
+    """Run a claimed planting job; see ``apps.trees.jobs.run``."""
+    from apps.core import routers  # noqa: PLC0415
+
+    from . import jobs  # noqa: PLC0415
+
+    with routers.use_primary():
+        return jobs.run(job_id)
@@ -0,0 +1,181 @@
+"""
+Cached account membership of users.
+
+The set of account ids a user belongs to is read on almost every request
+(permissions, querysets, planting services). It is memoised on the user
+instance for the duration of a request and shared across requests through
+Django's cache framework, under a key that includes the version of the
+user's ``user_scope`` (see ``apps.core.versions``).
+
+``invalidate`` must be called inside every write that changes a
+``UserAccount`` link; ``apps.users.signals`` does so. It bumps the scopes
+of the users and accounts involved, and only those, so entries cached by
+any process, even in a per-process cache, stop being used: this process
+reloads the user's version when the write commits, the others within
+``ACCOUNT_MEMBERSHIP_RECHECK_INTERVAL`` seconds. Memberships read by a
+concurrent request before the commit stay under the old version.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from functools import partial
+from uuid import UUID
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+from apps.core import versions
+from apps.core.cache import TTLCache
+
+from .models import User, UserAccount
+
+__all__ = [
+    'account_scope',
+    'aget_account_ids',
+    'get_account_ids',
+    'invalidate',
+    'is_member',
+    'user_scope',
+]
+
+_CACHE_KEY = 'users:account-ids:{version}:{user_id}'
+_MEMO_ATTR = '_account_ids_memo'
+_VERSIONS_SIZE = 100_000
+
+# {user id: (scope version, monotonic time it was read)} in this process;
+# memos left on long-lived user instances (e.g. a forcibly authenticated
+# test user) carry the version too, so they go stale with it.
+_versions = TTLCache(max_size=_VERSIONS_SIZE, ttl=math.inf)
+_drops = 0
+
+
+def user_scope(user_id: UUID) -> str:
+    """Version scope (see apps.core.versions) of a user and its links."""
+    return f'users:user:{user_id}'
+
+
+def account_scope(account_id: UUID) -> str:
+    """Version scope of an account and its members."""
+    return f'users:account:{account_id}'
+
+
+def _token(version: int, modified: datetime | None) -> str:
+    # The time tells apart the versions of a scope row that was recreated.
+    return f'{version}-{modified.timestamp()}' if modified else '0'
+
+
+def _cached_version(user_id: UUID) -> tuple[str | None, int, float]:
+    entry, drops, now = _versions.get(user_id), _drops, time.monotonic()
+    interval = settings.ACCOUNT_MEMBERSHIP_RECHECK_INTERVAL
+    if entry is not None and now - entry[1] < interval:
+        return entry[0], drops, now
+    return None, drops, now
+
+
+def _store_version(
+    user_id: UUID, version: str, drops: int, now: float
+) -> None:
+    # A drop during the query may mean the version read is already old.
+    if drops == _drops:
+        _versions.set(user_id, (version, now))
+
+
+def _version(user_id: UUID) -> str:
+    version, drops, now = _cached_version(user_id)
+    if version is None:
+        version = _token(*versions.current(user_scope(user_id)))
+        _store_version(user_id, version, drops, now)
+    return version
+
+
+async def _aversion(user_id: UUID) -> str:
+    version, drops, now = _cached_version(user_id)
+    if version is None:
+        version = _token(*await versions.acurrent(user_scope(user_id)))
+        _store_version(user_id, version, drops, now)
+    return version
+
+
+def get_account_ids(user: User | AnonymousUser) -> frozenset[UUID]:
+    """Return the ids of the accounts *user* belongs to."""
+    if not user.is_authenticated:
+        return frozenset()
+
+    version = _version(user.pk)
+    memo = getattr(user, _MEMO_ATTR, None)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+
+    key = _CACHE_KEY.format(version=version, user_id=user.pk)
+    account_ids = cache.get(key)
+    if account_ids is None:
+        account_ids = frozenset(_account_ids_query(user))
+        cache.set(key, account_ids, settings.ACCOUNT_MEMBERSHIP_CACHE_TIMEOUT)
+
+    setattr(user, _MEMO_ATTR, (version, account_ids))
+    return account_ids
+
+
+async def aget_account_ids(user: User | AnonymousUser) -> frozenset[UUID]:
+    """Async variant of ``get_account_ids``."""
+    if not user.is_authenticated:
+        return frozenset()
+
+    version = await _aversion(user.pk)
+    memo = getattr(user, _MEMO_ATTR, None)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+
+    key = _CACHE_KEY.format(version=version, user_id=user.pk)
+    account_ids = await cache.aget(key)
+    if account_ids is None:
+        account_ids = frozenset([
+            pk async for pk in _account_ids_query(user)
+        ])
+        await cache.aset(
+            key, account_ids, settings.ACCOUNT_MEMBERSHIP_CACHE_TIMEOUT
+        )
+
+    setattr(user, _MEMO_ATTR, (version, account_ids))
+    return account_ids
+
+
+def _account_ids_query(user: User) -> QuerySet:
+    return UserAccount.objects.filter(user_id=user.pk).values_list(
+        'account_id', flat=True
+    )
+
+
+def is_member(user: User | AnonymousUser, account_id: UUID) -> bool:
+    """Return whether *user* belongs to the account *account_id*."""
+    return account_id in get_account_ids(user)
+
+
+def invalidate(
+    user_ids: Iterable[UUID], account_ids: Iterable[UUID] = ()
+) -> None:
+    """
+    Make every process reload the memberships of *user_ids*.
+
+    Call inside the write; *account_ids* are the accounts whose members
+    changed.
+    """
+    user_ids = list(user_ids)
+    versions.bump(*map(user_scope, user_ids), *map(account_scope, account_ids))
+    # Now, so the writer sees its change, and again once it is committed.
+    _drop(user_ids)
+    transaction.on_commit(partial(_drop, user_ids))
+
+
+def _drop(user_ids: list[UUID]) -> None:
+    global _drops  # noqa: PLW0603
+    for user_id in user_ids:
+        _versions.delete(user_id)
+    _drops += 1
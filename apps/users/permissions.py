@@ -1,6 +1,8 @@
 from rest_framework import permissions
 
+from . import membership
+
 
 class IsAccountMember(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):  # noqa: ANN001, ANN201, PLR6301
-        return obj.users.filter(id=request.user.id).exists()
+        return membership.is_member(request.user, obj.pk)
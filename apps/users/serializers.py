@@ -3,16 +3,18 @@ from typing import Any
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 
+from apps.core.serializers import TimedSerializerMixin
+
 from .models import Account, Profile, User
 
 
-class AccountSerializer(serializers.ModelSerializer):
+class AccountSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Account
         fields = ('id', 'name')
 
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'password')
@@ -22,7 +24,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'first_name', 'last_name', 'accounts')
@@ -37,7 +39,7 @@ class AccountMemberSerializer(serializers.Serializer):
         return value
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
 
     class Meta:
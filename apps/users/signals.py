@@ -0,0 +1,104 @@
+from typing import Any
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core import versions
+
+from . import membership
+from .models import Account, User, UserAccount
+
+_CLEARED_ATTR = '_cleared_pks'
+
+
+@receiver(post_save, sender=UserAccount)
+@receiver(post_delete, sender=UserAccount)
+def forget_membership(instance: UserAccount, **kwargs: Any) -> None:  # noqa: ANN401
+    membership.invalidate([instance.user_id], [instance.account_id])
+
+
+@receiver(post_save, sender=User)
+def touch_user(
+    instance: User,
+    created: bool,  # noqa: FBT001
+    raw: bool,  # noqa: FBT001
+    update_fields: frozenset[str] | None,
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    # Logging in only stamps last_login, which no payload shows.
+    if created or raw or update_fields == {'last_login'}:
+        return
+    # Planted-tree payloads nest the user: lists of the accounts it belongs
+    # to or planted in show it.
+    account_ids = {
+        *UserAccount.objects.filter(user=instance).values_list(
+            'account_id', flat=True
+        ),
+        *instance.planted_trees
+        .order_by()
+        .values_list('account_id', flat=True)
+        .distinct(),
+    }
+    versions.bump(
+        membership.user_scope(instance.pk),
+        *map(membership.account_scope, account_ids),
+    )
+
+
+@receiver(post_save, sender=Account)
+def touch_account(
+    instance: Account,
+    created: bool,  # noqa: FBT001
+    raw: bool,  # noqa: FBT001
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    if created or raw:
+        return
+    # Payloads nest the account too: members see it through the account
+    # scope, former members who planted in it through their own.
+    user_ids = (
+        instance.planted_trees
+        .order_by()
+        .exclude(user__accounts=instance)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    versions.bump(
+        membership.account_scope(instance.pk),
+        *map(membership.user_scope, user_ids),
+    )
+
+
+@receiver(post_delete, sender=User)
+def forget_user(instance: User, **kwargs: Any) -> None:  # noqa: ANN401
+    versions.bump(membership.user_scope(instance.pk))
+
+
+@receiver(post_delete, sender=Account)
+def forget_account(instance: Account, **kwargs: Any) -> None:  # noqa: ANN401
+    versions.bump(membership.account_scope(instance.pk))
+
+
+@receiver(m2m_changed, sender=User.accounts.through)
+def forget_memberships(
+    instance: User | Account,
+    action: str,
+    reverse: bool,  # noqa: FBT001
+    pk_set: set | None,
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    # user.accounts.<action>() or account.users.<action>()
+    related = instance.users if reverse else instance.accounts
+    if action == 'pre_clear':
+        # The links are gone by post_clear, which gets no pk_set.
+        pks = list(related.values_list('pk', flat=True))
+        setattr(instance, _CLEARED_ATTR, pks)
+        return
+    if not action.startswith('post_'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, _CLEARED_ATTR, ())
+    if reverse:
+        membership.invalidate(pk_set, [instance.pk])
+    else:
+        membership.invalidate([instance.pk], pk_set)
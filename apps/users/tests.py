@@ -1,2 +1,183 @@
+from http import HTTPStatus
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.http import HttpResponseBase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core import versions
+from apps.core.testing import QueryBudgetMixin
+from apps.users import membership
+from apps.users.models import Account, User, UserAccount
+
+
+class AccountMembershipCacheTestCase(TestCase):
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account1 = Account.objects.create(name='Reforestation')
+        self.account2 = Account.objects.create(name='Protected Zone')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account1)
+
+    def test_membership_is_served_from_cache(self) -> None:
+        """Only the first lookup hits the database."""
+        assert membership.get_account_ids(self.user) == {self.account1.pk}
+
+        fresh_user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            assert membership.is_member(fresh_user, self.account1.pk)
+            assert not membership.is_member(fresh_user, self.account2.pk)
+
+    def test_add_and_remove_invalidate_cache(self) -> None:
+        """M2M changes from either side are seen immediately."""
+        membership.get_account_ids(self.user)
+
+        self.user.accounts.add(self.account2)
+        assert membership.is_member(self.user, self.account2.pk)
+
+        self.account2.users.remove(self.user)
+        assert not membership.is_member(self.user, self.account2.pk)
+
+    def test_user_account_delete_invalidates_cache(self) -> None:
+        """Deleting the link row (e.g. via cascade) drops the membership."""
+        membership.get_account_ids(self.user)
+
+        UserAccount.objects.filter(account=self.account1).delete()
+
+        assert membership.get_account_ids(self.user) == frozenset()
+
+    def test_changes_keep_other_users_cached(self) -> None:
+        """A user joining an account leaves other memberships cached."""
+        other = User.objects.create_user(username='beltrano', password='!')
+        other.accounts.add(self.account1)
+        membership.get_account_ids(self.user)
+
+        other.accounts.add(self.account2)
+
+        fresh_user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            assert membership.is_member(fresh_user, self.account1.pk)
+
+    def test_other_processes_see_changes_after_the_recheck(self) -> None:
+        """A change committed elsewhere is seen once the version is read."""
+        membership.get_account_ids(self.user)
+        # Another process adds the link: only the database version moves.
+        UserAccount.objects.bulk_create([
+            UserAccount(user=self.user, account=self.account2)
+        ])
+        versions.bump(membership.user_scope(self.user.pk))
+
+        fresh_user = User.objects.get(pk=self.user.pk)
+        assert not membership.is_member(fresh_user, self.account2.pk)
+        with override_settings(ACCOUNT_MEMBERSHIP_RECHECK_INTERVAL=0):
+            assert membership.is_member(fresh_user, self.account2.pk)
+
+    def test_concurrent_reads_do_not_outlive_the_commit(self) -> None:
+        """What was cached before the commit is not served after it."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            UserAccount.objects.filter(account=self.account1).delete()
+            # A concurrent request, not seeing the uncommitted bump, caches
+            # the old membership under the old version.
+            with mock.patch.object(membership, '_version', return_value='0'):
+                fresh_user = User.objects.get(pk=self.user.pk)
+                cache.set(
+                    membership._CACHE_KEY.format(
+                        version='0', user_id=self.user.pk
+                    ),
+                    frozenset({self.account1.pk}),
+                )
+                assert membership.is_member(fresh_user, self.account1.pk)
+        for callback in callbacks:
+            callback()
+
+        fresh_user = User.objects.get(pk=self.user.pk)
+        assert not membership.is_member(fresh_user, self.account1.pk)
+
+    def test_add_to_account_endpoint_refreshes_membership(self) -> None:
+        """Joining through the API is reflected in the next check."""
+        membership.get_account_ids(self.user)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.post(
+            reverse('users:user-add-to-account'),
+            {'account_id': str(self.account2.pk)},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert membership.is_member(self.user, self.account2.pk)
+
+
+class UsersQueryBudgetTestCase(QueryBudgetMixin, TestCase):
+    urlconf = 'apps.users.urls'
+    budgets = {
+        'users:api-root': 0,
+        'users:user-list': 2,
+        'users:user-detail': 2,
+        'users:user-add-to-account': 6,
+        'users:account-list': 1,
+        'users:account-detail': 1,
+        'users:login': 2,
+    }
+
+    def setUp(self) -> None:  # noqa: D401, N802
+        self.account = Account.objects.create(name='Reforestation')
+        self.user = User.objects.create_user(
+            username='fulano', email='fulano@email.com', password='test1234'
+        )
+        self.user.accounts.add(self.account)
+        self.seeded = 0
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def seed(self, n: int) -> None:
+        """Add ``n`` users, each in a new account shared with the user."""
+        start, self.seeded = self.seeded, self.seeded + n
+        accounts = Account.objects.bulk_create(
+            Account(name=f'Account {index}')
+            for index in range(start, self.seeded)
+        )
+        users = User.objects.bulk_create(
+            User(username=f'member-{index}', password='!')
+            for index in range(start, self.seeded)
+        )
+        UserAccount.objects.bulk_create([
+            *(
+                UserAccount(user=user, account=account)
+                for user, account in zip(users, accounts, strict=True)
+            ),
+            *(
+                UserAccount(user=self.user, account=account)
+                for account in accounts
+            ),
+        ])
+        membership.invalidate(
+            [self.user.pk, *(user.pk for user in users)],
+            [account.pk for account in accounts],
+        )
+
+    def request_endpoint(self, name: str) -> HttpResponseBase:
+        match name:
+            case 'users:user-detail':
+                url = reverse(name, kwargs={'pk': self.user.pk})
+                return self.client.get(url)
+            case 'users:account-detail':
+                url = reverse(name, kwargs={'pk': self.account.pk})
+                return self.client.get(url)
+            case 'users:user-add-to-account':
+                return self.client.post(
+                    reverse(name),
+                    {'account_id': str(self.account.id)},
+                    format='json',
+                )
+            case 'users:login':
+                return self.client.post(
+                    reverse(name),
+                    {'username': 'fulano', 'password': 'test1234'},
+                    format='json',
+                )
+        return self.client.get(reverse(name))
@@ -11,6 +11,8 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
+from apps.core.mixins import TimedViewMixin
+
 from .models import Account, Profile, User
 from .permissions import IsAccountMember
 from .serializers import (
@@ -23,8 +25,8 @@ from .serializers import (
 )
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(TimedViewMixin, viewsets.ModelViewSet):
+    queryset = User.objects.prefetch_related('accounts')
     serializer_class = UserSerializer
 
     def get_serializer_class(
@@ -59,12 +61,12 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
 
-class LoginView(ObtainAuthToken):
+class LoginView(TimedViewMixin, ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     permission_classes = [AllowAny]
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(TimedViewMixin, viewsets.ModelViewSet):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticated, IsAccountMember]
@@ -80,7 +82,7 @@ class AccountViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(TimedViewMixin, viewsets.ModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
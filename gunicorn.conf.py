@@ -0,0 +1,71 @@
+"""
+Production server configuration, read by ``gunicorn`` from this directory.
+
+Every value comes from the ``SERVER_*`` Django settings, so the server is
+configured through the same environment variables as the application.
+
+The application is loaded once, in the master, and warmed up there
+(``trees_everywhere.warmup``) before the workers are forked, so they share
+its memory. Workers are replaced after ``SERVER_MAX_REQUESTS`` requests and
+finish their requests on restart or shutdown (``SIGTERM``) within
+``SERVER_GRACEFUL_TIMEOUT`` seconds.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from gunicorn.arbiter import Arbiter
+    from gunicorn.workers.base import Worker
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'trees_everywhere.settings')
+
+from django.conf import settings  # noqa: E402
+
+wsgi_app = settings.SERVER_APP
+bind = settings.SERVER_BIND
+worker_class = settings.SERVER_WORKER_CLASS
+workers = settings.SERVER_WORKERS
+threads = settings.SERVER_THREADS
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+keepalive = settings.SERVER_KEEPALIVE
+preload_app = True
+accesslog = '-'
+
+
+def on_starting(server: Arbiter) -> None:
+    from django.core.management import call_command  # noqa: PLC0415
+
+    from apps.core import metrics  # noqa: PLC0415
+    from trees_everywhere import warmup  # noqa: PLC0415
+
+    # Samples of the previous run's processes would add up with the new
+    # ones; those of processes still running (run_planting_jobs) are kept.
+    metrics.remove_dead_samples()
+    call_command('check', deploy=True)
+    call_command('build_schema')
+    warmup.before_fork()
+
+
+def post_fork(server: Arbiter, worker: Worker) -> None:
+    from trees_everywhere import warmup  # noqa: PLC0415
+
+    warmup.after_fork()
+
+
+def worker_exit(server: Arbiter, worker: Worker) -> None:
+    from django.db import connections  # noqa: PLC0415
+
+    connections.close_all()
+
+
+def child_exit(server: Arbiter, worker: Worker) -> None:
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess  # noqa: PLC0415
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 import environ
 
@@ -33,7 +34,7 @@ SECRET_KEY = env('SECRET_KEY')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env('DEBUG')
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=[])
 
 
 # Application definition
@@ -54,7 +55,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.RequestTimingMiddleware',
+    'apps.core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -90,6 +94,42 @@ DATABASES = {
     'default': env.db(),
 }
 
+# Optional read replicas, as comma-separated database URLs; reads of the
+# project apps go to a healthy one (apps.core.routers). Tests mirror them.
+
+DATABASE_REPLICAS = []
+
+for _index, _url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    DATABASES[f'replica_{_index}'] = {
+        **env.db_url_config(_url),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{_index}')
+
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+
+# Seconds a connection is reused across requests (0 closes it after each
+# request); worth raising under the production server, see gunicorn.conf.py
+
+DATABASE_CONN_MAX_AGE = env.int('DATABASE_CONN_MAX_AGE', default=0)
+
+for _database in DATABASES.values():
+    _database['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+    _database['CONN_HEALTH_CHECKS'] = DATABASE_CONN_MAX_AGE > 0
+
+# Seconds a client keeps reading from the primary after a write
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=5)
+
+# Seconds between health probes of each replica, per process
+REPLICA_HEALTH_INTERVAL = env.float('REPLICA_HEALTH_INTERVAL', default=5.0)
+
+# Replication lag (seconds, PostgreSQL) beyond which a replica gets no reads
+REPLICA_MAX_LAG = env.float('REPLICA_MAX_LAG', default=10.0)
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -109,8 +149,151 @@ SPECTACULAR_SETTINGS = {
     'SCHEMA_PATH_PREFIX': '/api/'
 }
 
+# Pre-generated OpenAPI schema (build_schema, apps.core.schema); it is
+# regenerated when CODE_VERSION (e.g. the deployed commit) or, when unset,
+# the source code changes
+
+SCHEMA_FILE = Path(env.str('SCHEMA_FILE', default=str(BASE_DIR / 'openapi-schema.json')))
+
+CODE_VERSION = env.str('CODE_VERSION', default='')
+
 AUTH_USER_MODEL = 'users.User'
 
+# Bearer token cache: per-process LRU, optionally backed by CACHES['default'],
+# which then is the authoritative copy. Deleting or regenerating a token, or
+# saving its user, evicts it from this process and the shared cache at once;
+# other processes keep accepting it for up to AUTH_TOKEN_LOCAL_CACHE_TTL
+# seconds. Writes that skip signals (QuerySet.update, raw SQL) are seen after
+# AUTH_TOKEN_CACHE_TTL seconds with the shared cache, unless they call
+# BearerTokenAuthentication.invalidate. AUTH_TOKEN_CACHE_TTL=0 disables both.
+
+AUTH_TOKEN_CACHE_TTL = env.int('AUTH_TOKEN_CACHE_TTL', default=60)
+
+AUTH_TOKEN_LOCAL_CACHE_TTL = env.float('AUTH_TOKEN_LOCAL_CACHE_TTL', default=2.0)
+
+AUTH_TOKEN_CACHE_MAX_SIZE = env.int('AUTH_TOKEN_CACHE_MAX_SIZE', default=10000)
+
+AUTH_TOKEN_CACHE_SHARED = env.bool('AUTH_TOKEN_CACHE_SHARED', default=False)
+
+# Seconds a user's account membership stays in the shared cache, and
+# seconds between checks of the membership version against the database
+# (how long other processes may still use a membership that was changed)
+
+ACCOUNT_MEMBERSHIP_CACHE_TIMEOUT = env.int(
+    'ACCOUNT_MEMBERSHIP_CACHE_TIMEOUT', default=300
+)
+
+ACCOUNT_MEMBERSHIP_RECHECK_INTERVAL = env.float(
+    'ACCOUNT_MEMBERSHIP_RECHECK_INTERVAL', default=1.0
+)
+
+# Seconds Idempotency-Key responses are kept (prune_idempotency_keys)
+
+IDEMPOTENCY_KEY_RETENTION = env.int('IDEMPOTENCY_KEY_RETENTION', default=86400)
+
+# Streaming bulk ingest (trees-planted/bulk/stream/)
+
+TREES_INGEST_BATCH_SIZE = env.int('TREES_INGEST_BATCH_SIZE', default=2000)
+
+TREES_INGEST_USE_COPY = env.bool('TREES_INGEST_USE_COPY', default=True)
+
+# Seconds during which a bulk planting repeating one of the account's
+# (tree, latitude, longitude) is rejected; 0 only rejects in-batch repeats
+
+TREES_DUPLICATE_WINDOW = env.int('TREES_DUPLICATE_WINDOW', default=3600)
+
+# Seconds between checks of the in-process tree catalog against the database
+
+TREES_CATALOG_RECHECK_INTERVAL = env.float(
+    'TREES_CATALOG_RECHECK_INTERVAL', default=5.0
+)
+
+# In-process index for nearest planted tree queries (trees-planted/nearest/)
+
+TREES_NEARBY_INDEX = env.bool('TREES_NEARBY_INDEX', default=True)
+
+TREES_NEARBY_REFRESH_INTERVAL = env.float(
+    'TREES_NEARBY_REFRESH_INTERVAL', default=30.0
+)
+
+# Background bulk plantings (trees-planted/bulk/jobs/, run_planting_jobs)
+
+TREES_JOB_PROCESSES = env.int('TREES_JOB_PROCESSES', default=4)
+
+TREES_JOB_ACCOUNT_CONCURRENCY = env.int(
+    'TREES_JOB_ACCOUNT_CONCURRENCY', default=1
+)
+
+TREES_JOB_CHUNK_SIZE = env.int('TREES_JOB_CHUNK_SIZE', default=2000)
+
+# Seconds without progress after which a running job is handed out again
+TREES_JOB_STALE_AFTER = env.int('TREES_JOB_STALE_AFTER', default=300)
+
+# Runs of a job hitting database errors before it is marked as failed
+TREES_JOB_MAX_ATTEMPTS = env.int('TREES_JOB_MAX_ATTEMPTS', default=3)
+
+# Prometheus metrics (apps.core.metrics) served at /metrics; with
+# METRICS_TOKEN set, scrapes must send it as a bearer token, which
+# `check --deploy` (run by gunicorn.conf.py) requires with DEBUG off. Set
+# PROMETHEUS_MULTIPROC_DIR to aggregate several worker processes.
+
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+
+# Per-request timings (apps.core.timing): a Server-Timing header, JSON log
+# lines for a sample of the requests and, for requests slower than
+# SERVER_TIMING_SLOW_MS milliseconds (0 disables), a dump of their queries
+
+SERVER_TIMING = env.bool('SERVER_TIMING', default=False)
+
+SERVER_TIMING_SAMPLE_RATE = env.float('SERVER_TIMING_SAMPLE_RATE', default=0.0)
+
+SERVER_TIMING_SLOW_MS = env.float('SERVER_TIMING_SLOW_MS', default=0.0)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps.core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Production server (gunicorn.conf.py). SERVER_APP may point at
+# trees_everywhere.asgi:application with an ASGI worker class such as
+# uvicorn_worker.UvicornWorker (installed separately).
+
+SERVER_BIND = env.str('SERVER_BIND', default='0.0.0.0:8000')
+
+SERVER_APP = env.str('SERVER_APP', default='trees_everywhere.wsgi:application')
+
+SERVER_WORKER_CLASS = env.str('SERVER_WORKER_CLASS', default='sync')
+
+SERVER_WORKERS = env.int('SERVER_WORKERS', default=2 * (os.cpu_count() or 1) + 1)
+
+SERVER_THREADS = env.int('SERVER_THREADS', default=1)
+
+# Requests after which a worker is replaced, plus up to JITTER more so the
+# workers do not all restart at once
+SERVER_MAX_REQUESTS = env.int('SERVER_MAX_REQUESTS', default=1000)
+
+SERVER_MAX_REQUESTS_JITTER = env.int('SERVER_MAX_REQUESTS_JITTER', default=100)
+
+# Seconds a worker may spend on a request before it is killed and replaced
+SERVER_TIMEOUT = env.int('SERVER_TIMEOUT', default=30)
+
+# Seconds workers get to finish their requests on restart or shutdown
+SERVER_GRACEFUL_TIMEOUT = env.int('SERVER_GRACEFUL_TIMEOUT', default=30)
+
+SERVER_KEEPALIVE = env.int('SERVER_KEEPALIVE', default=5)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -18,16 +18,22 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
 
+from apps.core import views as core_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', core_views.metrics, name='metrics'),
     path('api/', include('apps.trees.urls', namespace='trees')),
     path('api/', include('apps.users.urls', namespace='users')),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path(
+        'api/async/',
+        include('apps.trees.async_urls', namespace='trees-async'),
+    ),
+    path('api/schema/', core_views.SchemaView.as_view(), name='schema'),
     path(
         'api/schema/swagger-ui/',
         SpectacularSwaggerView.as_view(url_name='schema'),
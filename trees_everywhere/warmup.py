@@ -0,0 +1,103 @@
+"""
+Warm-up for the preloading production server (see ``gunicorn.conf.py``).
+
+``before_fork`` runs in the server's master process once the application is
+loaded. It builds what every worker would otherwise build on its first
+requests: URL resolvers, serializer fields, the tree catalog, the nearest
+planting index and the rendered OpenAPI schema. Workers forked afterwards
+share those pages with the master instead of each paying for them. It then
+closes the master's connections, which must not be shared across a fork,
+and freezes the collected objects so the workers' garbage collections do
+not touch (and copy) those pages.
+
+``after_fork`` runs in each worker and opens its database connections, so
+its first requests do not pay for them (with ``DATABASE_CONN_MAX_AGE``;
+otherwise Django closes them when the first request starts).
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from apps.core import routers, schema
+from apps.trees import catalog, nearby
+
+__all__ = ['after_fork', 'before_fork']
+
+logger = logging.getLogger(__name__)
+
+
+def _view_classes(
+    patterns: Iterable[URLPattern | URLResolver],
+) -> Iterator[type]:
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _view_classes(pattern.url_patterns)
+        elif (
+            view_class := getattr(pattern.callback, 'cls', None)
+        ) is not None:
+            yield view_class
+
+
+def _warm_resolvers() -> list[type]:
+    resolver = get_resolver()
+    # Reading the lookup tables populates them, namespaces included.
+    resolver.reverse_dict  # noqa: B018
+    for _, namespace in resolver.namespace_dict.values():
+        namespace.reverse_dict  # noqa: B018
+    return list(dict.fromkeys(_view_classes(resolver.url_patterns)))
+
+
+def _warm_serializers(view_classes: Iterable[type]) -> None:
+    for view_class in view_classes:
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        if serializer_class is None:
+            continue
+        try:
+            serializer_class(context={}).fields  # noqa: B018
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                'Could not warm %s', serializer_class.__name__, exc_info=True
+            )
+
+
+def before_fork() -> None:
+    """Warm the master process up, then drop its connections."""
+    with routers.use_primary():
+        _warm_serializers(_warm_resolvers())
+        catalog.snapshot()
+        if settings.TREES_NEARBY_INDEX:
+            # Importing the application (preload_app) started loading it in
+            # a thread: let it finish, so it holds no connection or half-read
+            # cursor across the fork, and load it here if it failed.
+            if not nearby.wait():
+                nearby.reset()
+                try:
+                    nearby.warm()
+                except Exception:  # noqa: BLE001
+                    logger.warning(
+                        'Could not warm the nearest planting index',
+                        exc_info=True,
+                    )
+        for media_format in schema.RENDERERS:
+            schema.document(media_format)
+    connections.close_all()
+    caches.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork() -> None:
+    """Open the worker's own database connections."""
+    for alias in settings.DATABASES:
+        connections[alias].ensure_connection()
+    if settings.TREES_NEARBY_INDEX and not nearby.is_warm():
+        # The master could not load it; each worker does in the background.
+        nearby.warm_in_background()
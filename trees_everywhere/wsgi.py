@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'trees_everywhere.settings')
 
 application = get_wsgi_application()
+
+# Imported once the app registry is ready.
+from apps.trees import nearby  # noqa: E402
+
+nearby.warm_in_background()